@@ -0,0 +1,81 @@
+"""
+HTTP cache policy middleware.
+
+Views opt into shared caching with a `cache_policy` dict attribute, set on
+the view class or with the `cache_policy` decorator, e.g.
+`cache_policy = {'max_age': 30, 's_maxage': 300, 'actions': ['list']}`.
+Successful GET responses to anonymous clients are then marked public for
+browsers and CDNs, responses to authenticated clients stay private. Views
+tag responses with surrogate keys, see `add_surrogate_keys`, so writes can
+purge exactly the cached responses they affect.
+"""
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+DEFAULT_VARY = ('Accept', 'Authorization')
+
+
+def cache_policy(**options):
+    """Decorator setting a cache policy on a function view."""
+    def decorator(view_func):
+        view_func.cache_policy = options
+        return view_func
+    return decorator
+
+
+def surrogate_key_header():
+    """Return the name of the header carrying surrogate keys."""
+    return getattr(settings, 'CACHE_SURROGATE_KEY_HEADER', 'Surrogate-Key')
+
+
+def add_surrogate_keys(response, keys):
+    """Tag a response with surrogate keys."""
+    header = surrogate_key_header()
+    existing = response.get(header, '').split()
+    response[header] = ' '.join(dict.fromkeys([*existing, *keys]))
+    return response
+
+
+def _is_anonymous(request):
+    if 'HTTP_AUTHORIZATION' in request.META:
+        return False
+    user = getattr(request, 'user', None)
+    return user is None or not user.is_authenticated
+
+
+class CachePolicyMiddleware(MiddlewareMixin):
+    """Set Cache-Control and Vary from the view's cache policy."""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        policy = getattr(view_func, 'cache_policy', None)
+        if policy is None:
+            policy = getattr(getattr(view_func, 'cls', None),
+                             'cache_policy', None)
+        if policy and 'actions' in policy:
+            # Viewsets only cache the listed actions.
+            method = 'get' if request.method == 'HEAD' else request.method.lower()
+            action = getattr(view_func, 'actions', {}).get(method)
+            if action not in policy['actions']:
+                policy = None
+        request.cache_policy = policy
+
+    def process_response(self, request, response):
+        policy = getattr(request, 'cache_policy', None)
+        if (not policy or request.method not in ('GET', 'HEAD')
+                or response.status_code != 200
+                or response.has_header('Cache-Control')):
+            return response
+
+        if _is_anonymous(request):
+            directives = ['public', f"max-age={policy.get('max_age', 0)}"]
+            if 's_maxage' in policy:
+                directives.append(f"s-maxage={policy['s_maxage']}")
+            if 'stale_while_revalidate' in policy:
+                directives.append(
+                    f"stale-while-revalidate={policy['stale_while_revalidate']}")
+        else:
+            directives = ['private', 'no-cache']
+        response['Cache-Control'] = ', '.join(directives)
+        patch_vary_headers(response, policy.get('vary', DEFAULT_VARY))
+        return response
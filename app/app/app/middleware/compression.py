@@ -0,0 +1,216 @@
+"""
+Response compression middleware.
+
+Responses are compressed with the best encoding both the client and the
+server support: brotli and zstd when their modules are installed, gzip
+always. Views can tune or disable compression with a `compression` dict
+attribute, set on the view class or with the `compression` decorator, e.g.
+`compression = {'level': 9, 'min_size': 4096}` or `{'enabled': False}`.
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/(?!event-stream)|application/(json|javascript|xml|x-ndjson)|'
+    r'application/[\w.+-]+\+(json|xml))')
+
+
+class GzipCompressor:
+    """Incremental gzip compressor."""
+    encoding = 'gzip'
+    default_level = 6
+
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class BrotliCompressor:
+    """Incremental brotli compressor."""
+    encoding = 'br'
+    default_level = 4
+
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class ZstdCompressor:
+    """Incremental zstd compressor."""
+    encoding = 'zstd'
+    default_level = 3
+
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+COMPRESSORS = {'gzip': GzipCompressor}
+if brotli is not None:
+    COMPRESSORS['br'] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = ZstdCompressor
+
+
+def compression(**options):
+    """Decorator setting compression options on a function view."""
+    def decorator(view_func):
+        view_func.compression = options
+        return view_func
+    return decorator
+
+
+def parse_accept_encoding(header):
+    """Return a dict of encoding to quality from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(','):
+        encoding, _, params = part.strip().partition(';')
+        quality = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if encoding:
+            accepted[encoding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header, preferred):
+    """Return the supported encoding the client accepts best, or None."""
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in preferred:
+        if encoding not in COMPRESSORS:
+            continue
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_bytes(data, encoding, level=None):
+    """Compress a whole payload with an encoding."""
+    compressor_class = COMPRESSORS[encoding]
+    compressor = compressor_class(
+        compressor_class.default_level if level is None else level)
+    return compressor.compress(data) + compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses according to Accept-Encoding and view options."""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        options = getattr(view_func, 'compression', None)
+        if options is None:
+            options = getattr(getattr(view_func, 'cls', None), 'compression', None)
+        request.compression = options or {}
+
+    def _level(self, encoding, options):
+        level = options.get('level')
+        if isinstance(level, dict):
+            level = level.get(encoding)
+        if level is None:
+            level = getattr(settings, 'COMPRESSION_LEVELS', {}).get(encoding)
+        if level is None:
+            level = COMPRESSORS[encoding].default_level
+        return level
+
+    def process_response(self, request, response):
+        options = getattr(request, 'compression', {})
+        if not options.get('enabled', True):
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+
+        min_size = options.get(
+            'min_size', getattr(settings, 'COMPRESSION_MIN_SIZE', 1024))
+        if not response.streaming and len(response.content) < min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        preferred = getattr(settings, 'COMPRESSION_ENCODINGS',
+                            ['br', 'zstd', 'gzip'])
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), preferred)
+        if encoding is None:
+            return response
+        level = self._level(encoding, options)
+
+        if response.streaming:
+            compressor = COMPRESSORS[encoding](level)
+            response.streaming_content = self._compress_stream(
+                response, compressor)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress_bytes(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_stream(self, response, compressor):
+        """Wrap streaming content, flushing after every chunk."""
+        content = response.streaming_content
+        if response.is_async:
+            async def compress_async():
+                async for chunk in content:
+                    yield compressor.compress(chunk) + compressor.flush()
+                yield compressor.finish()
+            return compress_async()
+
+        def compress_sync():
+            for chunk in content:
+                yield compressor.compress(chunk) + compressor.flush()
+            yield compressor.finish()
+        return compress_sync()
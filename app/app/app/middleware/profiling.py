@@ -0,0 +1,128 @@
+"""
+On-demand request profiling.
+
+Staff users profile a request by sending an `X-Profile: 1` header or a
+`_profile=1` query parameter, and `PROFILING_SAMPLE_RATE = N` profiles one
+request in N at random. Profiled requests run under cProfile with their SQL
+recorded, and the result is written to `PROFILING_DIR` as a `.prof` file
+for pstats/snakeviz and a `.txt` report with the call tree and the queries.
+Requests that aren't profiled only pay for a header and a setting lookup.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+class QueryRecorder:
+    """Execute wrapper recording the SQL run on a connection."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'params': params if not many else None,
+                'duration': time.perf_counter() - start,
+            })
+
+
+def _staff_from_token(request):
+    """Return the active staff user of the request's auth token, or None."""
+    from rest_framework.authtoken.models import Token
+
+    auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(auth) != 2 or auth[0].lower() != 'token':
+        return None
+    token = Token.objects.select_related('user').filter(key=auth[1]).first()
+    if token is None or not token.user.is_active or not token.user.is_staff:
+        return None
+    return token.user
+
+
+class ProfilingMiddleware:
+    """Profile requests asked for by staff users or picked by sampling."""
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def should_profile(self, request):
+        requested = (request.META.get('HTTP_X_PROFILE') == '1'
+                     or request.GET.get('_profile') == '1')
+        if requested:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_active and user.is_staff:
+                return True
+            return _staff_from_token(request) is not None
+        rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        return bool(rate) and random.randrange(rate) == 0
+
+    def profile(self, request):
+        profile_id = uuid.uuid4().hex
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = time.perf_counter() - start
+
+        write_profile(profile_id, request, profiler, recorder.queries, elapsed)
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+
+def write_profile(profile_id, request, profiler, queries, elapsed):
+    """Write the stats and the text report of a profiled request."""
+    directory = getattr(settings, 'PROFILING_DIR',
+                        os.path.join(settings.BASE_DIR, 'profiles'))
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+    profiler.dump_stats(base + '.prof')
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative')
+    stream.write(f'{request.method} {request.get_full_path()}\n')
+    stream.write(f'Total time: {elapsed * 1000:.1f} ms, '
+                 f'SQL queries: {len(queries)}, SQL time: '
+                 f'{sum(q["duration"] for q in queries) * 1000:.1f} ms\n\n')
+    stats.print_stats(50)
+    stats.print_callees(30)
+
+    stream.write('SQL\n\n')
+    for number, query in enumerate(queries, 1):
+        stream.write(f'{number}. [{query["alias"]}] '
+                     f'{query["duration"] * 1000:.2f} ms\n'
+                     f'{query["sql"]}\n')
+        if query['params']:
+            stream.write(f'params: {query["params"]!r}\n')
+        stream.write('\n')
+
+    with open(base + '.txt', 'w') as report:
+        report.write(stream.getvalue())
@@ -0,0 +1,55 @@
+"""
+Server-Timing header middleware.
+
+With `SERVER_TIMING_ENABLED` every response carries a Server-Timing header
+splitting the request into authentication, permission checks, database
+time and query count, serialization, rendering and image processing.
+"""
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from app.utils import timing
+
+DESCRIPTIONS = {'db': '{count} queries'}
+
+
+class ServerTimingMiddleware:
+    """Add a Server-Timing header to responses."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'SERVER_TIMING_ENABLED', False):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with timing.collect() as timings, ExitStack() as stack:
+            def record_query(execute, sql, params, many, context):
+                query_start = time.perf_counter()
+                try:
+                    return execute(sql, params, many, context)
+                finally:
+                    timings.add('db', time.perf_counter() - query_start)
+
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+            response = self.get_response(request)
+        timings.add('total', time.perf_counter() - start)
+
+        response.headers['Server-Timing'] = timings.header(DESCRIPTIONS)
+        return response
+
+    def process_template_response(self, request, response):
+        timings = timing.current()
+        if timings is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings.add('render', time.perf_counter() - start)
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,160 @@
+"""
+Slow query log.
+
+Every query of a request slower than `SLOW_QUERY_THRESHOLD_MS` is stored in
+the `SlowQuery` table, shared by every process and capped to the latest
+`SLOW_QUERY_LOG_SIZE` entries, with the view that ran it, the project stack
+frames it came from and its EXPLAIN plan. Only the number of parameters is
+kept, and plans are generic ones without their values. The log is shown in
+the admin and can be downloaded as JSON.
+"""
+import itertools
+import logging
+import re
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from core.models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('SELECT', 'WITH')
+FIELDS = ['time', 'duration_ms', 'alias', 'method', 'path', 'view', 'sql',
+          'param_count', 'origin', 'plan']
+
+
+class SlowQueryLog:
+    """Slow queries kept in a capped table."""
+
+    def __init__(self, size=500):
+        self.size = size
+
+    def add(self, *entries):
+        objs = SlowQuery.objects.bulk_create(
+            SlowQuery(**entry) for entry in entries)
+        SlowQuery.objects.filter(id__lte=objs[-1].id - self.size).delete()
+
+    def entries(self):
+        """Return the logged queries, slowest first."""
+        return list(SlowQuery.objects.order_by(
+            '-duration_ms', '-id').values(*FIELDS)[:self.size])
+
+    def clear(self):
+        SlowQuery.objects.all().delete()
+
+
+slow_query_log = SlowQueryLog()
+
+_state = threading.local()
+
+
+def _origin():
+    """Return the project frames of the current stack, innermost last."""
+    base_dir = str(settings.BASE_DIR)
+    frames = []
+    for frame in traceback.extract_stack()[:-3]:
+        if (not frame.filename.startswith(base_dir)
+                or 'site-packages' in frame.filename
+                or frame.filename == __file__):
+            continue
+        path = frame.filename[len(base_dir):].lstrip('/')
+        frames.append(f'{path}:{frame.lineno} in {frame.name}')
+    return frames[-5:]
+
+
+def generic_sql(sql):
+    """Replace the `%s` placeholders of a query by numbered `$n` ones."""
+    numbers = itertools.count(1)
+    return re.sub(r'%%|%s', lambda m: (
+        '%' if m.group() == '%%' else f'${next(numbers)}'), sql)
+
+
+def explain(connection, sql):
+    """Return the generic plan of a query without running it, or None.
+
+    Generic plans, PostgreSQL 16 and later, leave the parameters out.
+    """
+    if (not sql.lstrip().upper().startswith(EXPLAINABLE)
+            or connection.vendor != 'postgresql'
+            or connection.pg_version < 160000):
+        return None
+    _state.explaining = True
+    try:
+        with ExitStack() as stack:
+            if connection.in_atomic_block:
+                # A failed EXPLAIN must not break the caller's transaction.
+                stack.enter_context(transaction.atomic(using=connection.alias))
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (GENERIC_PLAN) {generic_sql(sql)}')
+                return '\n'.join(row[0] for row in cursor.fetchall())
+    except DatabaseError:
+        return None
+    finally:
+        _state.explaining = False
+
+
+class SlowQueryRecorder:
+    """Execute wrapper logging queries slower than a threshold."""
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold
+        self.entries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_state, 'explaining', False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - start) * 1000
+        if duration >= self.threshold:
+            self.record(context['connection'], sql, params, many, duration)
+        return result
+
+    def record(self, connection, sql, params, many, duration):
+        match = self.request.resolver_match
+        plan = None
+        if not many and getattr(settings, 'SLOW_QUERY_EXPLAIN', True):
+            plan = explain(connection, sql)
+        self.entries.append({
+            'time': timezone.now(),
+            'duration_ms': round(duration, 3),
+            'alias': connection.alias,
+            'method': self.request.method,
+            'path': self.request.path,
+            'view': match.view_name if match else None,
+            'sql': sql,
+            'param_count': len(params or ()),
+            'origin': _origin(),
+            'plan': plan,
+        })
+
+
+class SlowQueryMiddleware:
+    """Record the slow queries run while handling requests."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+        if threshold is None:
+            return self.get_response(request)
+        recorder = SlowQueryRecorder(request, threshold)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        if recorder.entries:
+            # Written once the request is done, outside its transactions.
+            slow_query_log.size = getattr(settings, 'SLOW_QUERY_LOG_SIZE', 500)
+            try:
+                slow_query_log.add(*recorder.entries)
+            except DatabaseError:
+                logger.exception('Failed to store slow queries.')
+        return response
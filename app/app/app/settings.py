@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -51,10 +52,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.server_timing.ServerTimingMiddleware',
+    'app.middleware.compression.CompressionMiddleware',
+    'app.middleware.cache_policy.CachePolicyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.profiling.ProfilingMiddleware',
+    'app.middleware.slow_queries.SlowQueryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -114,6 +120,22 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Logins match emails case insensitively through the lower(email) index.
+AUTHENTICATION_BACKENDS = ['user.backends.EmailBackend']
+
+# The first hasher hashes new passwords, passwords hashed by the others or
+# with another PBKDF2_ITERATIONS are rehashed on login. Measure the cost of
+# each on the production hardware with `manage.py benchmark_hashers`.
+PASSWORD_HASHERS = os.environ.get('PASSWORD_HASHERS', ','.join([
+    'app.utils.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+])).split(',')
+PBKDF2_ITERATIONS = int(os.environ.get('PBKDF2_ITERATIONS', 720000))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -135,6 +157,25 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Serve MEDIA_URL from Django, with the transfer handed to the front server
+# when MEDIA_SENDFILE is 'x-accel-redirect' (nginx, internal location at
+# MEDIA_ACCEL_PREFIX) or 'x-sendfile'.
+MEDIA_SERVE = True
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_PUBLIC_PREFIXES = ['article_pic/', 'profile_pics/']
+MEDIA_MAX_AGE = 3600
+
+# Uploaded files are stored once per content and reference counted.
+STORAGES = {
+    'default': {
+        'BACKEND': 'app.utils.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -146,8 +187,59 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.MultiPartRenderer',
         'rest_framework.renderers.JSONRenderer'
 
-    ]
+    ],
+    # Login attempts per client address, throttled before any hashing.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.environ.get('LOGIN_THROTTLE_RATE', '10/min'),
+    },
 }
 
 
 AUTH_USER_MODEL = 'core.User'
+
+# Live updates fan-out, use 'app.utils.pubsub.PostgresBackend' to share
+# events between several worker processes or nodes.
+PUBSUB_BACKEND = 'app.utils.pubsub.InMemoryBackend'
+
+# Response compression, brotli and zstd are used when the `brotli` and
+# `zstandard` packages are installed.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_ENCODINGS = ['br', 'zstd', 'gzip']
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+# Request profiling, staff trigger it with an `X-Profile: 1` header or a
+# `_profile=1` query parameter, set a rate N to also profile 1 in N requests.
+PROFILING_SAMPLE_RATE = int(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_DIR = os.environ.get('PROFILING_DIR',
+                               os.path.join(BASE_DIR, 'profiles'))
+
+# Trending scores only fold likes and comments this old, it has to exceed
+# the longest transaction creating them.
+TRENDING_LAG_SECONDS = 60
+
+# Sync cursors stay this far behind now so late commits are sent too.
+SYNC_CURSOR_LAG_SECONDS = 60
+
+# Slow query log shown at /admin/slow-queries/, None disables it.
+SLOW_QUERY_THRESHOLD_MS = 200
+SLOW_QUERY_LOG_SIZE = 500
+SLOW_QUERY_EXPLAIN = True
+
+# Add a Server-Timing header breaking down the cost of each request.
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED') == '1'
+
+# Buffer likes in a write-behind table flushed by `manage.py flush_likes`,
+# for articles getting more likes than single inserts keep up with.
+LIKES_WRITE_BEHIND = os.environ.get('LIKES_WRITE_BEHIND') == '1'
+
+# Article views are buffered per process and written in bulk once this many
+# seconds passed or this many views are buffered.
+VIEW_COUNT_FLUSH_INTERVAL = 10
+VIEW_COUNT_FLUSH_SIZE = 1000
+
+# Purging of cached public responses by surrogate key, e.g. with
+# CACHE_PURGER = 'app.utils.cache_purge.HTTPPurger' and
+# CACHE_PURGER_OPTIONS = {'urls': ['http://varnish:6081/']}.
+CACHE_PURGER = 'app.utils.cache_purge.NullPurger'
+CACHE_PURGER_OPTIONS = {}
+CACHE_SURROGATE_KEY_HEADER = 'Surrogate-Key'
@@ -15,15 +15,24 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.admin import slow_queries_view
+from app.views import serve_media
 
 urlpatterns = [
+    path('admin/slow-queries/', admin.site.admin_view(slow_queries_view),
+         name='admin-slow-queries'),
     path('admin/', admin.site.urls),
     path('api/user/', include('user.urls')),
     path('api/article/', include('article.urls'))
 ]
-if settings.DEBUG:
+if settings.MEDIA_SERVE:
+    urlpatterns += [
+        re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$",
+                serve_media, name='media'),
+    ]
+elif settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,110 @@
+"""
+Purging cached responses by surrogate key.
+
+The purger is chosen with `CACHE_PURGER` and built with the keyword
+arguments of `CACHE_PURGER_OPTIONS`. `purge` sends the keys once the
+current transaction commits, so caches never refetch uncommitted state.
+"""
+import logging
+import queue
+import threading
+import urllib.request
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from app.middleware.cache_policy import surrogate_key_header
+
+logger = logging.getLogger(__name__)
+
+
+class NullPurger:
+    """Purger for deployments without a shared cache."""
+
+    def purge(self, keys):
+        pass
+
+
+class MemoryPurger:
+    """Purger recording the purged keys, for development and tests."""
+
+    def __init__(self):
+        self.purged = []
+
+    def purge(self, keys):
+        self.purged.extend(keys)
+
+
+class HTTPPurger:
+    """Purger sending PURGE requests with the keys to cache nodes.
+
+    Keys are queued and sent by a background thread, which merges the keys
+    queued meanwhile into requests of up to `batch_size` keys, so committing
+    requests never wait on the cache nodes.
+    """
+
+    def __init__(self, urls, header=None, timeout=2, batch_size=100):
+        self.urls = urls
+        self.header = header or surrogate_key_header()
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._sender = None
+
+    def purge(self, keys):
+        self._queue.put(keys)
+        with self._lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(
+                    target=self._send_queued, name='cache-purge', daemon=True)
+                self._sender.start()
+
+    def join(self):
+        """Wait until every queued key was sent."""
+        self._queue.join()
+
+    def _send_queued(self):
+        while True:
+            batches = [self._queue.get()]
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            keys = list(dict.fromkeys(
+                key for batch in batches for key in batch))
+            try:
+                for start in range(0, len(keys), self.batch_size):
+                    self._send(keys[start:start + self.batch_size])
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    def _send(self, keys):
+        for url in self.urls:
+            request = urllib.request.Request(
+                url, method='PURGE', headers={self.header: ' '.join(keys)})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+            except OSError:
+                logger.warning('Failed to purge %s from %s.', keys, url)
+
+
+@lru_cache(maxsize=None)
+def get_purger():
+    """Return the process wide purger configured by `CACHE_PURGER`."""
+    purger = getattr(settings, 'CACHE_PURGER',
+                     'app.utils.cache_purge.NullPurger')
+    options = getattr(settings, 'CACHE_PURGER_OPTIONS', {})
+    return import_string(purger)(**options)
+
+
+def purge(*keys):
+    """Purge cached responses tagged with any of `keys` after commit."""
+    keys = list(dict.fromkeys(keys))
+    if keys:
+        transaction.on_commit(lambda: get_purger().purge(keys))
@@ -0,0 +1,19 @@
+"""
+Password hashers with a configurable cost.
+
+`PBKDF2PasswordHasher` reads its iteration count from the
+`PBKDF2_ITERATIONS` setting, pick one with the `benchmark_hashers` command.
+Passwords hashed with another count or hasher are rehashed with the
+preferred one on the next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 SHA256 hasher with the iterations set in settings."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PBKDF2_ITERATIONS',
+                       hashers.PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,62 @@
+"""
+HyperLogLog cardinality sketch.
+
+Estimates the number of distinct values added to it within about
+`1.04 / sqrt(2 ** precision)` relative error, using one byte per register.
+Sketches with the same precision merge by taking register maxima, so
+partial sketches can be built anywhere and combined later.
+"""
+import hashlib
+import math
+
+
+class HyperLogLog:
+    """Distinct value counter in `2 ** precision` bytes."""
+
+    def __init__(self, precision=10, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is None:
+            registers = bytearray(self.size)
+        elif len(registers) != self.size:
+            raise ValueError(
+                f'Expected {self.size} registers, got {len(registers)}.')
+        self.registers = bytearray(registers)
+
+    @classmethod
+    def from_bytes(cls, data, precision=10):
+        """Return the sketch stored in `data`, or an empty one."""
+        if not data:
+            return cls(precision)
+        return cls(precision, bytes(data))
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, value):
+        """Add a string value."""
+        digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+        x = int.from_bytes(digest, 'big')
+        index = x >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = x & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError('Can only merge sketches of the same precision.')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        """Return the estimated number of distinct values."""
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
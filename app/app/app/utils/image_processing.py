@@ -2,8 +2,10 @@ from PIL import Image
 import os
 from io import BytesIO
 from django.core.files.base import ContentFile
+from app.utils.timing import timed
 
 
+@timed('image')
 def process_image(image, new_format='PNG', size=(200, 200)):
     """Function for resizing and processing immages."""
 
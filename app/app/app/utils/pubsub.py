@@ -0,0 +1,190 @@
+"""
+Publish/subscribe fan-out for live updates.
+
+Subscribers are asyncio consumers living on the ASGI event loop, publishers
+are usually sync views running in worker threads. Each worker process fans
+messages out to its own subscribers, a backend with a transport between
+processes lets publishes reach subscribers of every worker.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A subscriber's bounded queue of messages for one channel."""
+
+    def __init__(self, backend, channel, loop, maxsize):
+        self.backend = backend
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        """Queue a message from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The subscriber's event loop is gone.
+            self.close()
+
+    def _put(self, message):
+        if self.queue.full():
+            # Slow consumers lose their oldest messages instead of growing.
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        """Wait for the next message."""
+        return await self.queue.get()
+
+    def close(self):
+        """Stop receiving messages."""
+        self.backend.unsubscribe(self)
+
+
+class InMemoryBackend:
+    """Backend delivering messages to subscribers of the current process."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, loop=None):
+        """Return a subscription to a channel bound to an event loop."""
+        loop = loop or asyncio.get_running_loop()
+        subscription = Subscription(self, channel, loop, self.queue_size)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription."""
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def subscriber_count(self, channel):
+        """Return the number of local subscribers of a channel."""
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def publish(self, channel, message):
+        """Deliver a message to every subscriber of a channel."""
+        self.fan_out(channel, message)
+
+    def fan_out(self, channel, message):
+        """Deliver a message to the local subscribers of a channel."""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+
+class PostgresBackend(InMemoryBackend):
+    """
+    Backend sharing messages between processes with LISTEN/NOTIFY.
+
+    Every process listens on a single notification channel from a background
+    thread and fans received messages out locally. NOTIFY payloads are limited
+    to 8000 bytes, larger messages are reduced to their `type` and `id`. A
+    lost connection is logged and reopened with exponential backoff,
+    messages published meanwhile are lost.
+    """
+    notify_channel = 'app_pubsub'
+    max_payload = 7900
+    reconnect_delay = 1
+    max_reconnect_delay = 30
+
+    def __init__(self, queue_size=100):
+        super().__init__(queue_size)
+        self._listener = None
+
+    def subscribe(self, channel, loop=None):
+        self._ensure_listener()
+        return super().subscribe(channel, loop)
+
+    def publish(self, channel, message):
+        payload = json.dumps({'channel': channel, 'message': message})
+        if len(payload.encode()) > self.max_payload:
+            reduced = {key: message[key] for key in ('type', 'id') if key in message}
+            payload = json.dumps({'channel': channel, 'message': reduced})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)',
+                           [self.notify_channel, payload])
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name='pubsub-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        delay = self.reconnect_delay
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                delay = self.reconnect_delay
+                self._receive(conn)
+            except Exception:
+                logger.exception(
+                    'Pubsub listener lost its connection, reconnecting in %s s.',
+                    delay)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _connect(self):
+        """Open a connection listening on the notification channel."""
+        import psycopg2
+
+        params = connection.get_connection_params()
+        conn = psycopg2.connect(**params)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.notify_channel}')
+        return conn
+
+    def _receive(self, conn):
+        """Fan notifications out until the connection fails."""
+        while True:
+            if select.select([conn], [], [], 60) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    data = json.loads(notify.payload)
+                    self.fan_out(data['channel'], data['message'])
+                except (ValueError, KeyError):
+                    logger.warning('Dropped malformed pubsub payload.')
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """Return the process wide backend configured by `PUBSUB_BACKEND`."""
+    backend = getattr(settings, 'PUBSUB_BACKEND',
+                      'app.utils.pubsub.InMemoryBackend')
+    return import_string(backend)()
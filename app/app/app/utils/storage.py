@@ -0,0 +1,116 @@
+"""
+Content-addressed, deduplicated file storage.
+
+Files are stored once under `<upload dir>/<aa>/<bb>/<sha256>.<ext>`,
+whatever name they were saved with, and `StoredFile` counts how many
+fields reference each of them. Saving an existing content only adds a
+reference, deleting removes one and the file goes away with the last.
+`store_processed_image` also remembers which source produced each
+processed image, so uploading the same image again skips processing.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+
+from app.utils.image_processing import process_image
+
+
+def file_hash(content):
+    """Return the sha256 hex digest of a file, leaving it rewound."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage naming files by their content hash."""
+
+    def get_available_name(self, name, max_length=None):
+        # Identical names mean identical contents, they are never renamed.
+        return name
+
+    def _save(self, name, content):
+        from core.models import StoredFile
+
+        digest = file_hash(content)
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest[2:4], digest + ext)
+
+        with transaction.atomic():
+            stored, _ = StoredFile.objects.select_for_update().get_or_create(
+                name=name, defaults={'sha256': digest, 'size': content.size})
+            if not self.exists(name):
+                # The row lock makes sure a single process writes the file.
+                super()._save(name, content)
+            StoredFile.objects.filter(pk=stored.pk).update(
+                refcount=F('refcount') + 1)
+        return name
+
+    def reference(self, name):
+        """Add a reference to a stored file, return whether it exists."""
+        from core.models import StoredFile
+
+        return bool(StoredFile.objects.filter(name=name).update(
+            refcount=F('refcount') + 1))
+
+    def delete(self, name):
+        """Remove a reference, deleting the file with the last one."""
+        from core.models import StoredFile
+
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(
+                name=name).first()
+            if stored is None:
+                # Files saved before content addressing aren't shared.
+                super().delete(name)
+                return
+            if stored.refcount > 1:
+                StoredFile.objects.filter(pk=stored.pk).update(
+                    refcount=F('refcount') - 1)
+                return
+            stored.delete()
+            transaction.on_commit(lambda: self._delete_unused(name))
+
+    def _delete_unused(self, name):
+        from core.models import StoredFile
+
+        # The same content may have been stored again in the meantime.
+        if not StoredFile.objects.filter(name=name).exists():
+            super().delete(name)
+
+
+def store_processed_image(image, upload_dir, new_format='PNG', size=(200, 200)):
+    """
+    Process and store an uploaded image, return the stored name.
+
+    When the same source was processed into the same variant before, the
+    stored result is referenced again instead.
+    """
+    from core.models import ImageVariant, StoredFile
+
+    source_hash = file_hash(image)
+    variant = f'{new_format.lower()}:{size[0]}x{size[1]}'
+    existing = ImageVariant.objects.filter(
+        source_hash=source_hash, variant=variant).select_related(
+        'stored').first()
+    if (existing is not None and hasattr(default_storage, 'reference')
+            and default_storage.reference(existing.stored.name)):
+        return existing.stored.name
+
+    processed = process_image(image, new_format, size)
+    name = default_storage.save(
+        posixpath.join(upload_dir, processed.name), processed)
+    stored = StoredFile.objects.filter(name=name).first()
+    if stored is not None:
+        ImageVariant.objects.update_or_create(
+            source_hash=source_hash, variant=variant,
+            defaults={'stored': stored})
+    return name
@@ -0,0 +1,110 @@
+"""
+Request cost breakdown for the Server-Timing header.
+
+`ServerTimingMiddleware` opens a collector for each request when
+`SERVER_TIMING_ENABLED` is set, code then adds to it with `timer(name)` or
+`timed(name)`. Outside of a collected request both are no-ops.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+_timings = ContextVar('server_timing', default=None)
+
+
+class Timings:
+    """Durations and call counts of the named metrics of a request."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.serializing = False
+
+    def add(self, name, duration, count=1):
+        metric = self.metrics.setdefault(name, [0.0, 0])
+        metric[0] += duration
+        metric[1] += count
+
+    def header(self, descriptions=None):
+        """Return the Server-Timing header value, durations in ms."""
+        descriptions = descriptions or {}
+        parts = []
+        for name, (duration, count) in self.metrics.items():
+            part = f'{name};dur={duration * 1000:.1f}'
+            if name in descriptions:
+                part += f';desc="{descriptions[name].format(count=count)}"'
+            parts.append(part)
+        return ', '.join(parts)
+
+
+def current():
+    """Return the collector of the current request, or None."""
+    return _timings.get()
+
+
+@contextmanager
+def collect():
+    """Collect timings for the enclosed block."""
+    timings = Timings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timer(name):
+    """Add the duration of the enclosed block to a metric."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator adding the duration of each call to a metric."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ServerTimingMixin:
+    """Time authentication and permission checks of an API view."""
+
+    def perform_authentication(self, request):
+        with timer('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timer('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timer('perm'):
+            super().check_object_permissions(request, obj)
+
+
+class TimedSerializerMixin:
+    """Time serializer output, counting nested serializers only once."""
+
+    def to_representation(self, instance):
+        timings = _timings.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializing = False
+            timings.add('serialize', time.perf_counter() - start)
@@ -0,0 +1,142 @@
+"""
+Media file serving.
+
+Requests are authorized in Django. The transfer is then handed to the front
+web server with `X-Accel-Redirect` (nginx) or `X-Sendfile` (Apache,
+lighttpd) when `MEDIA_SENDFILE` is set, or streamed with `FileResponse`,
+which WSGI servers send with `os.sendfile`. Single byte ranges and the
+ETag/Last-Modified validators are handled here in both cases.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+CONTENT_HASH = re.compile(r'/([0-9a-f]{64})\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """File-like object reading `length` bytes of a file from `start`."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def authorize(request, path):
+    """Check if the request may read the media file at `path`."""
+    prefixes = getattr(settings, 'MEDIA_PUBLIC_PREFIXES',
+                       ['article_pic/', 'profile_pics/'])
+    return any(path.startswith(prefix) for prefix in prefixes)
+
+
+def _etag(path, stat):
+    match = CONTENT_HASH.search('/' + path)
+    if match:
+        # Content addressed names are strong validators already.
+        return f'"{match.group(1)}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """Return the (start, end) of a single byte range, None or 'invalid'."""
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Multiple or malformed ranges are ignored, the full file is sent.
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return 'invalid'
+    return start, end
+
+
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT."""
+    if not authorize(request, path):
+        raise Http404('File not found.')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404('File not found.')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found.')
+
+    etag = _etag(path, stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return _with_validators(response, path, etag, last_modified)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    sendfile = getattr(settings, 'MEDIA_SENDFILE', None)
+    if sendfile:
+        # The front server does the transfer and handles ranges itself.
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix + quote(path)
+        else:
+            response['X-Sendfile'] = full_path
+        return _with_validators(response, path, etag, last_modified)
+
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if 'HTTP_RANGE' in request.META and (
+            if_range is None or if_range == etag
+            or parse_http_date_safe(if_range) == last_modified):
+        byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(RangeFile(file, start, length),
+                                content_type=content_type, status=206)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    return _with_validators(response, path, etag, last_modified)
+
+
+def _with_validators(response, path, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if CONTENT_HASH.search('/' + path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = (
+            f"public, max-age={getattr(settings, 'MEDIA_MAX_AGE', 3600)}")
+    return response
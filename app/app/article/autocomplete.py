@@ -0,0 +1,105 @@
+"""
+Title and topic autocomplete.
+
+Prefix matches come first. They filter and sort on the "C" collated lower()
+expressions indexed on `Article.title` and `Topic.name`, so an index scan
+stops after `limit` rows. Fuzzy trigram matches fill the remaining slots of
+longer queries when the pg_trgm extension is installed, using the GIN indexes
+created by migration 0011. Queries shorter than `MIN_QUERY_LENGTH` get no
+suggestions. Results are cached for a few seconds per normalized query.
+"""
+import hashlib
+from functools import lru_cache
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.functions import Collate, Lower, Trim
+from core.models import Article, Topic
+
+
+CACHE_TIMEOUT = 30
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 64
+# Short queries share trigrams with most rows, fuzzy matching them is slow
+# and rarely useful.
+MIN_FUZZY_LENGTH = 4
+
+
+def normalize_query(query):
+    """Return the lower-cased, whitespace collapsed form of a query."""
+    return ' '.join(query.lower().split())[:MAX_QUERY_LENGTH]
+
+
+@lru_cache(maxsize=None)
+def has_trigram():
+    """Check if the pg_trgm extension is installed."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def title_prefix_matches(query):
+    """Return articles whose lower-cased title starts with the query."""
+    return Article.objects.alias(
+        title_key=Collate(Lower('title'), 'C')).filter(
+        title_key__startswith=query)
+
+
+def topic_prefix_matches(query):
+    """Return topics whose normalized name starts with the query."""
+    return Topic.objects.annotate(
+        normalized=Collate(Lower(Trim('name')), 'C')).filter(
+        normalized__startswith=query)
+
+
+def suggest_titles(query, limit):
+    """Return up to `limit` articles whose title matches the query."""
+    results = list(title_prefix_matches(query).order_by(
+        'title_key').values('id', 'title')[:limit])
+    if (len(results) < limit and len(query) >= MIN_FUZZY_LENGTH
+            and has_trigram()):
+        fuzzy = Article.objects.filter(title__trigram_word_similar=query).exclude(
+            id__in=[r['id'] for r in results]).annotate(
+            similarity=TrigramWordSimilarity(query, 'title')).order_by(
+            '-similarity').values('id', 'title')[:limit - len(results)]
+        results += list(fuzzy)
+    return results
+
+
+def suggest_topics(query, limit):
+    """Return up to `limit` normalized topic names matching the query."""
+    names = Topic.objects.annotate(normalized=Lower(Trim('name')))
+    results = list(topic_prefix_matches(query).order_by(
+        'normalized').values_list('normalized', flat=True).distinct()[:limit])
+    if (len(results) < limit and len(query) >= MIN_FUZZY_LENGTH
+            and has_trigram()):
+        fuzzy = names.filter(name__trigram_word_similar=query).exclude(
+            normalized__in=results).annotate(
+            similarity=TrigramWordSimilarity(query, 'name')).order_by(
+            '-similarity').values_list('normalized', flat=True)
+        for name in fuzzy[:limit * 4]:
+            if name not in results:
+                results.append(name)
+            if len(results) == limit:
+                break
+    return results
+
+
+def autocomplete(query, limit=10):
+    """Return cached title and topic suggestions for a query."""
+    query = normalize_query(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return {'query': query, 'titles': [], 'topics': []}
+
+    digest = hashlib.md5(query.encode()).hexdigest()
+    key = f'autocomplete:{limit}:{digest}'
+    result = cache.get(key)
+    if result is None:
+        result = {
+            'query': query,
+            'titles': suggest_titles(query, limit),
+            'topics': suggest_topics(query, limit),
+        }
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,29 @@
+"""
+Surrogate keys of cached article responses.
+"""
+from app.utils.cache_purge import purge
+
+ARTICLES_KEY = 'articles'
+TRENDING_KEY = 'trending'
+RELATED_KEY = 'related'
+
+
+def article_key(article_id):
+    return f'article-{article_id}'
+
+
+def author_key(user_id):
+    return f'author-{user_id}'
+
+
+def article_keys(articles):
+    """Return the keys of responses showing `articles`."""
+    keys = []
+    for article in articles:
+        keys += [article_key(article.id), author_key(article.user_id)]
+    return keys
+
+
+def purge_article(article_id, *extra_keys):
+    """Purge cached responses showing an article."""
+    purge(article_key(article_id), *extra_keys)
@@ -0,0 +1,21 @@
+"""
+Comment counts and previews for article lists.
+
+`Article.comments_count` is kept up to date by database triggers on every
+comment insert and delete, see migration 0023, so feeds read the count from
+the article row instead of counting comments. `changed_at` is bumped with
+it so syncing clients get the new count. `latest_comments` fetches the
+newest comment of a whole page of articles in one window function query.
+"""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from core.models import Comment
+
+
+def latest_comments(article_ids):
+    """Return the newest comment of each article, keyed by article id."""
+    ranked = Comment.objects.filter(article_id__in=article_ids).annotate(
+        rank=Window(RowNumber(), partition_by=F('article_id'),
+                    order_by=[F('created_at').desc(), F('id').desc()]),
+    ).filter(rank=1).select_related('user')
+    return {comment.article_id: comment for comment in ranked}
@@ -0,0 +1,36 @@
+"""
+Live events for article comments and likes.
+"""
+from django.db import transaction
+from article.likes import likes_count
+from app.utils.pubsub import get_backend
+
+
+def article_channel(article_id):
+    """Return the pubsub channel of an article."""
+    return f'article:{article_id}'
+
+
+def _publish_on_commit(article_id, message):
+    transaction.on_commit(
+        lambda: get_backend().publish(article_channel(article_id), message))
+
+
+def publish_comment_created(comment, data):
+    """Publish a new comment with its serialized representation."""
+    _publish_on_commit(comment.article_id, {
+        'type': 'comment.created',
+        'id': comment.id,
+        'comment': data,
+    })
+
+
+def publish_likes_changed(article_id):
+    """Publish the current number of likes of an article."""
+    def publish():
+        get_backend().publish(article_channel(article_id), {
+            'type': 'likes.changed',
+            'id': article_id,
+            'likes_count': likes_count(article_id),
+        })
+    transaction.on_commit(publish)
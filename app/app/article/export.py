@@ -0,0 +1,147 @@
+"""
+Streaming export of articles and comments.
+
+Rows are read with server-side cursors in fixed size chunks and rendered
+one by one, so memory use does not depend on the size of the export.
+Under ASGI the chunks must come from an async iterator, Django would
+otherwise read the whole sync iterator into memory before sending it.
+"""
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from core.models import Article, Comment
+
+
+CHUNK_SIZE = 2000
+
+FIELDS = {
+    'articles': ['id', 'user_id', 'author', 'title', 'opening', 'content',
+                 'image', 'topics', 'created_at', 'updated_at'],
+    'comments': ['id', 'article_id', 'user_id', 'author', 'content',
+                 'created_at', 'updated_at'],
+}
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _author(user):
+    return f"{user.first_name} {user.last_name}"
+
+
+def article_rows(chunk_size=CHUNK_SIZE):
+    """Yield every article as a dict."""
+    queryset = Article.objects.select_related('user').prefetch_related(
+        'topics').order_by('id')
+    for article in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            'id': article.id,
+            'user_id': article.user_id,
+            'author': _author(article.user),
+            'title': article.title,
+            'opening': article.opening,
+            'content': article.content,
+            'image': article.image.name or None,
+            'topics': [topic.name for topic in article.topics.all()],
+            'created_at': article.created_at,
+            'updated_at': article.updated_at,
+        }
+
+
+def comment_rows(chunk_size=CHUNK_SIZE):
+    """Yield every comment as a dict."""
+    queryset = Comment.objects.select_related('user').order_by('id')
+    for comment in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            'id': comment.id,
+            'article_id': comment.article_id,
+            'user_id': comment.user_id,
+            'author': _author(comment.user),
+            'content': comment.content,
+            'created_at': comment.created_at,
+            'updated_at': comment.updated_at,
+        }
+
+
+ROWS = {
+    'articles': article_rows,
+    'comments': comment_rows,
+}
+
+
+def render_ndjson(rows):
+    """Render rows as newline delimited JSON."""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    """File-like object returning what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows, fields):
+    """Render rows as CSV with a header line."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        values = []
+        for field in fields:
+            value = row[field]
+            if isinstance(value, list):
+                value = ';'.join(value)
+            elif hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        yield writer.writerow(values)
+
+
+def export(kind, output_format, chunk_size=CHUNK_SIZE):
+    """Return an iterator of text chunks exporting `kind` in `output_format`."""
+    rows = ROWS[kind](chunk_size)
+    if output_format == 'csv':
+        return render_csv(rows, FIELDS[kind])
+    return render_ndjson(rows)
+
+
+def gzip_stream(chunks, level=6):
+    """Gzip an iterator of text chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def buffered(chunks, size=64 * 1024):
+    """Join small text chunks into blocks of about `size` characters."""
+    block, length = [], 0
+    for chunk in chunks:
+        block.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(block)
+            block, length = [], 0
+    if block:
+        yield ''.join(block)
+
+
+async def async_chunks(chunks):
+    """Iterate over sync chunks from async code, one chunk at a time."""
+    # The server-side cursor belongs to the thread of sync code.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    chunks = iter(chunks)
+    done = object()
+    while True:
+        chunk = await next_chunk(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
@@ -0,0 +1,44 @@
+"""
+Filters for the article feed.
+
+Every filter is backed by an index: `author` by the user foreign key, or
+`article_user_created_idx` together with a date range, `topic` by the topic
+index of the many to many table, `topic_name` by `topic_name_idx`, the
+`created_*` ranges by `article_created_idx` and `has_image` by the partial
+`article_with_image_idx` and `min_likes` by `article_likes_count_idx` on
+the maintained likes count, which leaves out likes still waiting to be
+flushed in write-behind mode.
+"""
+from django_filters import rest_framework as filters
+from core.models import Article
+
+
+class ArticleFilter(filters.FilterSet):
+    """Narrow the feed by author, topic, date, likes and image."""
+    author = filters.NumberFilter(field_name='user')
+    topic = filters.NumberFilter(field_name='topics')
+    topic_name = filters.CharFilter(field_name='topics__name')
+    created_after = filters.IsoDateTimeFilter(
+        field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(
+        field_name='created_at', lookup_expr='lt')
+    min_likes = filters.NumberFilter(method='filter_min_likes', min_value=0)
+    has_image = filters.BooleanFilter(method='filter_has_image')
+
+    class Meta:
+        model = Article
+        fields = ['author', 'topic', 'topic_name', 'created_after',
+                  'created_before', 'min_likes', 'has_image']
+
+    def filter_min_likes(self, queryset, name, value):
+        """Keep articles with at least `value` likes."""
+        if not value:
+            return queryset
+        return queryset.filter(likes_count__gte=value)
+
+    def filter_has_image(self, queryset, name, value):
+        """Keep articles with or without an image."""
+        # `image > ''` matches the predicate of the partial index.
+        if value:
+            return queryset.filter(image__gt='')
+        return queryset.exclude(image__gt='')
@@ -0,0 +1,95 @@
+"""
+Like counts and the write-behind buffer for likes.
+
+`Article.likes_count` counts the likes in the `Like` table and is kept up to
+date by database triggers, see migration 0024, like the comments count.
+
+With `LIKES_WRITE_BEHIND` enabled likes are accepted into the `PendingLike`
+table, which has no foreign keys and dedupes on (user, article), and the
+`flush_likes` command moves them into `Like` in batches, keeping the time
+each like was given. Like counts add the pending likes of each article so
+likers see their like right away. Accepting a like never writes the article
+row, syncing clients get the new count once the flush moves `changed_at`
+with one update per article and batch. Run `flush_likes` once more after
+disabling the mode to drain the buffer.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from core.models import Article, Like, PendingLike, User
+
+
+def write_behind_enabled():
+    """Check if likes are buffered."""
+    return getattr(settings, 'LIKES_WRITE_BEHIND', False)
+
+
+def add_pending_like(user, article_id):
+    """Buffer a like, return False if the user already liked the article."""
+    if Like.objects.filter(user=user, article_id=article_id).exists():
+        return False
+    try:
+        with transaction.atomic():
+            PendingLike.objects.create(user_id=user.id, article_id=article_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+def remove_pending_like(user, article_id):
+    """Drop a buffered like, return whether there was one."""
+    deleted, _ = PendingLike.objects.filter(
+        user_id=user.id, article_id=article_id).delete()
+    return bool(deleted)
+
+
+def annotate_pending_likes(queryset):
+    """Annotate articles with their `pending_likes` in write-behind mode."""
+    if not write_behind_enabled():
+        return queryset
+    pending = PendingLike.objects.filter(
+        article_id=OuterRef('pk')).order_by().values(
+        'article_id').annotate(count=Count('id')).values('count')
+    return queryset.annotate(pending_likes=Coalesce(
+        Subquery(pending, output_field=IntegerField()), Value(0)))
+
+
+def pending_likes(article_id):
+    """Return the number of buffered likes of an article."""
+    if not write_behind_enabled():
+        return 0
+    return PendingLike.objects.filter(article_id=article_id).count()
+
+
+def likes_count(article_id):
+    """Return the number of likes of an article, pending likes included."""
+    count = Article.objects.filter(pk=article_id).values_list(
+        'likes_count', flat=True).first() or 0
+    return count + pending_likes(article_id)
+
+
+def flush_pending_likes(batch_size=1000):
+    """Move buffered likes into the likes table, return how many moved."""
+    flushed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(PendingLike.objects.select_for_update(
+                skip_locked=True).order_by('id')[:batch_size])
+            if not batch:
+                return flushed
+            articles = set(Article.objects.filter(
+                id__in={p.article_id for p in batch}).values_list(
+                'id', flat=True))
+            users = set(User.objects.filter(
+                id__in={p.user_id for p in batch}).values_list(
+                'id', flat=True))
+            Like.objects.bulk_create([
+                Like(user_id=p.user_id, article_id=p.article_id,
+                     created_at=p.created_at)
+                for p in batch
+                if p.article_id in articles and p.user_id in users
+            ], ignore_conflicts=True)
+            PendingLike.objects.filter(
+                id__in=[p.id for p in batch]).delete()
+        flushed += len(batch)
@@ -0,0 +1,32 @@
+"""
+Django command to rebuild the related articles index.
+"""
+from django.core.management.base import BaseCommand
+from article.related import rebuild_related, update_pending, TOP_K, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """Recompute related articles from topic overlap.
+
+    Run with `--pending` every minute or so to index articles whose topics
+    changed, and without it now and then to refill shortened lists.
+    """
+    help = 'Rebuild the related articles index from article topics.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--pending', action='store_true',
+                            help='Only update articles whose topics changed.')
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            updated = update_pending(
+                top_k=options['top_k'], batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Updated related articles of {updated} articles.'))
+            return
+        created = rebuild_related(
+            top_k=options['top_k'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {created} related article links.'))
@@ -0,0 +1,45 @@
+"""
+Django command to export articles or comments.
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+from article import export
+
+
+class Command(BaseCommand):
+    """Stream articles or comments to a file as NDJSON or CSV."""
+    help = 'Export all articles or comments as NDJSON or CSV, optionally gzipped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(export.FIELDS),
+                            default='articles')
+        parser.add_argument('--format', dest='output_format',
+                            choices=list(export.CONTENT_TYPES), default='ndjson')
+        parser.add_argument('--output', default='-',
+                            help='File to write to, "-" for stdout.')
+        parser.add_argument('--gzip', action='store_true',
+                            help='Compress the output, implied by a .gz output file.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        chunks = export.buffered(export.export(
+            options['kind'], options['output_format'], options['chunk_size']))
+        output = options['output']
+        if options['gzip'] or output.endswith('.gz'):
+            chunks = export.gzip_stream(chunks)
+        else:
+            chunks = (chunk.encode() for chunk in chunks)
+
+        if output == '-':
+            stream = sys.stdout.buffer
+            for chunk in chunks:
+                stream.write(chunk)
+            stream.flush()
+            return
+
+        with open(output, 'wb') as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f'Exported to {output}.'))
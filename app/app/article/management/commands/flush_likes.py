@@ -0,0 +1,20 @@
+"""
+Django command to flush buffered likes.
+"""
+from django.core.management.base import BaseCommand
+from article.likes import flush_pending_likes
+
+
+class Command(BaseCommand):
+    """Move likes accepted in write-behind mode into the likes table.
+
+    Meant to be run every few seconds while `LIKES_WRITE_BEHIND` is enabled.
+    """
+    help = 'Batch insert buffered likes into the likes table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        flushed = flush_pending_likes(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} likes.'))
@@ -0,0 +1,21 @@
+"""
+Django command to refresh the trending articles ranking.
+"""
+from django.core.management.base import BaseCommand
+from article.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    """Fold new likes and comments into the trending scores.
+
+    Meant to be run periodically, e.g. from cron every minute.
+    """
+    help = 'Refresh trending article scores from likes and comments added since the last run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        updated = refresh_trending(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {updated} trending articles.'))
@@ -18,6 +18,6 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 class IsAuthenticatedForRetrieve(permissions.BasePermission):
 
     def has_permission(self, request, view):
-        if view.action == 'retrieve':
+        if view.action in ('retrieve', 'batch'):
             return request.user and request.user.is_authenticated
         return True
@@ -0,0 +1,180 @@
+"""
+Related articles index.
+
+Articles are represented as sparse binary vectors over normalized topic
+names, so topics with the same name created by different users count as
+the same topic. Neighbours are ranked by cosine similarity and the top ones
+are stored in `RelatedArticle`.
+
+Saving an article only queues it with `queue_update`, updating the index
+touches every article sharing a topic and is left to
+`build_related_articles --pending`, run periodically.
+"""
+import numpy as np
+from scipy import sparse
+
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import Lower, RowNumber, Trim
+from core.models import Article, PendingRelatedUpdate, RelatedArticle
+from app.utils.cache_purge import purge
+from article.caching import RELATED_KEY, article_key
+
+
+TOP_K = 10
+BATCH_SIZE = 1000
+
+ArticleTopic = Article.topics.through
+
+
+def normalize_topic(name):
+    """Return the name used to compare topics across users."""
+    return name.strip().lower()
+
+
+def _topic_matrix(pairs):
+    """Build the L2 normalized article-topic matrix from (article_id, name) pairs."""
+    index, vocabulary = {}, {}
+    rows, cols = [], []
+    for article_id, name in pairs:
+        rows.append(index.setdefault(article_id, len(index)))
+        cols.append(vocabulary.setdefault(
+            normalize_topic(name), len(vocabulary)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(index), len(vocabulary)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+    norms = np.sqrt(np.asarray(matrix.sum(axis=1)).ravel())
+    matrix = sparse.diags(1.0 / norms) @ matrix
+
+    ids = np.fromiter(index, dtype=np.int64, count=len(index))
+    return ids, matrix.tocsr()
+
+
+def _neighbours(ids, matrix, rows, top_k):
+    """Yield (article_id, related_id, score) for the top neighbours of `rows`."""
+    similarity = (matrix[rows] @ matrix.T).tocsr()
+    for i, row in enumerate(rows):
+        start, end = similarity.indptr[i], similarity.indptr[i + 1]
+        cols = similarity.indices[start:end]
+        scores = similarity.data[start:end]
+        keep = cols != row
+        cols, scores = cols[keep], scores[keep]
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            cols, scores = cols[best], scores[best]
+        # Highest score first, newer articles win ties.
+        for j in np.lexsort((-ids[cols], -scores)):
+            yield int(ids[row]), int(ids[cols[j]]), float(scores[j])
+
+
+def rebuild_related(top_k=TOP_K, batch_size=BATCH_SIZE):
+    """Recompute the whole related articles index."""
+    pairs = ArticleTopic.objects.values_list(
+        'article_id', 'topic__name').iterator(chunk_size=10000)
+    ids, matrix = _topic_matrix(pairs)
+
+    created = 0
+    with transaction.atomic():
+        RelatedArticle.objects.all().delete()
+        if not len(ids):
+            return created
+        for start in range(0, len(ids), batch_size):
+            rows = np.arange(start, min(start + batch_size, len(ids)))
+            objs = [
+                RelatedArticle(article_id=a, related_id=b, score=score)
+                for a, b, score in _neighbours(ids, matrix, rows, top_k)
+            ]
+            RelatedArticle.objects.bulk_create(objs, batch_size=1000)
+            created += len(objs)
+        purge(RELATED_KEY)
+    return created
+
+
+def queue_update(article_id):
+    """Queue an article whose topics changed for `update_pending`."""
+    PendingRelatedUpdate.objects.bulk_create(
+        [PendingRelatedUpdate(article_id=article_id)], ignore_conflicts=True)
+
+
+def update_pending(top_k=TOP_K, batch_size=BATCH_SIZE):
+    """Update the index for the queued articles, return how many."""
+    updated = 0
+    while True:
+        with transaction.atomic():
+            pending = list(PendingRelatedUpdate.objects.select_for_update(
+                skip_locked=True).order_by('id')[:batch_size])
+            if not pending:
+                return updated
+            articles = Article.objects.in_bulk(
+                [p.article_id for p in pending])
+            for article in articles.values():
+                update_related(article, top_k)
+            PendingRelatedUpdate.objects.filter(
+                pk__in=[p.pk for p in pending]).delete()
+        updated += len(pending)
+
+
+def update_related(article, top_k=TOP_K):
+    """Refresh the index for one article after its topics changed.
+
+    The article's own neighbours are recomputed, it is removed from every
+    list and inserted again into the lists of the articles it shares topics
+    with where it ranks in the top `top_k`. A list the
+    article dropped out of is left one entry short until the next rebuild.
+    Cached related responses of every touched list are purged.
+    """
+    names = {normalize_topic(name)
+             for name in article.topics.values_list('name', flat=True)}
+
+    with transaction.atomic():
+        changed = {article.id, *RelatedArticle.objects.filter(
+            related=article).values_list('article_id', flat=True)}
+        RelatedArticle.objects.filter(
+            Q(article=article) | Q(related=article)).delete()
+        if names:
+            changed.update(_insert_neighbours(article, names, top_k))
+        purge(*[article_key(article_id) for article_id in changed])
+
+
+def _insert_neighbours(article, names, top_k):
+    """Store the neighbours of an article both ways, return the touched lists.
+
+    The article only enters a neighbour's list when it beats the K-th entry
+    there, or the list is short, and then just that K-th entry is dropped.
+    """
+    candidates = ArticleTopic.objects.alias(
+        name=Lower(Trim('topic__name'))).filter(
+        name__in=names).values('article_id')
+    pairs = ArticleTopic.objects.filter(
+        article_id__in=candidates).values_list('article_id', 'topic__name')
+    ids, matrix = _topic_matrix(pairs)
+    row = np.flatnonzero(ids == article.id)
+    scored = list(_neighbours(ids, matrix, row, len(ids)))
+    if not scored:
+        return []
+
+    ranked = RelatedArticle.objects.filter(
+        article_id__in=[b for _, b, _ in scored]).annotate(rank=Window(
+            RowNumber(), partition_by=F('article_id'),
+            order_by=[F('score').desc(), F('related_id').desc()]))
+    last = {article_id: (pk, score, related_id)
+            for pk, article_id, score, related_id in ranked.filter(
+                rank=top_k).values_list(
+                'id', 'article_id', 'score', 'related_id')}
+
+    objs = [RelatedArticle(article_id=a, related_id=b, score=score)
+            for a, b, score in scored[:top_k]]
+    touched, overflow = [], []
+    for a, b, score in scored:
+        if b in last:
+            pk, last_score, last_related = last[b]
+            if (score, a) <= (last_score, last_related):
+                continue
+            overflow.append(pk)
+        objs.append(RelatedArticle(article_id=b, related_id=a, score=score))
+        touched.append(b)
+    RelatedArticle.objects.filter(id__in=overflow).delete()
+    RelatedArticle.objects.bulk_create(objs, batch_size=1000)
+    return touched
@@ -1,17 +1,22 @@
 """ 
 Serializers for Article API.
 """
-from core.models import Article, Comment, Topic, Like
+from core.models import Article, Comment, Topic, Like, TrendingArticle, RelatedArticle
 from rest_framework import serializers
-from app.utils.image_processing import process_image
+from app.utils.storage import store_processed_image
+from app.utils.timing import TimedSerializerMixin
+from article.trending import current_score
+from article.related import queue_update
+from article.likes import pending_likes
+from article.view_counts import view_stats
 
 
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for likes."""
     # user_id = serializers.CharField(source='user.id', read_only=True)
     user_name = serializers.SerializerMethodField(
         read_only=True)
-    article_id = serializers.CharField(source='article.id', read_only=True)
+    article_id = serializers.CharField(read_only=True)
 
     class Meta:
         model = Like
@@ -32,7 +37,7 @@ class LikeSerializer(serializers.ModelSerializer):
         return f"{obj.user.first_name} {obj.user.last_name}"
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for topics."""
 
     class Meta:
@@ -41,7 +46,7 @@ class TopicSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for comments"""
 
     # user_id = serializers.CharField(source='user.id', read_only=True)
@@ -58,28 +63,47 @@ class CommentSerializer(serializers.ModelSerializer):
         return f"{obj.user.first_name} {obj.user.last_name}"
 
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for article."""
     author = serializers.SerializerMethodField(
         read_only=True)
     topics = TopicSerializer(many=True, required=False)
     likes_count = serializers.SerializerMethodField()
     image = serializers.ImageField(required=False, allow_null=True)
+    latest_comment = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Article
-        fields = ['id', 'author', 'title', 'image',
-                  'created_at', 'updated_at', 'likes_count', 'topics']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'author', 'title', 'image', 'created_at',
+                  'updated_at', 'likes_count', 'comments_count', 'topics',
+                  'latest_comment']
+        read_only_fields = ['id', 'created_at', 'updated_at',
+                            'comments_count']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The preview is only sent when the view fetched it for the page.
+        if 'latest_comments' not in self.context:
+            self.fields.pop('latest_comment')
 
     def get_likes_count(self, obj):
-        """Method count likes for article."""
-        return obj.likes.count()
+        """Method count likes for article, pending likes included."""
+        pending = getattr(obj, 'pending_likes', None)
+        if pending is None:
+            pending = pending_likes(obj.id)
+        return obj.likes_count + pending
 
     def get_author(self, obj):
         """Method to get the author name."""
         return f"{obj.user.first_name} {obj.user.last_name}"
 
+    def get_latest_comment(self, obj):
+        """Method to get the newest comment of the article."""
+        comment = self.context['latest_comments'].get(obj.id)
+        if comment is None:
+            return None
+        return CommentSerializer(comment).data
+
     def _get_or_create_topics(self, topics, article):
         """Handle getting or creating topics."""
         auth_user = self.context['request'].user
@@ -94,35 +118,99 @@ class ArticleSerializer(serializers.ModelSerializer):
         topics = validated_data.pop('topics', [])
         article = Article.objects.create(**validated_data)
         self._get_or_create_topics(topics, article)
+        if topics:
+            queue_update(article.id)
         return article
 
     def update(self, instance, validated_data):
         """Update Article."""
         image = validated_data.get('image', None)
         if image and instance.image:
+            processed_image = store_processed_image(
+                image, 'article_pic', 'PNG', (700, 400))
             instance.image.delete(save=False)
-            processed_image = process_image(image, 'PNG', (700, 400))
             validated_data['image'] = processed_image
 
         topics = validated_data.pop('topics', None)
         if topics is not None:
             instance.topics.clear()
             self._get_or_create_topics(topics, instance)
+            queue_update(instance.id)
 
+        # Only the edited fields are saved so counters written concurrently,
+        # like views and comments, aren't overwritten with stale values.
+        update_fields = ['updated_at', 'changed_at']
         for attr, value in validated_data.items():
             if attr == 'image' and value is None:
                 # Skip updating image field if value is None to retain the existing image
                 continue
             setattr(instance, attr, value)
+            update_fields.append(attr)
 
-        instance.save()
+        instance.save(update_fields=update_fields)
         return instance
 
 
 class ArticleDetailSerializer(ArticleSerializer):
     """Serializer for detail view."""
     comments = CommentSerializer(many=True, required=False)
+    view_count = serializers.SerializerMethodField(read_only=True)
+    unique_viewers = serializers.SerializerMethodField(read_only=True)
 
     class Meta(ArticleSerializer.Meta):
         fields = ArticleSerializer.Meta.fields + \
-            ['opening', 'content', 'comments',]
+            ['opening', 'content', 'comments', 'view_count', 'unique_viewers']
+
+    def to_representation(self, instance):
+        """Read the view stats of the article once for both fields."""
+        self._view_stats = view_stats(instance)
+        return super().to_representation(instance)
+
+    def get_view_count(self, obj):
+        """Method to get the number of views, buffered ones included."""
+        return self._view_stats[0]
+
+    def get_unique_viewers(self, obj):
+        """Method to get the estimated number of distinct viewers."""
+        return self._view_stats[1]
+
+
+class TrendingArticleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for trending articles."""
+    id = serializers.IntegerField(source='article_id', read_only=True)
+    title = serializers.CharField(source='article.title', read_only=True)
+    author = serializers.SerializerMethodField(read_only=True)
+    image = serializers.ImageField(source='article.image', read_only=True)
+    created_at = serializers.DateTimeField(
+        source='article.created_at', read_only=True)
+    score = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = TrendingArticle
+        fields = ['id', 'author', 'title', 'image', 'created_at', 'score']
+
+    def get_author(self, obj):
+        """Method to get the author name."""
+        return f"{obj.article.user.first_name} {obj.article.user.last_name}"
+
+    def get_score(self, obj):
+        """Method to get the current decayed score."""
+        return current_score(obj.score)
+
+
+class RelatedArticleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for related articles."""
+    id = serializers.IntegerField(source='related_id', read_only=True)
+    title = serializers.CharField(source='related.title', read_only=True)
+    author = serializers.SerializerMethodField(read_only=True)
+    image = serializers.ImageField(source='related.image', read_only=True)
+    created_at = serializers.DateTimeField(
+        source='related.created_at', read_only=True)
+
+    class Meta:
+        model = RelatedArticle
+        fields = ['id', 'author', 'title', 'image', 'created_at', 'score']
+
+    def get_author(self, obj):
+        """Method to get the author name."""
+        return f"{obj.related.user.first_name} {obj.related.user.last_name}"
@@ -0,0 +1,106 @@
+"""
+Delta sync of articles.
+
+A sync cursor is an opaque token holding the `(changed_at, id)` of the last
+changed article and the id of the last tombstone a client has seen.
+`changed_at` moves on edits and on like and comment count changes.
+
+`changed_at` and ids are assigned before commit, so a change committing
+late can land behind a cursor already handed out. The cursor of the last
+batch is therefore kept `SYNC_CURSOR_LAG_SECONDS` behind now and the next
+sync sends the recent changes again; clients apply changes by id.
+"""
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core.models import Article, ArticleTombstone
+from article.likes import annotate_pending_likes
+
+
+def encode_cursor(changed_at, article_id, tombstone_id):
+    """Return an opaque cursor for a sync position."""
+    position = {
+        'u': changed_at.isoformat() if changed_at else None,
+        'i': article_id,
+        't': tombstone_id,
+    }
+    return base64.urlsafe_b64encode(
+        json.dumps(position).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the `(changed_at, id, tombstone_id)` held by a cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+        changed_at = parse_datetime(position['u']) if position['u'] else None
+        return changed_at, int(position['i']), int(position['t'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError('Invalid sync cursor.')
+
+
+def initial_position():
+    """Return the position of a client that has never synced."""
+    last_tombstone = ArticleTombstone.objects.order_by('-id').values_list(
+        'id', flat=True).first()
+    return None, 0, last_tombstone or 0
+
+
+def _lagged(changed_at, article_id, tombstone_id):
+    """Move a position back to where every change is committed."""
+    lag = getattr(settings, 'SYNC_CURSOR_LAG_SECONDS', 60)
+    if not lag:
+        return changed_at, article_id, tombstone_id
+    cutoff = timezone.now() - timedelta(seconds=lag)
+    if changed_at is not None and changed_at >= cutoff:
+        changed_at, article_id = cutoff, 0
+    if tombstone_id:
+        tombstone_id = ArticleTombstone.objects.filter(
+            id__lte=tombstone_id, deleted_at__lt=cutoff).order_by(
+            '-id').values_list('id', flat=True).first() or 0
+    return changed_at, article_id, tombstone_id
+
+
+def changes_since(position, limit):
+    """
+    Return at most `limit` changed articles and deleted ids after `position`.
+
+    The result is a dict with the `changed` articles, the `deleted` article
+    ids, the new `position` and whether more changes are pending.
+    """
+    changed_at, article_id, tombstone_id = position
+
+    changed = annotate_pending_likes(Article.objects.select_related(
+        'user').prefetch_related('topics'))
+    if changed_at is not None:
+        changed = changed.filter(
+            Q(changed_at__gt=changed_at) |
+            Q(changed_at=changed_at, id__gt=article_id))
+    changed = list(changed.order_by('changed_at', 'id')[:limit + 1])
+
+    deleted = list(ArticleTombstone.objects.filter(
+        id__gt=tombstone_id).order_by('id').values_list(
+        'id', 'article_id')[:limit + 1])
+
+    has_more = len(changed) > limit or len(deleted) > limit
+    changed, deleted = changed[:limit], deleted[:limit]
+    if changed:
+        changed_at, article_id = changed[-1].changed_at, changed[-1].id
+    if deleted:
+        tombstone_id = deleted[-1][0]
+    if not has_more:
+        changed_at, article_id, tombstone_id = _lagged(
+            changed_at, article_id, tombstone_id)
+
+    return {
+        'changed': changed,
+        'deleted': [deleted_id for _, deleted_id in deleted],
+        'position': (changed_at, article_id, tombstone_id),
+        'has_more': has_more,
+    }
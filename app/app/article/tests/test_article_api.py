@@ -7,7 +7,8 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from core.models import Article, Topic
+from core.models import Article, ArticleTombstone, PurgeJob, Topic
+from core.purge import run_pending_jobs
 from article.serializers import (ArticleSerializer, ArticleDetailSerializer)
 
 ARTICLE_URL = reverse('article:article-list')
@@ -229,3 +230,24 @@ class PrivateArticleAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn(topic_money, article.topics.all())
         self.assertNotIn(topic_finance, article.topics.all())
+
+    def test_delete_article_hides_and_queues_purge(self):
+        """Test deleting an article hides it and leaves the rows to a job."""
+        article = create_article(user=self.user)
+
+        res = self.client.delete(detail_url(article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Article.objects.filter(id=article.id).exists())
+        self.assertTrue(Article.all_objects.filter(id=article.id).exists())
+        self.assertTrue(PurgeJob.objects.filter(
+            kind=PurgeJob.ARTICLE, target_id=article.id,
+            status=PurgeJob.PENDING).exists())
+        res = self.client.get(detail_url(article.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        run_pending_jobs()
+
+        self.assertFalse(Article.all_objects.filter(id=article.id).exists())
+        self.assertEqual(ArticleTombstone.objects.filter(
+            article_id=article.id).count(), 1)
@@ -0,0 +1,98 @@
+"""
+Test for article multi-get API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Article, Comment, Like, Topic
+
+BATCH_URL = reverse('article:articles-batch')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+class PublicArticleBatchAPITests(TestCase):
+    """Tests unauthenticated multi-get requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to fetch articles."""
+        res = self.client.get(BATCH_URL, {'ids': '1'})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PrivateArticleBatchAPITests(TestCase):
+    """Tests authenticated multi-get requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.client.force_authenticate(self.user)
+
+    def test_batch_returns_articles_in_order(self):
+        """Test articles are returned in the requested order."""
+        first = create_article(self.user, title='First')
+        second = create_article(self.user, title='Second')
+        topic = Topic.objects.create(user=self.user, name='Python')
+        first.topics.add(topic)
+        Comment.objects.create(user=self.user, article=first, content='Hi')
+        Like.objects.create(user=self.user, article=second)
+
+        ids = f'{second.id},{first.id}'
+        res = self.client.get(BATCH_URL, {'ids': ids})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data['results']
+        self.assertEqual([a['title'] for a in results], ['Second', 'First'])
+        self.assertEqual(results[0]['likes_count'], 1)
+        self.assertEqual(results[1]['topics'][0]['name'], 'Python')
+        self.assertEqual(results[1]['comments'][0]['content'], 'Hi')
+
+    def test_batch_reports_missing_articles(self):
+        """Test missing ids are reported without failing the batch."""
+        article = create_article(self.user)
+
+        res = self.client.get(BATCH_URL, {'ids': f'{article.id},999999'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['id'], article.id)
+        self.assertEqual(res.data['results'][1],
+                         {'id': 999999, 'detail': 'Not found.'})
+
+    def test_batch_uses_constant_queries(self):
+        """Test the number of queries does not grow with the batch."""
+        ids = []
+        for i in range(5):
+            article = create_article(self.user, title=f'Title {i}')
+            Comment.objects.create(
+                user=self.user, article=article, content='Comment')
+            ids.append(str(article.id))
+
+        with self.assertNumQueries(3):
+            res = self.client.get(BATCH_URL, {'ids': ','.join(ids)})
+
+        self.assertEqual(len(res.data['results']), 5)
+
+    def test_batch_invalid_ids(self):
+        """Test invalid ids are rejected."""
+        res = self.client.get(BATCH_URL, {'ids': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
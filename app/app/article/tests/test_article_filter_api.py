@@ -0,0 +1,155 @@
+""" 
+Test for filtering the article feed.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Article, Like, Topic
+from article.filters import ArticleFilter
+from article.likes import annotate_pending_likes
+
+ARTICLES_URL = reverse('article:articles-list')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+    return Article.objects.create(user=user, **defaults)
+
+
+def create_user(email):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        'Test', 'User', email, 'testpass123')
+
+
+class ArticleFilterAPITests(TestCase):
+    """Test the feed filters."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user('user@example.com')
+        self.other = create_user('other@example.com')
+
+    def _titles(self, params):
+        res = self.client.get(ARTICLES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return sorted(article['title'] for article in res.data['results'])
+
+    def test_filter_by_author(self):
+        """Test filtering articles by author id."""
+        create_article(self.user, title='Mine')
+        create_article(self.other, title='Other')
+
+        self.assertEqual(self._titles({'author': self.user.id}), ['Mine'])
+
+    def test_filter_by_topic(self):
+        """Test filtering articles by topic id or name."""
+        topic = Topic.objects.create(user=self.user, name='Python')
+        tagged = create_article(self.user, title='Tagged')
+        tagged.topics.add(topic)
+        create_article(self.user, title='Untagged')
+
+        self.assertEqual(self._titles({'topic': topic.id}), ['Tagged'])
+        self.assertEqual(self._titles({'topic_name': 'Python'}), ['Tagged'])
+
+    def test_filter_by_created_range(self):
+        """Test filtering articles by creation date."""
+        old = create_article(self.user, title='Old')
+        Article.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=10))
+        create_article(self.user, title='New')
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+
+        self.assertEqual(self._titles({'created_after': since}), ['New'])
+        self.assertEqual(self._titles({'created_before': since}), ['Old'])
+
+    def test_filter_by_min_likes(self):
+        """Test filtering articles by a minimum like count."""
+        popular = create_article(self.user, title='Popular')
+        liked = create_article(self.user, title='Liked')
+        create_article(self.user, title='Ignored')
+        Like.objects.create(user=self.user, article=popular)
+        Like.objects.create(user=self.other, article=popular)
+        Like.objects.create(user=self.user, article=liked)
+
+        self.assertEqual(self._titles({'min_likes': 2}), ['Popular'])
+        self.assertEqual(self._titles({'min_likes': 1}), ['Liked', 'Popular'])
+
+    def test_filter_by_has_image(self):
+        """Test filtering articles with or without an image."""
+        create_article(self.user, title='Picture', image='article_pic/a.png')
+        create_article(self.user, title='Text')
+
+        self.assertEqual(self._titles({'has_image': 'true'}), ['Picture'])
+        self.assertEqual(self._titles({'has_image': 'false'}), ['Text'])
+
+    def test_invalid_filter_value(self):
+        """Test invalid filter values are rejected."""
+        res = self.client.get(ARTICLES_URL, {'author': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ArticleFilterPlanTests(TestCase):
+    """Test selective filters are served by indexes."""
+
+    ARTICLES = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [create_user(f'user{i}@example.com') for i in range(20)]
+        topics = Topic.objects.bulk_create(
+            Topic(user=users[0], name=f'Topic {i}') for i in range(1000))
+        articles = Article.objects.bulk_create(
+            Article(user=users[i % len(users)], title=f'Article {i}',
+                    opening='opening', content='content',
+                    image='article_pic/a.png' if i % 100 == 0 else '')
+            for i in range(cls.ARTICLES))
+        Article.topics.through.objects.bulk_create(
+            Article.topics.through(article=article, topic=topics[i % 1000])
+            for i, article in enumerate(articles))
+        Like.objects.bulk_create(
+            Like(user=user, article=article)
+            for article in articles[:20] for user in users)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE core_article SET created_at = "
+                "now() - id * interval '1 hour'")
+            cursor.execute('ANALYZE')
+        cls.users, cls.topics = users, topics
+
+    def _plan(self, params):
+        filterset = ArticleFilter(params, queryset=annotate_pending_likes(
+            Article.objects.defer('viewers_hll')))
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return filterset.qs.explain()
+
+    def test_filters_avoid_sequential_scans(self):
+        """Test selective filters don't scan the article, topic or like tables."""
+        since = (timezone.now() - timedelta(hours=24)).isoformat()
+        cases = {
+            'author': {'author': self.users[3].id},
+            'topic': {'topic': self.topics[7].id},
+            'topic_name': {'topic_name': 'Topic 7'},
+            'created_after': {'created_after': since},
+            'min_likes': {'min_likes': 20},
+            'has_image': {'has_image': 'true'},
+        }
+        for name, params in cases.items():
+            with self.subTest(name):
+                plan = self._plan(params)
+                self.assertNotIn('Seq Scan on core_article', plan)
+                self.assertNotIn('Seq Scan on core_topic', plan)
+                self.assertNotIn('Seq Scan on core_like', plan)
@@ -0,0 +1,144 @@
+"""
+Test for article autocomplete API.
+"""
+
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Article, Topic
+from article.autocomplete import (
+    has_trigram,
+    title_prefix_matches,
+    topic_prefix_matches,
+)
+
+AUTOCOMPLETE_URL = reverse('article:articles-autocomplete')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+class AutocompleteAPITests(TestCase):
+    """Tests for title and topic autocomplete."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.other_user = get_user_model().objects.create_user(
+            'Other', 'User', 'other@example.com', 'testpass123')
+        create_article(self.user, title='Django tips')
+        create_article(self.user, title='Django testing')
+        create_article(self.user, title='Flask basics')
+        Topic.objects.create(user=self.user, name='Django')
+        Topic.objects.create(user=self.other_user, name='django ')
+        Topic.objects.create(user=self.user, name='Databases')
+
+    def test_prefix_matches(self):
+        """Test titles and normalized topics matching the prefix are returned."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'Dj'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['title'] for t in res.data['titles']],
+                         ['Django testing', 'Django tips'])
+        self.assertEqual(res.data['topics'], ['django'])
+
+    def test_limit(self):
+        """Test the number of suggestions can be limited."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'dj', 'limit': 1})
+
+        self.assertEqual([t['title'] for t in res.data['titles']],
+                         ['Django testing'])
+        self.assertEqual(res.data['topics'], ['django'])
+
+    def test_results_cached_by_normalized_query(self):
+        """Test equivalent queries are served from the cache."""
+        self.client.get(AUTOCOMPLETE_URL, {'q': 'django'})
+
+        with self.assertNumQueries(0):
+            res = self.client.get(AUTOCOMPLETE_URL, {'q': '  DJANGO '})
+
+        self.assertEqual(res.data['query'], 'django')
+        self.assertEqual(len(res.data['titles']), 2)
+
+    def test_empty_query(self):
+        """Test an empty query returns no suggestions."""
+        res = self.client.get(AUTOCOMPLETE_URL)
+
+        self.assertEqual(res.data['titles'], [])
+        self.assertEqual(res.data['topics'], [])
+
+    def test_short_query(self):
+        """Test queries below the minimum length return no suggestions."""
+        with self.assertNumQueries(0):
+            res = self.client.get(AUTOCOMPLETE_URL, {'q': 'd'})
+
+        self.assertEqual(res.data['titles'], [])
+        self.assertEqual(res.data['topics'], [])
+
+    def test_no_fuzzy_matches_for_short_queries(self):
+        """Test short queries are only matched by prefix."""
+        with patch('article.autocomplete.has_trigram') as has_trigram_mock:
+            res = self.client.get(AUTOCOMPLETE_URL, {'q': 'fl'})
+
+        has_trigram_mock.assert_not_called()
+        self.assertEqual([t['title'] for t in res.data['titles']],
+                         ['Flask basics'])
+
+    def test_fuzzy_matches(self):
+        """Test misspelled queries match with pg_trgm installed."""
+        if not has_trigram():
+            self.skipTest('pg_trgm is not installed.')
+
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'flsk'})
+
+        self.assertEqual(res.data['titles'][0]['title'], 'Flask basics')
+
+
+class AutocompletePlanTests(TestCase):
+    """Test prefix matches are served by indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        Article.objects.bulk_create(
+            Article(user=user, title=f'Article {i}', opening='opening',
+                    content='content')
+            for i in range(5000))
+        Topic.objects.bulk_create(
+            Topic(user=user, name=f'Topic {i}') for i in range(5000))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_prefix_matches_use_indexes(self):
+        """Test prefix lookups use the lower() pattern indexes."""
+        title_plan = title_prefix_matches('article 123').explain()
+        topic_plan = topic_prefix_matches('topic 123').explain()
+
+        self.assertIn('article_title_prefix_idx', title_plan)
+        self.assertIn('topic_name_prefix_idx', topic_plan)
+
+    def test_ordered_prefix_matches_stop_at_limit(self):
+        """Test sorted suggestions are read in index order without a sort."""
+        plan = title_prefix_matches('article').order_by(
+            'title_key')[:10].explain()
+
+        self.assertIn('article_title_prefix_idx', plan)
+        self.assertNotIn('Sort', plan)
@@ -0,0 +1,187 @@
+"""
+Test for HTTP cache headers and purging of article responses.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.models import Article
+from app.utils.cache_purge import HTTPPurger, get_purger
+
+
+ARTICLES_URL = reverse('article:articles-list')
+AUTOCOMPLETE_URL = reverse('article:articles-autocomplete')
+
+
+def article_detail_url(article_id):
+    """Create and return an article manage URL."""
+    return reverse('article:article-detail', args=[article_id])
+
+
+def comments_url(article_id):
+    """Create and return an article comments URL."""
+    return reverse('article:comment-list-create', args=[article_id])
+
+
+def likes_url(article_id):
+    """Create and return an article likes URL."""
+    return reverse('article:like-list-create', args=[article_id])
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+@override_settings(CACHE_PURGER='app.utils.cache_purge.MemoryPurger',
+                   CACHE_PURGER_OPTIONS={})
+class CachePolicyAPITests(TestCase):
+    """Test cache headers and purges of article APIs."""
+
+    def setUp(self):
+        get_purger.cache_clear()
+        self.addCleanup(get_purger.cache_clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.article = create_article(self.user)
+
+    def test_anonymous_list_public(self):
+        """Test anonymous list responses are cacheable and tagged."""
+        res = self.client.get(ARTICLES_URL)
+
+        self.assertEqual(
+            res['Cache-Control'],
+            'public, max-age=30, s-maxage=300, stale-while-revalidate=60')
+        self.assertIn('Authorization', res['Vary'])
+        keys = res['Surrogate-Key'].split()
+        self.assertIn('articles', keys)
+        self.assertIn(f'article-{self.article.id}', keys)
+        self.assertIn(f'author-{self.user.id}', keys)
+
+    def test_authenticated_list_private(self):
+        """Test responses to authenticated clients are kept private."""
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.get(ARTICLES_URL)
+
+        self.assertEqual(res['Cache-Control'], 'private, no-cache')
+
+    def test_uncached_action(self):
+        """Test actions outside the policy get no cache headers."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'test'})
+
+        self.assertFalse(res.has_header('Cache-Control'))
+
+    def test_article_update_purges(self):
+        """Test updating an article purges its responses."""
+        self.client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(article_detail_url(self.article.id),
+                              {'title': 'New title'})
+
+        self.assertIn(f'article-{self.article.id}', get_purger().purged)
+
+    def test_article_create_purges_list(self):
+        """Test creating an article purges the article lists."""
+        self.client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('article:article-list'), {
+                'title': 'Title', 'opening': 'Opening', 'content': 'Content'})
+
+        self.assertIn('articles', get_purger().purged)
+        self.assertIn(f'author-{self.user.id}', get_purger().purged)
+
+    def test_comment_and_like_purge(self):
+        """Test comments and likes purge their article."""
+        self.client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(comments_url(self.article.id),
+                             {'content': 'Comment'})
+            self.client.post(likes_url(self.article.id))
+
+        self.assertEqual(get_purger().purged,
+                         [f'article-{self.article.id}'] * 2)
+
+
+class HTTPPurgerTests(SimpleTestCase):
+    """Test purging through an HTTP cache."""
+
+    def setUp(self):
+        self.received = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PURGE(self):
+                test.entered.set()
+                test.release.wait(5)
+                test.received.append(
+                    (self.command, self.headers['Surrogate-Key']))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(server.shutdown)
+        self.addCleanup(self.release.set)
+        self.url = f'http://127.0.0.1:{server.server_port}/'
+
+    def test_purge_request(self):
+        """Test keys are sent in a PURGE request."""
+        self.release.set()
+        purger = HTTPPurger([self.url])
+
+        purger.purge(['article-1', 'author-2'])
+        purger.join()
+
+        self.assertEqual(self.received, [('PURGE', 'article-1 author-2')])
+
+    def test_purge_does_not_wait(self):
+        """Test purging returns before the cache node answers."""
+        purger = HTTPPurger([self.url])
+
+        purger.purge(['article-1'])
+        self.assertTrue(self.entered.wait(5))
+
+        self.assertEqual(self.received, [])
+        self.release.set()
+        purger.join()
+        self.assertEqual(self.received, [('PURGE', 'article-1')])
+
+    def test_queued_keys_batched(self):
+        """Test keys queued meanwhile are merged into batches."""
+        purger = HTTPPurger([self.url], batch_size=2)
+        purger.purge(['article-1'])
+        self.assertTrue(self.entered.wait(5))
+
+        purger.purge(['article-2', 'article-3'])
+        purger.purge(['article-3', 'article-4'])
+        self.release.set()
+        purger.join()
+
+        self.assertEqual([keys for _, keys in self.received], [
+            'article-1', 'article-2 article-3', 'article-4'])
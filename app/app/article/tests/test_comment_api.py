@@ -102,9 +102,55 @@ class PrivateCommentAPITests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 2)
-        self.assertEqual(res.data[0]['content'], 'Test comment 1')
-        self.assertEqual(res.data[1]['content'], 'Test comment 2')
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertEqual(res.data['results'][0]['content'], 'Test comment 1')
+        self.assertEqual(res.data['results'][1]['content'], 'Test comment 2')
+        self.assertNotIn('total', res.data)
+
+    def test_comments_list_cursor_pagination(self):
+        """Test comments are paged with a cursor in creation order."""
+        article = create_article(self.user)
+        for i in range(7):
+            Comment.objects.create(
+                user=self.user, article=article, content=f'Comment {i}')
+
+        url = list_url(article.id)
+        res1 = self.client.get(url, {'limit': 4})
+        res2 = self.client.get(res1.data['next'])
+
+        contents = [c['content'] for c in
+                    res1.data['results'] + res2.data['results']]
+        self.assertEqual(contents, [f'Comment {i}' for i in range(7)])
+        self.assertIsNone(res2.data['next'])
+
+    def test_comments_list_joins_authors(self):
+        """Test comment authors are fetched in the same query as comments."""
+        article = create_article(self.user)
+        for i in range(5):
+            other_user = get_user_model().objects.create_user(
+                'Other', 'User', f'other{i}@example.com', 'password123')
+            Comment.objects.create(
+                user=other_user, article=article, content=f'Comment {i}')
+
+        url = list_url(article.id)
+        with self.assertNumQueries(1):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['user_name'], 'Other User')
+
+    def test_comments_list_total(self):
+        """Test the total is returned when requested."""
+        article = create_article(self.user)
+        Comment.objects.create(
+            user=self.user, article=article, content='Test comment')
+
+        url = list_url(article.id)
+        res = self.client.get(url, {'total': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total'], 1)
+        self.assertFalse(res.data['total_estimated'])
 
     def test_delete_comment(self):
 
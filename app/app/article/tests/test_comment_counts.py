@@ -0,0 +1,185 @@
+""" 
+Test for comment counts and the latest comment preview.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Article, Comment
+from core.purge import purge_user
+from article.serializers import ArticleSerializer
+
+ARTICLES_URL = reverse('article:articles-list')
+
+
+def list_url(article_id):
+    """Create and return comment list-create url."""
+    return reverse('article:comment-list-create', args=[article_id])
+
+
+def detail_url(comment_id):
+    """Create and return comment url."""
+    return reverse('article:comment-detail', args=[comment_id])
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+    return Article.objects.create(user=user, **defaults)
+
+
+class CommentCountTests(TestCase):
+    """Tests for the maintained comments count."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'Test', 'user@example.com', 'testpass123')
+        self.client.force_authenticate(self.user)
+        self.article = create_article(self.user)
+
+    def _count(self):
+        self.article.refresh_from_db()
+        return self.article.comments_count
+
+    def test_create_comment_counts(self):
+        """Test creating comments increments the count."""
+        for i in range(2):
+            res = self.client.post(list_url(self.article.id),
+                                   {'content': f'Comment {i}'})
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self._count(), 2)
+
+    def test_delete_comment_uncounts(self):
+        """Test deleting a comment decrements the count."""
+        self.client.post(list_url(self.article.id), {'content': 'Comment'})
+        comment = Comment.objects.get()
+
+        res = self.client.delete(detail_url(comment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._count(), 0)
+
+    def test_purge_user_uncounts_comments(self):
+        """Test purging a user removes their comments from the counts."""
+        other = get_user_model().objects.create_user(
+            'Other', 'User', 'other@example.com', 'testpass123')
+        client = APIClient()
+        client.force_authenticate(other)
+        for i in range(3):
+            client.post(list_url(self.article.id), {'content': f'Other {i}'})
+        self.client.post(list_url(self.article.id), {'content': 'Mine'})
+
+        purge_user(other.id, batch_size=2)
+
+        self.assertEqual(self._count(), 1)
+
+    def test_every_path_counted(self):
+        """Test comments created and cascaded outside the views are counted."""
+        other = get_user_model().objects.create_user(
+            'Other', 'User', 'other@example.com', 'testpass123')
+        Comment.objects.bulk_create(
+            Comment(user=other, article=self.article, content=f'Other {i}')
+            for i in range(3))
+        Comment.objects.create(
+            user=self.user, article=self.article, content='Mine')
+
+        self.assertEqual(self._count(), 4)
+        other.delete()
+        self.assertEqual(self._count(), 1)
+
+    def test_edit_keeps_comments_count(self):
+        """Test editing an article doesn't overwrite a concurrent count."""
+        article = Article.objects.get(pk=self.article.pk)
+        self.client.post(list_url(self.article.id), {'content': 'Comment'})
+
+        serializer = ArticleSerializer(
+            article, data={'title': 'New title'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertEqual(self._count(), 1)
+
+    def test_save_keeps_comments_count(self):
+        """Test saving a loaded article doesn't write its count back."""
+        article = Article.objects.get(pk=self.article.pk)
+        Comment.objects.create(
+            user=self.user, article=self.article, content='Comment')
+
+        article.title = 'New title'
+        article.save()
+
+        self.assertEqual(self._count(), 1)
+
+    def test_count_keeps_updated_at(self):
+        """Test counting a comment moves the sync time, not the edit time."""
+        article = Article.objects.get(pk=self.article.pk)
+
+        Comment.objects.create(
+            user=self.user, article=self.article, content='Comment')
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.updated_at, article.updated_at)
+        self.assertNotEqual(self.article.changed_at, article.changed_at)
+
+    def test_list_includes_comments_count(self):
+        """Test the article list sends the count."""
+        self.client.post(list_url(self.article.id), {'content': 'Comment'})
+
+        res = self.client.get(ARTICLES_URL)
+
+        self.assertEqual(res.data['results'][0]['comments_count'], 1)
+        self.assertNotIn('latest_comment', res.data['results'][0])
+
+
+class LatestCommentPreviewTests(TestCase):
+    """Tests for the latest comment preview of the article list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'Test', 'user@example.com', 'testpass123')
+
+    def test_latest_comment_preview(self):
+        """Test each article has its newest comment or None."""
+        first = create_article(self.user, title='First')
+        second = create_article(self.user, title='Second')
+        create_article(self.user, title='Empty')
+        for article, contents in [(first, ['a', 'b']), (second, ['c'])]:
+            for content in contents:
+                Comment.objects.create(
+                    user=self.user, article=article, content=content)
+
+        res = self.client.get(ARTICLES_URL, {'include': 'latest_comment'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        previews = {a['title']: a['latest_comment'] for a in res.data['results']}
+        self.assertEqual(previews['First']['content'], 'b')
+        self.assertEqual(previews['Second']['content'], 'c')
+        self.assertIsNone(previews['Empty'])
+
+    def test_latest_comment_preview_single_query(self):
+        """Test the previews of a page are fetched in one query."""
+        for i in range(5):
+            article = create_article(self.user, title=f'Article {i}')
+            Comment.objects.create(
+                user=self.user, article=article, content='Comment')
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ARTICLES_URL, {'include': 'latest_comment'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        comment_queries = [q for q in queries
+                           if 'FROM "core_comment"' in q['sql']]
+        self.assertEqual(len(comment_queries), 1)
+        self.assertIn('ROW_NUMBER()', comment_queries[0]['sql'])
@@ -0,0 +1,160 @@
+"""
+Test for live article events.
+"""
+
+import asyncio
+import threading
+from unittest import mock
+
+import psycopg2
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Article
+from rest_framework.authtoken.models import Token
+from app.utils.pubsub import InMemoryBackend, PostgresBackend, get_backend
+from article.events import article_channel
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+class InMemoryBackendTests(TestCase):
+    """Tests for the in-memory pubsub backend."""
+
+    def test_fan_out_to_subscribers(self):
+        """Test messages published from a thread reach every subscriber."""
+        backend = InMemoryBackend()
+
+        async def run():
+            subscribers = [backend.subscribe('channel') for _ in range(3)]
+            other = backend.subscribe('other')
+            thread = threading.Thread(
+                target=backend.publish, args=('channel', {'n': 1}))
+            thread.start()
+            thread.join()
+            messages = [await asyncio.wait_for(s.get(), 1) for s in subscribers]
+            self.assertTrue(other.queue.empty())
+            for subscription in subscribers + [other]:
+                subscription.close()
+            return messages
+
+        messages = asyncio.run(run())
+
+        self.assertEqual(messages, [{'n': 1}] * 3)
+        self.assertEqual(backend.subscriber_count('channel'), 0)
+
+    def test_slow_subscriber_drops_oldest(self):
+        """Test a full queue keeps only the newest messages."""
+        backend = InMemoryBackend(queue_size=2)
+
+        async def run():
+            subscription = backend.subscribe('channel')
+            for n in range(3):
+                backend.publish('channel', n)
+            await asyncio.sleep(0)
+            return [await subscription.get(), await subscription.get()]
+
+        self.assertEqual(asyncio.run(run()), [1, 2])
+
+
+class ArticleEventsTests(TestCase):
+    """Tests for events published by the article views."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.client.force_authenticate(self.user)
+        self.article = create_article(self.user)
+        self.loop = asyncio.new_event_loop()
+        self.subscription = get_backend().subscribe(
+            article_channel(self.article.id), loop=self.loop)
+
+    def tearDown(self):
+        self.subscription.close()
+        self.loop.close()
+
+    def next_message(self):
+        return self.loop.run_until_complete(
+            asyncio.wait_for(self.subscription.get(), 1))
+
+    def test_comment_publishes_event(self):
+        """Test creating a comment publishes it to subscribers."""
+        url = reverse('article:comment-list-create', args=[self.article.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'content': 'Live comment'})
+
+        message = self.next_message()
+
+        self.assertEqual(message['type'], 'comment.created')
+        self.assertEqual(message['comment']['content'], 'Live comment')
+
+    def test_like_publishes_count(self):
+        """Test liking and unliking publish the like count."""
+        url = reverse('article:like-list-create', args=[self.article.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url)
+        liked = self.next_message()
+        url = reverse('article:like-delete', args=[self.article.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(url)
+        unliked = self.next_message()
+
+        self.assertEqual(liked['type'], 'likes.changed')
+        self.assertEqual(liked['likes_count'], 1)
+        self.assertEqual(unliked['likes_count'], 0)
+
+    def test_event_stream_requires_token(self):
+        """Test the event stream rejects unauthenticated clients."""
+        url = reverse('article:article-events', args=[self.article.id])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_event_stream_missing_article(self):
+        """Test the event stream of a missing article is not found."""
+        token = Token.objects.create(user=self.user)
+        url = reverse('article:article-events', args=[self.article.id + 1])
+        res = self.client.get(url, {'token': token.key})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StopListening(BaseException):
+    """Ends the listener loop in tests."""
+
+
+class PostgresBackendTests(TestCase):
+    """Tests for the LISTEN/NOTIFY listener."""
+
+    def test_listener_reconnects(self):
+        """Test a failed connection is logged and retried with backoff."""
+        backend = PostgresBackend()
+        conn = mock.Mock()
+        connect = mock.Mock(side_effect=[
+            psycopg2.OperationalError('server closed the connection'), conn])
+        receive = mock.Mock(side_effect=StopListening)
+
+        with mock.patch.object(backend, '_connect', connect), \
+                mock.patch.object(backend, '_receive', receive), \
+                mock.patch('app.utils.pubsub.time.sleep') as sleep, \
+                self.assertLogs('app.utils.pubsub', 'ERROR'):
+            with self.assertRaises(StopListening):
+                backend._listen()
+
+        sleep.assert_called_once_with(backend.reconnect_delay)
+        receive.assert_called_once_with(conn)
+        conn.close.assert_called_once()
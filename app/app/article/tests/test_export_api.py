@@ -0,0 +1,122 @@
+"""
+Test for article export API.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.models import Article, Comment, Topic
+
+EXPORT_URL = reverse('article:export')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+def read_stream(res):
+    """Return the full body of a streaming response."""
+    return b''.join(res.streaming_content)
+
+
+class ExportAPITests(TestCase):
+    """Tests for streaming exports."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        topic = Topic.objects.create(user=self.user, name='Python')
+        for i in range(3):
+            article = create_article(self.user, title=f'Title {i}')
+            article.topics.add(topic)
+            Comment.objects.create(
+                user=self.user, article=article, content=f'Comment {i}')
+
+    def test_export_requires_staff(self):
+        """Test only staff users can export."""
+        other = get_user_model().objects.create_user(
+            'Other', 'User', 'other@example.com', 'testpass123')
+        self.client.force_authenticate(other)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_articles_ndjson(self):
+        """Test articles are exported as one JSON document per line."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line)
+                for line in read_stream(res).decode().splitlines()]
+        self.assertEqual([r['title'] for r in rows],
+                         ['Title 0', 'Title 1', 'Title 2'])
+        self.assertEqual(rows[0]['topics'], ['Python'])
+
+    def test_export_comments_csv(self):
+        """Test comments are exported as CSV with a header."""
+        res = self.client.get(EXPORT_URL, {'kind': 'comments', 'output': 'csv'})
+
+        rows = list(csv.DictReader(io.StringIO(read_stream(res).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['content'], 'Comment 0')
+        self.assertEqual(rows[0]['author'], 'Test User')
+
+    def test_export_gzip(self):
+        """Test the export is compressed when the client accepts gzip."""
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(read_stream(res)).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_export_sync_iterator_under_wsgi(self):
+        """Test WSGI servers get a sync iterator."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertFalse(res.is_async)
+
+    async def test_export_async_iterator_under_asgi(self):
+        """Test ASGI servers get an async iterator they don't buffer."""
+        token = await Token.objects.acreate(user=self.user)
+        res = await self.async_client.get(
+            EXPORT_URL, headers={'Authorization': f'Token {token.key}'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        body = b''.join([chunk async for chunk in res.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 3)
+
+    def test_export_command(self):
+        """Test the management command writes a gzipped export file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'articles.ndjson.gz')
+            call_command('export_content', '--output', path,
+                         '--chunk-size', '2', stderr=io.StringIO())
+            with gzip.open(path, 'rt') as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 3)
@@ -2,12 +2,14 @@
 Test for likes APIs.
 """
 
+from io import StringIO
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from core.models import Article, Like
+from core.models import Article, Like, PendingLike
 
 
 def list_url(article_id):
@@ -20,6 +22,9 @@ def delete_url(article_id):
     return reverse('article:like-delete', args=[article_id])
 
 
+ARTICLES_URL = reverse('article:articles-list')
+
+
 def create_article(user, **params):
     """Create and return a sample article."""
     defaults = {
@@ -147,4 +152,107 @@ class PrivateLikeAPITests(TestCase):
         self.assertEqual(likes_list_res.status_code, status.HTTP_200_OK)
         likes_count = Like.objects.filter(
             article_id=article.id).count()
-        self.assertEqual(len(likes_list_res.data), likes_count)
+        self.assertEqual(likes_list_res.data['count'], likes_count)
+        self.assertEqual(len(likes_list_res.data['results']), likes_count)
+        self.assertEqual(
+            likes_list_res.data['results'][0]['article_id'], str(article.id))
+
+    def test_retrieve_likes_paginated(self):
+        """Test likes are paged with a cursor and one joined query."""
+        article = create_article(user=self.user)
+        for i in range(5):
+            liker = get_user_model().objects.create_user(
+                'Liker', 'User', f'liker{i}@example.com', 'test123')
+            Like.objects.create(user=liker, article=article)
+
+        url = list_url(article.id)
+        with self.assertNumQueries(2):
+            res1 = self.client.get(url, {'limit': 3})
+        res2 = self.client.get(res1.data['next'])
+
+        self.assertEqual(res1.data['count'], 5)
+        self.assertEqual(len(res1.data['results']), 3)
+        self.assertEqual(len(res2.data['results']), 2)
+        self.assertIsNone(res2.data['next'])
+        self.assertEqual(res1.data['results'][0]['user_name'], 'Liker User')
+
+
+@override_settings(LIKES_WRITE_BEHIND=True)
+class WriteBehindLikeAPITests(TestCase):
+    """Test likes buffered in write-behind mode."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'Test', 'user@example.com', 'testpass123')
+        self.client.force_authenticate(self.user)
+        self.article = create_article(user=self.user)
+
+    def test_like_buffered(self):
+        """Test likes are accepted into the buffer and counted."""
+        res = self.client.post(list_url(self.article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Like.objects.exists())
+        self.assertTrue(PendingLike.objects.filter(
+            user_id=self.user.id, article_id=self.article.id).exists())
+        res = self.client.get(ARTICLES_URL)
+        self.assertEqual(res.data['results'][0]['likes_count'], 1)
+
+    def test_like_deduplicated(self):
+        """Test pending and flushed likes can't be repeated."""
+        url = list_url(self.article.id)
+        self.client.post(url)
+        res = self.client.post(url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        call_command('flush_likes', stdout=StringIO())
+        res = self.client.post(url)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertFalse(PendingLike.objects.exists())
+
+    def test_unlike_pending(self):
+        """Test a buffered like can be removed before it is flushed."""
+        self.client.post(list_url(self.article.id))
+
+        res = self.client.delete(delete_url(self.article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(PendingLike.objects.exists())
+
+    def test_flush_keeps_counts(self):
+        """Test flushing moves likes without changing counts."""
+        for i in range(3):
+            liker = get_user_model().objects.create_user(
+                'Liker', 'User', f'liker{i}@example.com', 'test123')
+            self.client.force_authenticate(liker)
+            self.client.post(list_url(self.article.id))
+        PendingLike.objects.create(user_id=self.user.id, article_id=0)
+
+        call_command('flush_likes', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(Like.objects.filter(
+            article=self.article).count(), 3)
+        self.assertFalse(PendingLike.objects.exists())
+        res = self.client.get(ARTICLES_URL)
+        self.assertEqual(res.data['results'][0]['likes_count'], 3)
+
+    def test_list_counts_pending_likes(self):
+        """Test the likes list count includes buffered likes."""
+        self.client.post(list_url(self.article.id))
+
+        res = self.client.get(list_url(self.article.id))
+
+        self.assertEqual(res.data['count'], 1)
+
+    def test_flush_keeps_created_at(self):
+        """Test flushed likes keep the time they were given."""
+        self.client.post(list_url(self.article.id))
+        pending = PendingLike.objects.get()
+
+        call_command('flush_likes', stdout=StringIO())
+
+        self.assertEqual(Like.objects.get().created_at, pending.created_at)
@@ -0,0 +1,150 @@
+"""
+Test for related articles API.
+"""
+
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Article, PendingRelatedUpdate, Topic, RelatedArticle
+from app.utils.cache_purge import get_purger
+from article.related import rebuild_related, update_related
+
+
+def related_url(article_id):
+    """Create and return related articles url."""
+    return reverse('article:articles-related', args=[article_id])
+
+
+def detail_url(article_id):
+    """Create and return article url."""
+    return reverse('article:article-detail', args=[article_id])
+
+
+def create_article(user, topics=(), **params):
+    """Create and return a sample article with topics."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    for name in topics:
+        topic, _ = Topic.objects.get_or_create(user=user, name=name)
+        article.topics.add(topic)
+    return article
+
+
+class RelatedArticlesAPITests(TestCase):
+    """Tests for the related articles index."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.other_user = get_user_model().objects.create_user(
+            'Other', 'User', 'other@example.com', 'testpass123')
+
+    def test_rebuild_ranks_by_topic_overlap(self):
+        """Test articles sharing more topics rank higher."""
+        article = create_article(
+            self.user, ['Python', 'Django', 'Testing'], title='Main')
+        close = create_article(
+            self.other_user, [' python', 'DJANGO'], title='Close')
+        far = create_article(self.other_user, ['Testing', 'Go'], title='Far')
+        create_article(self.user, ['Cooking'], title='Unrelated')
+
+        call_command('build_related_articles', stdout=StringIO())
+        res = self.client.get(related_url(article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['id'] for a in res.data], [close.id, far.id])
+        self.assertAlmostEqual(res.data[0]['score'], 2 / (3 * 2) ** 0.5)
+
+    def test_rebuild_limits_neighbours(self):
+        """Test only the top neighbours are stored."""
+        for i in range(4):
+            create_article(self.user, ['Python'], title=f'Article {i}')
+
+        call_command('build_related_articles', '--top-k', '2',
+                     stdout=StringIO())
+
+        for article in Article.objects.all():
+            self.assertEqual(
+                RelatedArticle.objects.filter(article=article).count(), 2)
+
+    def test_topic_update_refreshes_index(self):
+        """Test changing topics through the API updates related articles."""
+        article = create_article(self.user, ['Cooking'], title='Main')
+        python = create_article(self.other_user, ['Python'], title='Python')
+        call_command('build_related_articles', stdout=StringIO())
+        self.assertFalse(RelatedArticle.objects.exists())
+
+        self.client.force_authenticate(self.user)
+        payload = {'topics': [{'name': 'Python'}]}
+        res = self.client.patch(detail_url(article.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(RelatedArticle.objects.exists())
+        self.assertTrue(PendingRelatedUpdate.objects.filter(
+            article_id=article.id).exists())
+        call_command('build_related_articles', '--pending', stdout=StringIO())
+        self.assertFalse(PendingRelatedUpdate.objects.exists())
+        self.assertTrue(RelatedArticle.objects.filter(
+            article=article, related=python).exists())
+        self.assertTrue(RelatedArticle.objects.filter(
+            article=python, related=article).exists())
+
+        payload = {'topics': [{'name': 'Cooking'}]}
+        self.client.patch(detail_url(article.id), payload, format='json')
+        call_command('build_related_articles', '--pending', stdout=StringIO())
+
+        self.assertFalse(RelatedArticle.objects.exists())
+
+    @override_settings(CACHE_PURGER='app.utils.cache_purge.MemoryPurger',
+                       CACHE_PURGER_OPTIONS={})
+    def test_pending_update_purges_related_lists(self):
+        """Test updating the index purges every touched related list."""
+        get_purger.cache_clear()
+        self.addCleanup(get_purger.cache_clear)
+        article = create_article(self.user, ['Python'], title='Main')
+        python = create_article(self.other_user, ['Python'], title='Python')
+        PendingRelatedUpdate.objects.create(article_id=article.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('build_related_articles', '--pending',
+                         stdout=StringIO())
+
+        purged = get_purger().purged
+        self.assertIn(f'article-{article.id}', purged)
+        self.assertIn(f'article-{python.id}', purged)
+
+    @override_settings(CACHE_PURGER='app.utils.cache_purge.MemoryPurger',
+                       CACHE_PURGER_OPTIONS={})
+    def test_update_enters_only_lists_it_beats(self):
+        """Test an article only replaces the last neighbour it outscores."""
+        get_purger.cache_clear()
+        self.addCleanup(get_purger.cache_clear)
+        hub = create_article(self.user, ['Python', 'Django'], title='Hub')
+        twin = create_article(self.other_user, ['Python', 'Django'],
+                              title='Twin')
+        solo = create_article(self.other_user, ['Python', 'Rust'],
+                              title='Solo')
+        rebuild_related(top_k=1)
+        article = create_article(self.user, ['Python'], title='Main')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_related(article, top_k=1)
+
+        self.assertEqual(list(RelatedArticle.objects.filter(
+            article=hub).values_list('related_id', flat=True)), [twin.id])
+        self.assertEqual(list(RelatedArticle.objects.filter(
+            article=solo).values_list('related_id', flat=True)), [article.id])
+        purged = get_purger().purged
+        self.assertIn(f'article-{solo.id}', purged)
+        self.assertNotIn(f'article-{hub.id}', purged)
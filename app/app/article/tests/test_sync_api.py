@@ -0,0 +1,162 @@
+"""
+Test for article sync API.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import Article
+
+SYNC_URL = reverse('article:articles-sync')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+@override_settings(SYNC_CURSOR_LAG_SECONDS=0)
+class ArticleSyncAPITests(TestCase):
+    """Tests for syncing article changes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+
+    def test_initial_sync_returns_all_articles(self):
+        """Test syncing without a cursor returns every article."""
+        articles = [create_article(self.user, title=f'Title {i}')
+                    for i in range(3)]
+
+        res = self.client.get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['id'] for a in res.data['changed']],
+                         [a.id for a in articles])
+        self.assertEqual(res.data['deleted'], [])
+        self.assertFalse(res.data['has_more'])
+
+    def test_sync_returns_only_changes(self):
+        """Test syncing with a cursor returns updated and deleted articles."""
+        updated = create_article(self.user, title='Updated')
+        deleted = create_article(self.user, title='Deleted')
+        create_article(self.user, title='Untouched')
+        cursor = self.client.get(SYNC_URL).data['cursor']
+
+        updated.title = 'New title'
+        updated.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        created = create_article(self.user, title='Created')
+        res = self.client.get(SYNC_URL, {'cursor': cursor})
+
+        self.assertEqual([a['id'] for a in res.data['changed']],
+                         [updated.id, created.id])
+        self.assertEqual(res.data['deleted'], [deleted_id])
+
+        res = self.client.get(SYNC_URL, {'cursor': res.data['cursor']})
+
+        self.assertEqual(res.data['changed'], [])
+        self.assertEqual(res.data['deleted'], [])
+
+    def test_sync_in_bounded_batches(self):
+        """Test changes are returned in batches of at most limit."""
+        articles = [create_article(self.user, title=f'Title {i}')
+                    for i in range(5)]
+
+        res1 = self.client.get(SYNC_URL, {'limit': 3})
+        res2 = self.client.get(
+            SYNC_URL, {'limit': 3, 'cursor': res1.data['cursor']})
+
+        self.assertTrue(res1.data['has_more'])
+        self.assertFalse(res2.data['has_more'])
+        ids = [a['id'] for a in res1.data['changed'] + res2.data['changed']]
+        self.assertEqual(ids, [a.id for a in articles])
+
+    def test_sync_invalid_cursor(self):
+        """Test an invalid cursor is rejected."""
+        res = self.client.get(SYNC_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(SYNC_CURSOR_LAG_SECONDS=60)
+class ArticleSyncLagTests(TestCase):
+    """Tests for changes committing behind a handed out cursor."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+
+    def _backdate(self, article, seconds):
+        Article.objects.filter(pk=article.pk).update(
+            changed_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_late_commit_sent(self):
+        """Test a change saved before the cursor but committed later is sent."""
+        seen = create_article(self.user, title='Seen')
+        self._backdate(seen, 30)
+        cursor = self.client.get(SYNC_URL).data['cursor']
+
+        late = create_article(self.user, title='Late')
+        self._backdate(late, 45)
+        res = self.client.get(SYNC_URL, {'cursor': cursor})
+
+        self.assertIn(late.id, [a['id'] for a in res.data['changed']])
+
+    def test_old_changes_not_resent(self):
+        """Test changes older than the lag are sent once."""
+        article = create_article(self.user)
+        self._backdate(article, 600)
+        cursor = self.client.get(SYNC_URL).data['cursor']
+
+        res = self.client.get(SYNC_URL, {'cursor': cursor})
+
+        self.assertEqual(res.data['changed'], [])
+
+    def test_like_sends_article(self):
+        """Test a new like sends the article with its like count."""
+        article = create_article(self.user)
+        self._backdate(article, 600)
+        cursor = self.client.get(SYNC_URL).data['cursor']
+
+        self.client.force_authenticate(self.user)
+        self.client.post(reverse('article:like-list-create', args=[article.id]))
+        res = self.client.get(SYNC_URL, {'cursor': cursor})
+
+        self.assertEqual([(a['id'], a['likes_count'])
+                          for a in res.data['changed']], [(article.id, 1)])
+
+    @override_settings(LIKES_WRITE_BEHIND=True)
+    def test_buffered_like_sent_after_flush(self):
+        """Test a buffered like leaves the article row alone until flushed."""
+        article = create_article(self.user)
+        self._backdate(article, 600)
+        changed_at = Article.objects.get().changed_at
+        cursor = self.client.get(SYNC_URL).data['cursor']
+
+        self.client.force_authenticate(self.user)
+        self.client.post(reverse('article:like-list-create', args=[article.id]))
+
+        self.assertEqual(Article.objects.get().changed_at, changed_at)
+        call_command('flush_likes', stdout=StringIO())
+        res = self.client.get(SYNC_URL, {'cursor': cursor})
+        self.assertEqual([(a['id'], a['likes_count'])
+                          for a in res.data['changed']], [(article.id, 1)])
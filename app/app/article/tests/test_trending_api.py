@@ -0,0 +1,166 @@
+"""
+Test for trending articles API.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import (
+    Article, Comment, Like, PendingLike, TrendingArticle, TrendingWatermark)
+from article.trending import refresh_trending
+
+TRENDING_URL = reverse('article:trending-list')
+
+
+def create_user(email):
+    """Create and return a sample user."""
+    return get_user_model().objects.create_user(
+        'Test', 'User', email, 'testpass123')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+@override_settings(TRENDING_LAG_SECONDS=0)
+class TrendingAPITests(TestCase):
+    """Tests for trending refresh and listing."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user('user@example.com')
+        self.likers = [create_user(f'liker{i}@example.com') for i in range(3)]
+
+    def test_trending_ranks_by_activity(self):
+        """Test articles with more activity rank higher."""
+        quiet = create_article(self.user, title='Quiet')
+        busy = create_article(self.user, title='Busy')
+        Like.objects.create(user=self.likers[0], article=quiet)
+        for liker in self.likers:
+            Like.objects.create(user=liker, article=busy)
+        Comment.objects.create(user=self.user, article=busy, content='Nice')
+
+        call_command('refresh_trending', stdout=StringIO())
+        res = self.client.get(TRENDING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['title'] for a in res.data], ['Busy', 'Quiet'])
+        self.assertGreater(res.data[0]['score'], res.data[1]['score'])
+
+    def test_trending_decays_old_activity(self):
+        """Test recent activity outranks older activity of the same size."""
+        old = create_article(self.user, title='Old')
+        new = create_article(self.user, title='New')
+        for liker in self.likers[:2]:
+            Like.objects.create(user=liker, article=old)
+        Like.objects.filter(article=old).update(
+            created_at=timezone.now() - timedelta(days=3))
+        Like.objects.create(user=self.likers[2], article=new)
+
+        call_command('refresh_trending', stdout=StringIO())
+        res = self.client.get(TRENDING_URL)
+
+        self.assertEqual([a['title'] for a in res.data], ['New', 'Old'])
+
+    def test_refresh_is_incremental(self):
+        """Test refresh only folds in rows newer than the watermark."""
+        article = create_article(self.user)
+        Like.objects.create(user=self.likers[0], article=article)
+
+        call_command('refresh_trending', stdout=StringIO())
+        first = TrendingArticle.objects.get(article=article).score
+        call_command('refresh_trending', stdout=StringIO())
+        unchanged = TrendingArticle.objects.get(article=article).score
+        Like.objects.create(user=self.likers[1], article=article)
+        call_command('refresh_trending', stdout=StringIO())
+        second = TrendingArticle.objects.get(article=article).score
+
+        mark = TrendingWatermark.objects.get()
+        self.assertEqual(first, unchanged)
+        self.assertGreater(second, first)
+        self.assertGreater(mark.folded_until,
+                           Like.objects.latest('created_at').created_at)
+
+    def test_trending_limit(self):
+        """Test the number of returned articles can be limited."""
+        for i in range(3):
+            article = create_article(self.user, title=f'Article {i}')
+            Like.objects.create(user=self.likers[i], article=article)
+
+        call_command('refresh_trending', stdout=StringIO())
+        with self.assertNumQueries(1):
+            res = self.client.get(TRENDING_URL, {'limit': 2})
+
+        self.assertEqual(len(res.data), 2)
+
+
+@override_settings(TRENDING_LAG_SECONDS=60)
+class TrendingLagTests(TestCase):
+    """Tests for the lag of the trending watermark behind now."""
+
+    def setUp(self):
+        self.user = create_user('user@example.com')
+        self.article = create_article(self.user)
+
+    def test_recent_events_folded_after_lag(self):
+        """Test events younger than the lag are folded by a later refresh."""
+        Like.objects.create(user=self.user, article=self.article)
+
+        self.assertEqual(refresh_trending(), 0)
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('article.trending.timezone.now', return_value=later):
+            self.assertEqual(refresh_trending(), 1)
+
+        self.assertTrue(TrendingArticle.objects.filter(
+            article=self.article).exists())
+
+    def test_late_commit_not_skipped(self):
+        """Test an event committed after a higher id was folded is counted."""
+        other = create_user('other@example.com')
+        # The lower id is taken by a transaction that commits late.
+        reserved = Like.objects.create(user=self.user, article=self.article)
+        reserved_id = reserved.id
+        reserved.delete()
+        first = Like.objects.create(user=other, article=self.article)
+        Like.objects.filter(pk=first.pk).update(
+            created_at=timezone.now() - timedelta(minutes=5))
+        refresh_trending()
+        score = TrendingArticle.objects.get(article=self.article).score
+
+        Like.objects.create(
+            id=reserved_id, user=self.user, article=self.article,
+            created_at=timezone.now() - timedelta(seconds=30))
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('article.trending.timezone.now', return_value=later):
+            refresh_trending()
+
+        self.assertGreater(
+            TrendingArticle.objects.get(article=self.article).score, score)
+
+    def test_pending_likes_not_skipped(self):
+        """Test a buffered like is folded once flushed with its own time."""
+        PendingLike.objects.create(
+            user_id=self.user.id, article_id=self.article.id)
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('article.trending.timezone.now', return_value=later):
+            self.assertEqual(refresh_trending(), 0)
+
+        call_command('flush_likes', stdout=StringIO())
+        with mock.patch('article.trending.timezone.now', return_value=later):
+            self.assertEqual(refresh_trending(), 1)
@@ -0,0 +1,172 @@
+"""
+Test for article view counting.
+"""
+
+import threading
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import (
+    TestCase, TransactionTestCase, SimpleTestCase, override_settings)
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Article
+from app.utils.hyperloglog import HyperLogLog
+from article.serializers import ArticleSerializer
+from article.view_counts import view_buffer, view_stats
+
+
+def articles_detail_url(article_id):
+    """Create and return an article detail URL."""
+    return reverse('article:articles-detail', args=[article_id])
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600, VIEW_COUNT_FLUSH_SIZE=1000)
+class ArticleViewCountTests(TestCase):
+    """Test article views are counted."""
+
+    def setUp(self):
+        view_buffer._take()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.other_user = get_user_model().objects.create_user(
+            'Other', 'User', 'other@example.com', 'testpass123')
+        self.article = create_article(self.user)
+
+    def view(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get(articles_detail_url(self.article.id))
+
+    def test_views_buffered(self):
+        """Test views are counted before they are written."""
+        self.view(self.user)
+        self.view(self.user)
+        res = self.view(self.other_user)
+
+        self.assertEqual(res.data['view_count'], 3)
+        self.assertEqual(res.data['unique_viewers'], 2)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 0)
+
+    def test_stats_read_once(self):
+        """Test the detail response reads the view stats once."""
+        with mock.patch('article.serializers.view_stats',
+                        wraps=view_stats) as stats:
+            res = self.view(self.user)
+
+        stats.assert_called_once()
+        self.assertEqual(res.data['view_count'], 1)
+
+    def test_flush_writes_counts(self):
+        """Test flushing adds hits and merges viewers into the row."""
+        self.view(self.user)
+        self.view(self.other_user)
+        updated_at = Article.objects.get().updated_at
+
+        self.assertEqual(view_buffer.flush(), 1)
+        self.view(self.user)
+        view_buffer.flush()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 3)
+        self.assertEqual(
+            HyperLogLog.from_bytes(self.article.viewers_hll).count(), 2)
+        self.assertEqual(self.article.updated_at, updated_at)
+
+    def test_edit_keeps_counts(self):
+        """Test editing an article doesn't overwrite flushed views."""
+        article = Article.objects.get()
+        self.view(self.other_user)
+        view_buffer.flush()
+
+        serializer = ArticleSerializer(
+            article, data={'title': 'New title'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'New title')
+        self.assertEqual(self.article.view_count, 1)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600, VIEW_COUNT_FLUSH_SIZE=2)
+class BackgroundFlushTests(TransactionTestCase):
+    """Test full buffers are written outside of the request."""
+
+    def setUp(self):
+        view_buffer._take()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        self.client.force_authenticate(self.user)
+        self.article = create_article(self.user)
+
+    def test_flush_when_buffer_full(self):
+        """Test views are written by a background thread once enough are buffered."""
+        url = articles_detail_url(self.article.id)
+        threads = []
+        flush = view_buffer.flush
+
+        def record_thread():
+            threads.append(threading.current_thread())
+            return flush()
+
+        with mock.patch.object(view_buffer, 'flush', side_effect=record_thread):
+            self.client.get(url)
+            self.client.get(url)
+            view_buffer._flusher.join()
+
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 2)
+
+    def test_flush_after_interval(self):
+        """Test a lone view is written once the interval passed."""
+        with self.settings(VIEW_COUNT_FLUSH_INTERVAL=0.5):
+            view_buffer._take()
+            self.client.get(articles_detail_url(self.article.id))
+            timer = view_buffer._timer
+
+        timer.join()
+        view_buffer._flusher.join()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 1)
+
+
+class HyperLogLogTests(SimpleTestCase):
+    """Test the distinct value estimator."""
+
+    def test_estimate(self):
+        """Test large cardinalities are estimated within a few percent."""
+        sketch = HyperLogLog()
+        for i in range(20000):
+            sketch.add(f'user:{i}')
+
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.1)
+
+    def test_merge(self):
+        """Test merged sketches count the union of their values."""
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(100):
+            first.add(str(i))
+            second.add(str(i + 50))
+
+        first.merge(second)
+
+        self.assertAlmostEqual(first.count(), 150, delta=10)
+        self.assertEqual(len(first.to_bytes()), 1024)
@@ -0,0 +1,116 @@
+"""
+Trending articles ranking.
+
+Every like and comment adds `weight * exp(DECAY_RATE * (created_at - EPOCH))`
+to its article's activity, which is the usual exponentially decayed score
+scaled by a factor shared by all articles. Scores are kept as logarithms so
+they never overflow, and only rows newer than the stored watermark are read
+on each refresh.
+
+The watermark is a time kept `TRENDING_LAG_SECONDS` behind now. Ids and
+`created_at` are assigned before commit, so a row can become visible after
+rows with higher values were read; staying behind now by more than the
+longest transaction makes sure every row below the watermark is visible.
+Buffered likes keep the time they were given when flushed, so the watermark
+also stays behind the oldest pending like.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+from core.models import (
+    Comment, Like, PendingLike, TrendingArticle, TrendingWatermark)
+from app.utils.cache_purge import purge
+from article.caching import TRENDING_KEY
+
+
+HALF_LIFE = timedelta(hours=24)
+DECAY_RATE = math.log(2) / HALF_LIFE.total_seconds()
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+
+
+def _logaddexp(a, b):
+    """Return log(exp(a) + exp(b)) without overflowing."""
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def event_score(created_at, weight):
+    """Return the log-space contribution of a single event."""
+    return math.log(weight) + DECAY_RATE * (created_at - EPOCH).total_seconds()
+
+
+def current_score(score, now=None):
+    """Convert a stored log-space score to the decayed activity at `now`."""
+    now = now or timezone.now()
+    return math.exp(score - DECAY_RATE * (now - EPOCH).total_seconds())
+
+
+def _fold_events(queryset, start, end, weight, scores, batch_size):
+    """Fold events created from `start` until `end` into `scores`."""
+    queryset = queryset.filter(created_at__lt=end).order_by('created_at', 'id')
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    after = Q()
+    while True:
+        rows = list(queryset.filter(after).values_list(
+            'id', 'article_id', 'created_at')[:batch_size])
+        for event_id, article_id, created_at in rows:
+            scores[article_id] = _logaddexp(
+                scores.get(article_id), event_score(created_at, weight))
+        if len(rows) < batch_size:
+            return
+        event_id, _, created_at = rows[-1]
+        after = Q(created_at__gt=created_at) | Q(
+            created_at=created_at, id__gt=event_id)
+
+
+def refresh_trending(batch_size=5000):
+    """Fold likes and comments newer than the watermark into the ranking.
+
+    Removed likes and comments are not subtracted, their contribution decays
+    away like any other event.
+    """
+    with transaction.atomic():
+        TrendingWatermark.objects.get_or_create(pk=1)
+        mark = TrendingWatermark.objects.select_for_update().get(pk=1)
+
+        scores = {}
+        now = timezone.now()
+        end = now - timedelta(
+            seconds=getattr(settings, 'TRENDING_LAG_SECONDS', 60))
+        pending = PendingLike.objects.aggregate(
+            oldest=Min('created_at'))['oldest']
+        if pending is not None:
+            end = min(end, pending)
+        if mark.folded_until is not None and end <= mark.folded_until:
+            return 0
+        _fold_events(Like.objects.all(), mark.folded_until, end,
+                     LIKE_WEIGHT, scores, batch_size)
+        _fold_events(Comment.objects.all(), mark.folded_until, end,
+                     COMMENT_WEIGHT, scores, batch_size)
+
+        existing = TrendingArticle.objects.in_bulk(list(scores))
+        rows = [
+            TrendingArticle(article_id=article_id, score=_logaddexp(
+                existing[article_id].score if article_id in existing else None, score))
+            for article_id, score in scores.items()
+        ]
+        TrendingArticle.objects.bulk_create(
+            rows, batch_size=batch_size, update_conflicts=True,
+            unique_fields=['article'], update_fields=['score', 'updated_at'])
+
+        mark.folded_until = end
+        mark.refreshed_at = now
+        mark.save()
+        if rows:
+            purge(TRENDING_KEY)
+
+    return len(rows)
@@ -9,11 +9,13 @@ from article import views
 router = DefaultRouter()
 router.register('all', views.ArticleVS, basename='articles')
 router.register('topics', views.TopicViewSet)
+router.register('trending', views.TrendingVS, basename='trending')
 router.register('', views.ArticleMVS, basename='article')
 
 app_name = 'article'
 
 urlpatterns = [
+    path('export/', views.ExportView.as_view(), name='export'),
     path('', include(router.urls)),
     path('<int:pk>/comments/',
          views.CommentListCreateView.as_view(), name='comment-list-create'),
@@ -22,5 +24,6 @@ urlpatterns = [
     path('<int:pk>/likes/', views.LikeListCreateView.as_view(),
          name='like-list-create'),
     path('<int:pk>/likes/remove/', views.LikeDestroyView.as_view(),
-         name='like-delete')
+         name='like-delete'),
+    path('<int:pk>/events/', views.article_events, name='article-events')
 ]
@@ -0,0 +1,148 @@
+"""
+Buffered article view counting.
+
+Views are aggregated per process, a hit count and a HyperLogLog sketch of
+the viewers for each article, and written in bulk by a background thread
+once `VIEW_COUNT_FLUSH_SIZE` hits are buffered or, by a timer armed with
+the first buffered view, `VIEW_COUNT_FLUSH_INTERVAL` seconds later, so
+requests never wait on the row locks. Flushing locks the affected rows, adds
+the hits and merges the sketches, so concurrent flushes from other processes
+are never lost. Views still buffered are written when the process exits,
+only a killed process drops them.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from core.models import Article
+from app.utils.hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+
+class ViewBuffer:
+    """In-process buffer of article views."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._hits = 0
+        self._last_flush = time.monotonic()
+        self._flusher = None
+        self._timer = None
+
+    def record(self, article_id, viewer):
+        """Count a view of an article by a viewer key."""
+        with self._lock:
+            entry = self._pending.setdefault(article_id, [0, HyperLogLog()])
+            entry[0] += 1
+            entry[1].add(viewer)
+            self._hits += 1
+            due = (self._hits >= getattr(settings, 'VIEW_COUNT_FLUSH_SIZE', 1000)
+                   or time.monotonic() - self._last_flush >= self._interval())
+            if not due:
+                self._arm_timer()
+        if due:
+            self.flush_in_background()
+
+    def _interval(self):
+        return getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 10)
+
+    def _arm_timer(self):
+        """Schedule a flush of the buffered views, called with the lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(
+                self._interval(), self.flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending(self, article_id):
+        """Return the buffered hits and sketch of an article."""
+        with self._lock:
+            if article_id not in self._pending:
+                return 0, None
+            hits, sketch = self._pending[article_id]
+            return hits, HyperLogLog(registers=sketch.registers)
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._hits = 0
+            self._last_flush = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return pending
+
+    def _restore(self, pending):
+        with self._lock:
+            for article_id, (hits, sketch) in pending.items():
+                current = self._pending.setdefault(
+                    article_id, [0, HyperLogLog()])
+                current[0] += hits
+                current[1].merge(sketch)
+                self._hits += hits
+            self._arm_timer()
+
+    def flush_in_background(self):
+        """Start a thread writing the buffered views unless one is running."""
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._background_flush, name='view-count-flush',
+                daemon=True)
+            self._flusher.start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write the buffered views, return the number of articles updated."""
+        pending = self._take()
+        if not pending:
+            return 0
+        try:
+            with transaction.atomic():
+                articles = list(Article.objects.select_for_update().filter(
+                    id__in=pending).order_by('id').only(
+                    'id', 'view_count', 'viewers_hll'))
+                for article in articles:
+                    hits, sketch = pending[article.id]
+                    stored = HyperLogLog.from_bytes(article.viewers_hll)
+                    stored.merge(sketch)
+                    article.view_count += hits
+                    article.viewers_hll = stored.to_bytes()
+                Article.objects.bulk_update(
+                    articles, ['view_count', 'viewers_hll'])
+        except DatabaseError:
+            logger.exception('Failed to flush article views.')
+            self._restore(pending)
+            return 0
+        return len(articles)
+
+
+view_buffer = ViewBuffer()
+atexit.register(view_buffer.flush)
+
+
+def viewer_key(request):
+    """Return the key identifying the viewer of a request."""
+    if request.user and request.user.is_authenticated:
+        return f'user:{request.user.id}'
+    return f"addr:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def view_stats(article):
+    """Return the view count and unique viewers of an article."""
+    hits, sketch = view_buffer.pending(article.id)
+    stored = HyperLogLog.from_bytes(article.viewers_hll)
+    if sketch is not None:
+        stored.merge(sketch)
+    return article.view_count + hits, stored.count()
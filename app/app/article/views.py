@@ -2,41 +2,89 @@
 Views for article APIs.
 """
 
+import asyncio
+import json
 from rest_framework import generics, permissions, status, parsers
 from rest_framework.response import Response
 from rest_framework import viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.views import APIView
 from rest_framework import filters
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from core.models import Article, Comment, Topic, Like
-from django.db.models import Count
-from core.pagination import ArticlePagination, CommentPagination
-from article import serializers, permissions
-
-
-class LikeListCreateView(generics.ListCreateAPIView):
+from rest_framework.authtoken.models import Token
+from app.utils.timing import ServerTimingMixin
+from core.models import Article, Comment, Topic, Like, TrendingArticle, RelatedArticle
+from django.db.models import Prefetch
+from core.pagination import ArticlePagination, CommentPagination, LikePagination
+from core.purge import hide_article
+from article import serializers, permissions, events, export, likes
+from article.comments import latest_comments
+from article.filters import ArticleFilter
+from article.caching import (
+    ARTICLES_KEY, RELATED_KEY, TRENDING_KEY, article_key, article_keys,
+    author_key, purge_article)
+from article.autocomplete import autocomplete as suggest
+from article.view_counts import view_buffer, viewer_key
+from article.sync import changes_since, decode_cursor, encode_cursor, initial_position
+from app.utils.pubsub import get_backend
+from app.utils.cache_purge import purge
+from app.middleware.cache_policy import add_surrogate_keys
+
+
+class LikeListCreateView(ServerTimingMixin, generics.ListCreateAPIView):
     """View for list or create likes for article. """
 
     queryset = Like.objects.all()
     serializer_class = serializers.LikeSerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = LikePagination
 
     def get_queryset(self):
         """Gets all the likes for specific article."""
 
         article_id = self.kwargs['pk']
-        return Like.objects.filter(article_id=article_id)
+        return Like.objects.filter(
+            article_id=article_id).select_related('user')
+
+    def get_likes_count(self):
+        """Count the likes of the article, pending likes included."""
+        return likes.likes_count(self.kwargs['pk'])
+
+    def create(self, request, *args, **kwargs):
+        """Buffer the like in write-behind mode, create it otherwise."""
+        if not likes.write_behind_enabled():
+            return super().create(request, *args, **kwargs)
+
+        article_id = self.kwargs['pk']
+        get_object_or_404(Article.objects.only('id'), pk=article_id)
+        if not likes.add_pending_like(request.user, article_id):
+            raise ValidationError(
+                {'error': 'You have already liked this article.'})
+        events.publish_likes_changed(article_id)
+        purge_article(article_id)
+        return Response({
+            'user_name': f"{request.user.first_name} {request.user.last_name}",
+            'article_id': str(article_id),
+            'pending': True,
+        }, status=status.HTTP_202_ACCEPTED)
 
     def perform_create(self, serializer):
         """Method for like creation."""
 
         article_id = self.kwargs['pk']
         serializer.save(user=self.request.user, article_id=article_id)
+        events.publish_likes_changed(article_id)
+        purge_article(article_id)
 
 
-class LikeDestroyView(generics.DestroyAPIView):
+class LikeDestroyView(ServerTimingMixin, generics.DestroyAPIView):
     """View for deleting like that have been set to an article."""
 
     authentication_classes = [TokenAuthentication]
@@ -55,14 +103,22 @@ class LikeDestroyView(generics.DestroyAPIView):
     def delete(self, request, *args, **kwargs):
         """Delete method for like that has been set."""
 
+        if (likes.write_behind_enabled()
+                and likes.remove_pending_like(request.user, self.kwargs['pk'])):
+            events.publish_likes_changed(self.kwargs['pk'])
+            purge_article(self.kwargs['pk'])
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
         instance = self.get_object()
         if instance is None:
             return Response({'detail': 'Like not found.'}, status=status.HTTP_404_NOT_FOUND)
         self.perform_destroy(instance)
+        events.publish_likes_changed(instance.article_id)
+        purge_article(instance.article_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(ServerTimingMixin, generics.ListCreateAPIView):
     """Retrieve or create comments view."""
 
     queryset = Comment.objects.all()
@@ -77,7 +133,8 @@ class CommentListCreateView(generics.ListCreateAPIView):
         """
         article_id = self.kwargs.get(
             'pk')
-        return Comment.objects.filter(article_id=article_id)
+        return Comment.objects.filter(
+            article_id=article_id).select_related('user')
 
     def perform_create(self, serializer):
         """
@@ -86,20 +143,13 @@ class CommentListCreateView(generics.ListCreateAPIView):
         article_id = self.kwargs.get(
             'pk')
 
-        serializer.save(user=self.request.user, article_id=article_id)
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        comment = serializer.save(
+            user=self.request.user, article_id=article_id)
+        events.publish_comment_created(comment, serializer.data)
+        purge_article(article_id)
 
 
-class CommentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class CommentRetrieveUpdateDestroyView(ServerTimingMixin, generics.RetrieveUpdateDestroyAPIView):
     """View to retrieve update or delete comment."""
 
     queryset = Comment.objects.all()
@@ -114,8 +164,16 @@ class CommentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         self.check_object_permissions(self.request, obj)
         return obj
 
+    def perform_update(self, serializer):
+        comment = serializer.save()
+        purge_article(comment.article_id)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        purge_article(instance.article_id)
+
 
-class ArticleMVS(viewsets.ModelViewSet):
+class ArticleMVS(ServerTimingMixin, viewsets.ModelViewSet):
     """View for manage article APIs."""
     serializer_class = serializers.ArticleDetailSerializer
     queryset = Article.objects.all()
@@ -138,28 +196,45 @@ class ArticleMVS(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Create a new article."""
         serializer.save(user=self.request.user)
+        purge(ARTICLES_KEY, author_key(self.request.user.id))
 
     def perform_update(self, serializer):
         """Update an article."""
-        serializer.save()
+        article = serializer.save()
+        purge_article(article.id)
 
+    def destroy(self, request, *args, **kwargs):
+        """Hide an article and leave deleting its rows to a purge job."""
+        article = self.get_object()
+        hide_article(article)
+        purge_article(article.id, ARTICLES_KEY)
+        return Response(status=status.HTTP_202_ACCEPTED)
 
-class ArticleVS(viewsets.ViewSet):
+
+class ArticleVS(ServerTimingMixin, viewsets.ViewSet):
     """View to retrieve a list of all articles for all users or specific article for authenticated user."""
 
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend,
+                       filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = ArticleFilter
     search_fields = ['user__first_name',
                      'user__last_name', 'title', 'topics__name']
-    ordering_fields = ['likes_count', 'created_at']
+    ordering_fields = ['likes_count', 'comments_count', 'created_at']
     pagination_class = ArticlePagination
 
+    max_batch_size = 50
+    cache_policy = {'max_age': 30, 's_maxage': 300,
+                    'stale_while_revalidate': 60,
+                    'actions': ['list', 'related']}
+
     def get_permissions(self):
-        if self.action == 'retrieve':
+        if self.action in ('retrieve', 'batch'):
             return [permissions.IsAuthenticatedForRetrieve()]
         return [AllowAny()]
 
     def list(self, request):
-        queryset = Article.objects.annotate(likes_count=Count('likes'))
+        queryset = likes.annotate_pending_likes(
+            Article.objects.defer('viewers_hll'))
         # filters
         for backend in list(self.filter_backends):
             queryset = backend().filter_queryset(self.request, queryset, self)
@@ -169,19 +244,109 @@ class ArticleVS(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
 
         if page is not None:
-            serializer = serializers.ArticleSerializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
-
-        serializer = serializers.ArticleSerializer(queryset, many=True)
-        return Response(serializer.data)
+            serializer = serializers.ArticleSerializer(
+                page, many=True, context=self._preview_context(page))
+            response = paginator.get_paginated_response(serializer.data)
+            return add_surrogate_keys(
+                response, [ARTICLES_KEY, *article_keys(page)])
+
+        serializer = serializers.ArticleSerializer(
+            queryset, many=True, context=self._preview_context(queryset))
+        return add_surrogate_keys(Response(serializer.data),
+                                  [ARTICLES_KEY, *article_keys(queryset)])
+
+    def _preview_context(self, articles):
+        """Fetch the latest comments when `?include=latest_comment`."""
+        include = self.request.query_params.get('include', '').split(',')
+        if 'latest_comment' not in include:
+            return {}
+        return {'latest_comments': latest_comments(
+            [article.id for article in articles])}
 
     def retrieve(self, request, pk='pk'):
-        article = Article.objects.get(pk=pk)
+        article = get_object_or_404(Article, pk=pk)
+        view_buffer.record(article.id, viewer_key(request))
         serializer = serializers.ArticleDetailSerializer(article)
         return Response(serializer.data)
 
-
-class TopicViewSet(mixins.ListModelMixin,
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Return title and topic suggestions for a search prefix."""
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = max(1, min(limit, 20))
+        return Response(suggest(request.query_params.get('q', ''), limit))
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """Return many articles by id, reporting missing ones per item."""
+        try:
+            ids = [int(i) for i in request.query_params.get('ids', '').split(',')]
+        except ValueError:
+            raise ValidationError(
+                {'ids': 'A comma separated list of integers is required.'})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.max_batch_size:
+            raise ValidationError(
+                {'ids': f'At most {self.max_batch_size} ids are allowed.'})
+
+        queryset = likes.annotate_pending_likes(
+            Article.objects.filter(pk__in=ids).select_related(
+                'user').prefetch_related(
+                'topics',
+                Prefetch('comments', queryset=Comment.objects.select_related(
+                    'user').order_by('created_at', 'id')),
+            ))
+        serializer = serializers.ArticleDetailSerializer(queryset, many=True)
+        found = {article['id']: article for article in serializer.data}
+
+        results = [found.get(pk, {'id': pk, 'detail': 'Not found.'})
+                   for pk in ids]
+        return Response({'results': results})
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """Return articles changed or deleted since the client's cursor."""
+        try:
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = max(1, min(limit, 500))
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except ValueError as exc:
+                raise ValidationError({'cursor': str(exc)})
+        else:
+            position = initial_position()
+
+        changes = changes_since(position, limit)
+        serializer = serializers.ArticleSerializer(
+            changes['changed'], many=True)
+        return Response({
+            'changed': serializer.data,
+            'deleted': changes['deleted'],
+            'cursor': encode_cursor(*changes['position']),
+            'has_more': changes['has_more'],
+        })
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """Return the precomputed related articles of an article."""
+        queryset = RelatedArticle.objects.filter(
+            article_id=pk, related__deleted_at__isnull=True).select_related(
+            'related__user').order_by('-score', '-related_id')
+        serializer = serializers.RelatedArticleSerializer(queryset, many=True)
+        keys = [RELATED_KEY, article_key(pk),
+                *article_keys(r.related for r in queryset)]
+        return add_surrogate_keys(Response(serializer.data), keys)
+
+
+class TopicViewSet(ServerTimingMixin, mixins.ListModelMixin,
                    mixins.UpdateModelMixin,
                    mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
@@ -194,3 +359,109 @@ class TopicViewSet(mixins.ListModelMixin,
     def get_queryset(self):
         """Retrieve topics for authenticated user."""
         return self.queryset.filter(user=self.request.user).order_by('-id')
+
+
+class TrendingVS(ServerTimingMixin, viewsets.ViewSet):
+    """View to retrieve the precomputed trending articles."""
+
+    permission_classes = [AllowAny]
+    default_limit = 20
+    max_limit = 100
+    cache_policy = {'max_age': 30, 's_maxage': 60}
+
+    def list(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        queryset = TrendingArticle.objects.filter(
+            article__deleted_at__isnull=True).select_related(
+            'article__user').order_by('-score')[:limit]
+        serializer = serializers.TrendingArticleSerializer(queryset, many=True)
+        keys = [TRENDING_KEY, *article_keys(t.article for t in queryset)]
+        return add_surrogate_keys(Response(serializer.data), keys)
+
+
+class ExportView(ServerTimingMixin, APIView):
+    """Stream every article or comment as NDJSON or CSV for staff users."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAdminUser]
+    # Exports are large, favour compression speed over ratio.
+    compression = {'level': {'gzip': 4, 'br': 3, 'zstd': 3}}
+
+    def get(self, request):
+        kind = request.query_params.get('kind', 'articles')
+        output_format = request.query_params.get('output', 'ndjson')
+        if kind not in export.FIELDS:
+            raise ValidationError({'kind': f'Choose one of {list(export.FIELDS)}.'})
+        if output_format not in export.CONTENT_TYPES:
+            raise ValidationError(
+                {'output': f'Choose one of {list(export.CONTENT_TYPES)}.'})
+
+        chunks = export.buffered(export.export(kind, output_format))
+        if isinstance(request._request, ASGIRequest):
+            chunks = export.async_chunks(chunks)
+        filename = f'{kind}.{output_format}'
+        response = StreamingHttpResponse(
+            chunks, content_type=export.CONTENT_TYPES[output_format])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+EVENTS_KEEPALIVE = 15
+
+
+async def _token_user(request):
+    """Return the user of the token in the header or `token` parameter."""
+    key = request.GET.get('token')
+    header = request.headers.get('Authorization', '').split()
+    if len(header) == 2 and header[0].lower() == 'token':
+        key = header[1]
+    if not key:
+        return None
+    token = await Token.objects.select_related('user').filter(key=key).afirst()
+    if token is None or not token.user.is_active:
+        return None
+    return token.user
+
+
+async def _event_stream(channel):
+    """Yield Server-Sent Events for a pubsub channel until disconnected."""
+    subscription = get_backend().subscribe(channel)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(), EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        subscription.close()
+
+
+async def article_events(request, pk):
+    """
+    Stream new comments and like count changes of an article.
+
+    Uses Server-Sent Events, so it has to be served by the ASGI application.
+    Browsers can't set headers on EventSource, the token may be passed as the
+    `token` query parameter instead.
+    """
+    if await _token_user(request) is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED)
+    if not await Article.objects.filter(pk=pk).aexists():
+        return JsonResponse({'detail': 'Not found.'},
+                            status=status.HTTP_404_NOT_FOUND)
+    response = StreamingHttpResponse(
+        _event_stream(events.article_channel(pk)),
+        content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -2,16 +2,88 @@
 Django admin customization.
 """
 
+import json
+
 from django.utils.translation import gettext_lazy as _
 from django.contrib import admin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models.functions import Collate, Lower, Trim
 from core import models
+from core.pagination import EstimatedCountPaginator
+from core.purge import delete_in_batches
+from app.middleware.slow_queries import slow_query_log
+
+
+class ScalableAdminMixin:
+    """Admin behaviour for tables too large for exact counts or scans."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Indexed expression searched instead of `search_fields`, which the
+    # admin matches with UPPER(...) LIKE '%term%' that no index serves.
+    search_expression = None
+    search_lookup = 'startswith'
+
+    def get_actions(self, request):
+        # The default delete action loads every selected row and its cascade.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip().lower()
+        if self.search_expression is None or not term:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.alias(search=self.search_expression).filter(
+            **{f'search__{self.search_lookup}': term}), False
+
+
+class ScalableAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """Base admin for tables too large for exact counts."""
+    ordering = ['-id']
+
+
+# Date filters on indexed `created_at` columns. `date_hierarchy` is left out,
+# it lists the distinct dates of the whole table on every page.
+CREATED_AT_FILTER = ('created_at', admin.DateFieldListFilter)
+
+
+@admin.action(description=_('Delete selected rows in bulk'))
+def bulk_delete(modeladmin, request, queryset):
+    """Delete rows with one queryset delete, skipping the confirmation page."""
+    count, _deleted = queryset.delete()
+    modeladmin.message_user(request, _('Deleted %d rows.') % count)
+
+
+@admin.action(description=_('Delete selected comments in bulk'))
+def bulk_delete_comments(modeladmin, request, queryset):
+    """Delete comments in short transactions of a thousand rows each."""
+    count = delete_in_batches(queryset)
+    modeladmin.message_user(request, _('Deleted %d comments.') % count)
+
 
+def purge_action(kind):
+    """Return an admin action queuing purge jobs for the selected rows."""
+    @admin.action(description=_('Purge selected in the background'))
+    def purge_selected(modeladmin, request, queryset):
+        jobs = models.PurgeJob.objects.bulk_create(
+            models.PurgeJob(kind=kind, target_id=target_id)
+            for target_id in queryset.values_list('id', flat=True))
+        modeladmin.message_user(
+            request, _('Queued %d purge jobs.') % len(jobs))
+    return purge_selected
 
-class UserAdmin(BaseUserAdmin):
+
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
     """Define the admin page for the User model."""
     ordering = ['id']
     list_display = ['email', 'first_name', 'last_name', 'id']
+    search_fields = ['email']
+    search_expression = Lower('email')
+    search_lookup = 'exact'
+    actions = [purge_action(models.PurgeJob.USER)]
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (
@@ -43,8 +115,79 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class ArticleAdmin(ScalableAdmin):
+    """Define the admin page for articles."""
+    list_display = ['id', 'title', 'user', 'created_at', 'view_count']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    autocomplete_fields = ['topics']
+    search_fields = ['title']
+    search_expression = Collate(Lower('title'), 'C')
+    list_filter = [CREATED_AT_FILTER]
+    actions = [purge_action(models.PurgeJob.ARTICLE)]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('viewers_hll')
+
+
+class TopicAdmin(ScalableAdmin):
+    """Define the admin page for topics."""
+    list_display = ['id', 'name', 'user']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    search_fields = ['name']
+    search_expression = Collate(Lower(Trim('name')), 'C')
+    actions = [bulk_delete]
+
+
+class CommentAdmin(ScalableAdmin):
+    """Define the admin page for comments."""
+    list_display = ['id', 'user', 'article', 'created_at']
+    list_select_related = ['user', 'article']
+    raw_id_fields = ['user', 'article']
+    list_filter = [CREATED_AT_FILTER]
+    actions = [bulk_delete_comments]
+
+
+class LikeAdmin(ScalableAdmin):
+    """Define the admin page for likes."""
+    list_display = ['id', 'user', 'article', 'created_at']
+    list_select_related = ['user', 'article']
+    raw_id_fields = ['user', 'article']
+    list_filter = [CREATED_AT_FILTER]
+    actions = [bulk_delete]
+
+
+class PurgeJobAdmin(ScalableAdmin):
+    """Define the admin page for purge jobs."""
+    list_display = ['id', 'kind', 'target_id', 'status', 'created_at',
+                    'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['finished_at', 'error']
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Article)
-admin.site.register(models.Topic)
-admin.site.register(models.Comment)
-admin.site.register(models.Like)
+admin.site.register(models.Article, ArticleAdmin)
+admin.site.register(models.Topic, TopicAdmin)
+admin.site.register(models.Comment, CommentAdmin)
+admin.site.register(models.Like, LikeAdmin)
+admin.site.register(models.PurgeJob, PurgeJobAdmin)
+
+
+def slow_queries_view(request):
+    """Show the slow query log, or download it with `?format=json`."""
+    if request.method == 'POST':
+        slow_query_log.clear()
+    entries = slow_query_log.entries()
+    if request.GET.get('format') == 'json':
+        response = HttpResponse(json.dumps(entries, indent=2, cls=DjangoJSONEncoder),
+                                content_type='application/json')
+        response['Content-Disposition'] = (
+            'attachment; filename="slow-queries.json"')
+        return response
+    context = {
+        **admin.site.each_context(request),
+        'title': _('Slow queries'),
+        'entries': entries,
+    }
+    return TemplateResponse(request, 'admin/slow_queries.html', context)
@@ -0,0 +1,80 @@
+"""
+Django command to benchmark response compression.
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from app.middleware.compression import COMPRESSORS, compress_bytes
+from article.serializers import ArticleDetailSerializer
+from core.models import Article
+
+
+SAMPLE_TEXT = (
+    'Django REST framework makes it easy to build web APIs. Articles have an '
+    'opening, a content body, topics and comments left by other users. '
+)
+
+
+def sample_payload(comments=20):
+    """Return a synthetic article detail payload."""
+    return {
+        'id': 1,
+        'author': 'Sample Author',
+        'title': 'Sample article title',
+        'image': '/media/article_pic/sample.png',
+        'created_at': '2024-06-01T12:00:00Z',
+        'updated_at': '2024-06-01T12:00:00Z',
+        'likes_count': 42,
+        'topics': [{'id': i, 'name': f'Topic {i}'} for i in range(5)],
+        'opening': SAMPLE_TEXT * 3,
+        'content': SAMPLE_TEXT * 80,
+        'comments': [{
+            'id': i,
+            'user_name': f'Commenter {i}',
+            'content': SAMPLE_TEXT,
+            'created_at': '2024-06-01T12:00:00Z',
+            'updated_at': '2024-06-01T12:00:00Z',
+        } for i in range(comments)],
+    }
+
+
+class Command(BaseCommand):
+    """Report size and CPU trade-offs of each encoding and level."""
+    help = 'Benchmark compression ratio and speed on article detail payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-db', type=int, default=0,
+                            help='Use the N latest articles instead of a synthetic payload.')
+        parser.add_argument('--rounds', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options['from_db']:
+            articles = Article.objects.order_by('-id')[:options['from_db']]
+            payloads = [ArticleDetailSerializer(a).data for a in articles]
+        else:
+            payloads = [sample_payload()]
+        bodies = [json.dumps(p).encode() for p in payloads]
+        raw_size = sum(len(b) for b in bodies)
+        if not raw_size:
+            self.stderr.write('No payloads to benchmark.')
+            return
+
+        levels = {'gzip': [1, 6, 9], 'br': [1, 4, 6, 11], 'zstd': [1, 3, 9, 19]}
+        self.stdout.write(
+            f'{"encoding":<8} {"level":>5} {"bytes":>9} {"ratio":>7} '
+            f'{"us/resp":>9} {"MB/s":>8}')
+        self.stdout.write(f'{"identity":<8} {"-":>5} {raw_size:>9}')
+        for encoding in COMPRESSORS:
+            for level in levels[encoding]:
+                start = time.perf_counter()
+                for _ in range(options['rounds']):
+                    size = sum(len(compress_bytes(b, encoding, level))
+                               for b in bodies)
+                elapsed = time.perf_counter() - start
+                per_response = elapsed / (options['rounds'] * len(bodies))
+                throughput = raw_size * options['rounds'] / elapsed / 1e6
+                self.stdout.write(
+                    f'{encoding:<8} {level:>5} {size:>9} '
+                    f'{raw_size / size:>7.2f} {per_response * 1e6:>9.1f} '
+                    f'{throughput:>8.1f}')
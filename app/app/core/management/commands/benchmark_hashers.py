@@ -0,0 +1,44 @@
+"""
+Django command to benchmark password hashers.
+"""
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Report the time each configured hasher takes to hash a password."""
+    help = 'Benchmark the PASSWORD_HASHERS and suggest PBKDF2_ITERATIONS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--target-ms', type=float, default=250,
+                            help='Login hashing time to size PBKDF2_ITERATIONS for.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"hasher":<56} {"ms/hash":>9}')
+        pbkdf2 = None
+        for hasher in get_hashers():
+            name = f'{type(hasher).__module__}.{type(hasher).__name__}'
+            try:
+                salt = hasher.salt()
+                start = time.perf_counter()
+                for _ in range(options['rounds']):
+                    hasher.encode('benchmark password', salt)
+            except ValueError as exc:
+                # Argon2 and bcrypt need optional packages.
+                self.stdout.write(f'{name:<56} {"-":>9}  {exc}')
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000 / options['rounds']
+            self.stdout.write(f'{name:<56} {elapsed_ms:>9.1f}')
+            if hasher.algorithm == 'pbkdf2_sha256' and pbkdf2 is None:
+                pbkdf2 = elapsed_ms, hasher.iterations
+
+        if pbkdf2:
+            # PBKDF2 time is linear in the number of iterations.
+            elapsed_ms, iterations = pbkdf2
+            suggested = int(iterations * options['target_ms'] / elapsed_ms)
+            self.stdout.write(self.style.SUCCESS(
+                f'PBKDF2_ITERATIONS={suggested} takes about '
+                f'{options["target_ms"]:.0f} ms, currently {iterations}.'))
@@ -0,0 +1,49 @@
+"""
+Django command to remove media files no longer referenced.
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.media_gc import find_orphans, remove_orphan
+
+
+class Command(BaseCommand):
+    """Delete or quarantine files in MEDIA_ROOT that no model references."""
+    help = 'Remove orphaned files from MEDIA_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report the orphaned files.')
+        parser.add_argument('--quarantine',
+                            help='Move orphans to this directory instead of deleting them.')
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Skip files modified less than this many seconds ago.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        root = settings.MEDIA_ROOT
+        if not os.path.isdir(root):
+            self.stdout.write('MEDIA_ROOT does not exist.')
+            return
+        quarantine = options['quarantine']
+        exclude = {os.path.abspath(quarantine)} if quarantine else set()
+
+        count = total = 0
+        for name, size in find_orphans(root, options['min_age'],
+                                       options['batch_size'], exclude):
+            if not options['dry_run']:
+                try:
+                    if not remove_orphan(root, name, quarantine):
+                        continue
+                except FileNotFoundError:
+                    continue
+            if options['verbosity'] > 1 or options['dry_run']:
+                self.stdout.write(f'{name} ({size} bytes)')
+            count += 1
+            total += size
+
+        action = 'Found' if options['dry_run'] else (
+            'Quarantined' if quarantine else 'Removed')
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {count} orphaned files, {total} bytes.'))
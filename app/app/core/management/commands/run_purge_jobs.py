@@ -0,0 +1,20 @@
+"""
+Django command to run the pending purge jobs.
+"""
+from django.core.management.base import BaseCommand
+from core.purge import run_pending_jobs
+
+
+class Command(BaseCommand):
+    """Delete the users and articles scheduled for purging, in batches.
+
+    Meant to be run periodically, e.g. from cron every minute.
+    """
+    help = 'Run pending user and article purge jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ran = run_pending_jobs(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Ran {ran} purge jobs.'))
@@ -0,0 +1,112 @@
+"""
+Garbage collection of media files no model references.
+
+The media tree is walked with `os.scandir` in name order and merged with
+the referenced names streamed from the database in the same order, so each
+table is read once whatever the number of files, and memory use is bounded
+by the size of a directory and the depth of the tree. Files younger than
+`min_age` are skipped, their row may not be committed yet.
+"""
+import heapq
+import os
+import shutil
+import time
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models.functions import Collate
+from core.models import StoredFile
+
+
+def file_fields():
+    """Return the (model, field name) of every file field."""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def referenced(names):
+    """Return the names among `names` referenced by a file field.
+
+    Meant for a few names, the image fields have partial indexes for it.
+    """
+    found = set()
+    for model, field in file_fields():
+        found.update(model._base_manager.filter(
+            **{f'{field}__gt': '', f'{field}__in': names}).values_list(
+            field, flat=True))
+    return found
+
+
+def referenced_names(batch_size=1000):
+    """Yield every name referenced by a file field once, in code point order."""
+    streams = [
+        model._base_manager.filter(**{f'{field}__gt': ''}).order_by(
+            # The C collation sorts like Python strings.
+            Collate(field, 'C')).values_list(field, flat=True).iterator(
+            chunk_size=batch_size)
+        for model, field in file_fields()
+    ]
+    previous = None
+    for name in heapq.merge(*streams):
+        if name != previous:
+            yield name
+            previous = name
+
+
+def walk_files(root, exclude=(), relative=''):
+    """Yield (relative name, DirEntry) of every file under root, by name."""
+    with os.scandir(os.path.join(root, relative)) as entries:
+        entries = list(entries)
+    # A directory sorts as its name and a slash, where its files sort.
+    entries.sort(key=lambda entry: entry.name + '/'
+                 if entry.is_dir(follow_symlinks=False) else entry.name)
+    for entry in entries:
+        name = f'{relative}/{entry.name}' if relative else entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if os.path.abspath(entry.path) not in exclude:
+                yield from walk_files(root, exclude, name)
+        elif entry.is_file(follow_symlinks=False):
+            yield name, entry
+
+
+def find_orphans(root, min_age=3600, batch_size=1000, exclude=()):
+    """Yield (name, size) of unreferenced files older than `min_age`."""
+    cutoff = time.time() - min_age
+    used = referenced_names(batch_size)
+    current = next(used, None)
+    for name, entry in walk_files(root, exclude):
+        while current is not None and current < name:
+            current = next(used, None)
+        if current == name:
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > cutoff:
+            continue
+        yield name, stat.st_size
+
+
+def remove_orphan(root, name, quarantine=None):
+    """
+    Delete or move an orphaned file and forget its stored content.
+
+    The stored file row is locked and the file checked once more, so an
+    upload sharing the same content in the meantime keeps it. Returns
+    whether the file was removed.
+    """
+    with transaction.atomic():
+        list(StoredFile.objects.select_for_update().filter(name=name))
+        if referenced([name]):
+            return False
+        StoredFile.objects.filter(name=name).delete()
+        path = os.path.join(root, name)
+        if quarantine:
+            target = os.path.join(quarantine, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(path, target)
+        else:
+            os.remove(path)
+    return True
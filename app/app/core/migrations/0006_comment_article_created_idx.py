@@ -0,0 +1,28 @@
+# Generated by Django 5.0.4 on 2026-10-19 02:41
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_article_image_alter_user_image'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to=core.models.article_pic_path),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to=core.models.user_profile_pic_path),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'created_at', 'id'], name='comment_article_created_idx'),
+        ),
+    ]
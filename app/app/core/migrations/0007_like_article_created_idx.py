@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-19 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_comment_article_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['article', 'created_at'], name='like_article_created_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.4 on 2026-10-19 02:58
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    ('article', django.contrib.postgres.indexes.GinIndex(fields=['title'], name='article_title_trgm_idx', opclasses=['gin_trgm_ops'])),
+    ('topic', django.contrib.postgres.indexes.GinIndex(fields=['name'], name='topic_name_trgm_idx', opclasses=['gin_trgm_ops'])),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Create the pg_trgm extension and indexes when the server has them."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for model_name, index in TRIGRAM_INDEXES:
+        schema_editor.add_index(apps.get_model('core', model_name), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for _, index in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'DROP INDEX IF EXISTS {schema_editor.quote_name(index.name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_article_sync'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in TRIGRAM_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    create_trigram_indexes, drop_trigram_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_pending_like'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='view_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='viewers_hll',
+            field=models.BinaryField(null=True),
+        ),
+    ]
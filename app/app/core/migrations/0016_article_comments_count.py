@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Article = apps.get_model('core', 'Article')
+    Comment = apps.get_model('core', 'Comment')
+    counts = Comment.objects.filter(article_id=OuterRef('pk')).order_by(
+        ).values('article_id').annotate(count=Count('id')).values('count')
+    Article.objects.update(
+        comments_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_purge_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:49
+
+from django.db import migrations, models
+
+
+def copy_refreshed_at(apps, schema_editor):
+    TrendingWatermark = apps.get_model('core', 'TrendingWatermark')
+    TrendingWatermark.objects.update(folded_until=models.F('refreshed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_user_email_lower_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingwatermark',
+            name='folded_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_refreshed_at, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='trendingwatermark',
+            name='last_comment_id',
+        ),
+        migrations.RemoveField(
+            model_name='trendingwatermark',
+            name='last_like_id',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at', 'id'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['created_at', 'id'], name='like_created_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2026-10-19 03:58
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Take the trigram indexes out of the model state.
+
+    Migration 0011 only creates them when pg_trgm is available, so the state
+    claimed indexes that may not exist. They stay in the database where they
+    were created and keep serving fuzzy matches, prefix matches move to the
+    lower() pattern indexes below.
+    """
+
+    dependencies = [
+        ('core', '0020_pending_related_update'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='article',
+                    name='article_title_trgm_idx',
+                ),
+                migrations.RemoveIndex(
+                    model_name='topic',
+                    name='topic_name_trgm_idx',
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('title'), name='text_pattern_ops'), name='article_title_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('name')), name='text_pattern_ops'), name='topic_name_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_autocomplete_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='like',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
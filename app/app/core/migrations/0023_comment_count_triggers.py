@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:40
+
+from django.db import migrations
+
+
+CREATE_TRIGGERS = """
+CREATE FUNCTION core_comment_counted() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_article a
+    SET comments_count = a.comments_count + c.count, updated_at = now()
+    FROM (SELECT article_id, count(*) AS count FROM added_comments
+          GROUP BY article_id) c
+    WHERE a.id = c.article_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_comment_uncounted() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_article a
+    SET comments_count = a.comments_count - c.count, updated_at = now()
+    FROM (SELECT article_id, count(*) AS count FROM removed_comments
+          GROUP BY article_id) c
+    WHERE a.id = c.article_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_comment_counted AFTER INSERT ON core_comment
+REFERENCING NEW TABLE AS added_comments
+FOR EACH STATEMENT EXECUTE FUNCTION core_comment_counted();
+
+CREATE TRIGGER core_comment_uncounted AFTER DELETE ON core_comment
+REFERENCING OLD TABLE AS removed_comments
+FOR EACH STATEMENT EXECUTE FUNCTION core_comment_uncounted();
+
+UPDATE core_article a SET comments_count = (
+    SELECT count(*) FROM core_comment c WHERE c.article_id = a.id);
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER core_comment_uncounted ON core_comment;
+DROP TRIGGER core_comment_counted ON core_comment;
+DROP FUNCTION core_comment_uncounted();
+DROP FUNCTION core_comment_counted();
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    Keep `Article.comments_count` in the database.
+
+    Statement level triggers count every insert and delete of comments,
+    including cascades, admin edits and batched purges, with one update per
+    statement. Counts that drifted before are recomputed once.
+    """
+
+    dependencies = [
+        ('core', '0022_like_created_at_default'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+
+CREATE_TRIGGERS = """
+CREATE FUNCTION core_like_counted() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_article a
+    SET likes_count = a.likes_count + l.count, updated_at = now()
+    FROM (SELECT article_id, count(*) AS count FROM added_likes
+          GROUP BY article_id) l
+    WHERE a.id = l.article_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION core_like_uncounted() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_article a
+    SET likes_count = a.likes_count - l.count, updated_at = now()
+    FROM (SELECT article_id, count(*) AS count FROM removed_likes
+          GROUP BY article_id) l
+    WHERE a.id = l.article_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_like_counted AFTER INSERT ON core_like
+REFERENCING NEW TABLE AS added_likes
+FOR EACH STATEMENT EXECUTE FUNCTION core_like_counted();
+
+CREATE TRIGGER core_like_uncounted AFTER DELETE ON core_like
+REFERENCING OLD TABLE AS removed_likes
+FOR EACH STATEMENT EXECUTE FUNCTION core_like_uncounted();
+
+UPDATE core_article a SET likes_count = (
+    SELECT count(*) FROM core_like l WHERE l.article_id = a.id);
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER core_like_uncounted ON core_like;
+DROP TRIGGER core_like_counted ON core_like;
+DROP FUNCTION core_like_uncounted();
+DROP FUNCTION core_like_counted();
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    Keep `Article.likes_count` in the database, like the comments count.
+
+    The column is indexed so the feed can filter and order on it.
+    """
+
+    dependencies = [
+        ('core', '0023_comment_count_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['likes_count'], name='article_likes_count_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_email_duplicates(apps, schema_editor):
+    """Refuse to migrate while emails differ only in case.
+
+    Which account to keep is not ours to guess, they have to be merged or
+    renamed by hand before the unique constraint can be added.
+    """
+    User = apps.get_model('core', 'User')
+    duplicates = User.objects.annotate(email_lower=Lower('email')).values(
+        'email_lower').annotate(count=Count('id')).filter(
+        count__gt=1).order_by('email_lower')
+    if not duplicates.exists():
+        return
+    emails = {}
+    for email_lower, email in User.objects.annotate(
+            email_lower=Lower('email')).filter(
+            email_lower__in=duplicates.values('email_lower')).order_by(
+            'email_lower', 'id').values_list('email_lower', 'email'):
+        emails.setdefault(email_lower, []).append(email)
+    listing = '\n'.join(', '.join(group) for group in emails.values())
+    raise RuntimeError(
+        'Cannot make emails unique regardless of case, these users share an '
+        'email address. Merge or rename them and migrate again:\n' + listing)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0024_article_likes_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_email_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_email_lower_unique'),
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_email_lower_idx',
+        ),
+    ]
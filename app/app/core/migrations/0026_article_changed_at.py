@@ -0,0 +1,67 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:28
+
+from django.db import migrations, models
+
+
+COUNTER_FUNCTION = """
+CREATE OR REPLACE FUNCTION core_{name}() RETURNS trigger AS $$
+BEGIN
+    UPDATE core_article a
+    SET {counter} = a.{counter} {sign} c.count, {moved} = now()
+    FROM (SELECT article_id, count(*) AS count FROM {rows}
+          GROUP BY article_id) c
+    WHERE a.id = c.article_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+COUNTER_FUNCTIONS = [
+    ('comment_counted', 'comments_count', '+', 'added_comments'),
+    ('comment_uncounted', 'comments_count', '-', 'removed_comments'),
+    ('like_counted', 'likes_count', '+', 'added_likes'),
+    ('like_uncounted', 'likes_count', '-', 'removed_likes'),
+]
+
+
+def counter_functions(moved):
+    """Return the SQL of the counter triggers bumping the `moved` column."""
+    return ''.join(
+        COUNTER_FUNCTION.format(name=name, counter=counter, sign=sign,
+                                rows=rows, moved=moved)
+        for name, counter, sign, rows in COUNTER_FUNCTIONS)
+
+
+class Migration(migrations.Migration):
+    """
+    Move sync to a `changed_at` column.
+
+    The counter triggers bumped `updated_at`, so likes and comments changed
+    the edit time the API shows. They now bump `changed_at` in the same
+    update, and `updated_at` only moves when the content is edited.
+    """
+
+    dependencies = [
+        ('core', '0025_user_email_lower_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='changed_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunSQL(
+            'UPDATE core_article SET changed_at = updated_at',
+            migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['changed_at', 'id'], name='article_changed_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_updated_idx',
+        ),
+        migrations.RunSQL(
+            counter_functions('changed_at'), counter_functions('updated_at')),
+    ]
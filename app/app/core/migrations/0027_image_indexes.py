@@ -0,0 +1,22 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0026_article_changed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('image__gt', '')), fields=['image'], name='article_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('image__gt', '')), fields=['image'], name='user_image_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_image_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='deleted_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
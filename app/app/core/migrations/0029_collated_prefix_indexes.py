@@ -0,0 +1,31 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:49
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_article_deleted_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_title_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='topic',
+            name='topic_name_prefix_idx',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.text.Lower('title'), 'C'), name='article_title_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('name')), 'C'), name='topic_name_prefix_idx'),
+        ),
+    ]
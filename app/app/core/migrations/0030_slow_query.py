@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-19 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_collated_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time', models.DateTimeField()),
+                ('duration_ms', models.FloatField()),
+                ('alias', models.CharField(max_length=64)),
+                ('method', models.CharField(max_length=16)),
+                ('path', models.TextField()),
+                ('view', models.CharField(max_length=255, null=True)),
+                ('sql', models.TextField()),
+                ('param_count', models.PositiveIntegerField()),
+                ('origin', models.JSONField(default=list)),
+                ('plan', models.TextField(null=True)),
+            ],
+        ),
+    ]
@@ -3,23 +3,25 @@ Database models.
 """
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Collate, Lower, Trim
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
 
 def user_profile_pic_path(instance, filename):
     """Generate file path for new user profile picture."""
     ext = filename.split('.')[-1]
-    # The new file name will be user_id_profile_pic.ext
-    filename = f'user_{instance.id}_profile_pic.{ext}'
-    return f'profile_pics/{filename}'
+    # The storage names the file by its content hash, only the directory
+    # and extension matter.
+    return f'profile_pics/upload.{ext}'
 
 
 def article_pic_path(instance, filename):
     """Generate file path for article picture."""
     ext = filename.split('.')[-1]
-    # The new file name will be user_id_profile_pic.ext
-    filename = f'user_article_{instance.id}_pic.{ext}'
-    return f'article_pic/{filename}'
+    # The storage names the file by its content hash, only the directory
+    # and extension matter.
+    return f'article_pic/upload.{ext}'
 
 
 class UserManager(BaseUserManager):
@@ -62,6 +64,25 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    class Meta:
+        constraints = [
+            # Case insensitive login, see user.backends.EmailBackend.
+            models.UniqueConstraint(
+                Lower('email'), name='user_email_lower_unique'),
+        ]
+        indexes = [
+            # Reference checks of core.media_gc.remove_orphan.
+            models.Index(fields=['image'], condition=models.Q(
+                image__gt=''), name='user_image_idx'),
+        ]
+
+
+class VisibleArticleManager(models.Manager):
+    """Manager leaving out articles waiting to be purged."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Article(models.Model):
     """Article model object."""
@@ -74,18 +95,83 @@ class Article(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Sync position, moved by edits and by the counter triggers, see
+    # article.sync. `updated_at` only moves when the content is edited.
+    changed_at = models.DateTimeField(auto_now=True)
     topics = models.ManyToManyField('Topic')
+    view_count = models.PositiveBigIntegerField(default=0, editable=False)
+    # HyperLogLog registers estimating the number of distinct viewers.
+    viewers_hll = models.BinaryField(null=True, editable=False)
+    # Maintained by database triggers, see article.comments and article.likes.
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when the owner deletes the article, the rows are removed later by
+    # a purge job, see core.purge.
+    deleted_at = models.DateTimeField(null=True, editable=False)
+
+    objects = VisibleArticleManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['changed_at', 'id'],
+                         name='article_changed_idx'),
+            # Indexes backing the feed filters, see article.filters.
+            models.Index(fields=['created_at', 'id'],
+                         name='article_created_idx'),
+            models.Index(fields=['user', 'created_at'],
+                         name='article_user_created_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(
+                image__gt=''), name='article_with_image_idx'),
+            models.Index(fields=['image'], condition=models.Q(
+                image__gt=''), name='article_image_idx'),
+            # "C" collated so it serves both prefix matches and ordering.
+            models.Index(Collate(Lower('title'), 'C'),
+                         name='article_title_prefix_idx'),
+            models.Index(fields=['likes_count'],
+                         name='article_likes_count_idx'),
+        ]
+
+    # Written with atomic updates only, never from a loaded instance.
+    COUNTER_FIELDS = {
+        'view_count', 'viewers_hll', 'comments_count', 'likes_count'}
+
+    def save(self, *args, **kwargs):
+        """Save the article, leaving counters updated meanwhile untouched."""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
 
+class ArticleTombstone(models.Model):
+    """Record of a deleted article for clients syncing changes."""
+    article_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.article_id} deleted at {self.deleted_at}"
+
+
 class Topic(models.Model):
     """Topic model object for filtering articles."""
     name = models.CharField(max_length=255)
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='topic_name_idx'),
+            models.Index(Collate(Lower(Trim('name')), 'C'),
+                         name='topic_name_prefix_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -102,6 +188,14 @@ class Comment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     content = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['article', 'created_at', 'id'],
+                         name='comment_article_created_idx'),
+            models.Index(fields=['created_at', 'id'],
+                         name='comment_created_idx'),
+        ]
+
     def __str__(self):
         return self.content
 
@@ -112,10 +206,160 @@ class Like(models.Model):
                              on_delete=models.CASCADE)
     article = models.ForeignKey(
         Article, related_name='likes', on_delete=models.CASCADE)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add so flushed likes keep the time they were given.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         unique_together = ('user', 'article')
+        indexes = [
+            models.Index(fields=['article', 'created_at'],
+                         name='like_article_created_idx'),
+            models.Index(fields=['created_at', 'id'],
+                         name='like_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} likes {self.article}"
+
+
+class PendingLike(models.Model):
+    """Like accepted in write-behind mode, waiting to be flushed.
+
+    Rows have no foreign keys so accepting a like never locks the article,
+    likes of deleted users or articles are dropped on flush.
+    """
+    user_id = models.BigIntegerField()
+    article_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user_id', 'article_id')
+
+    def __str__(self):
+        return f"{self.user_id} likes {self.article_id} (pending)"
+
+
+class TrendingArticle(models.Model):
+    """Precomputed trending score for an article.
+
+    The score is stored as the log of the time-decayed activity measured
+    against a fixed epoch, so rows without new activity never need rewriting
+    and sorting by it gives the current ranking.
+    """
+    article = models.OneToOneField(
+        Article, primary_key=True, related_name='trending', on_delete=models.CASCADE)
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='trending_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id}: {self.score}"
+
+
+class TrendingWatermark(models.Model):
+    """Time up to which likes and comments are folded into the scores."""
+    folded_until = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+
+class RelatedArticle(models.Model):
+    """Precomputed neighbour of an article based on topic overlap."""
+    article = models.ForeignKey(
+        Article, related_name='related_articles', on_delete=models.CASCADE)
+    related = models.ForeignKey(
+        Article, related_name='+', on_delete=models.CASCADE)
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('article', 'related')
+        indexes = [
+            models.Index(fields=['article', '-score'],
+                         name='related_article_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} -> {self.related_id}: {self.score}"
+
+
+class PendingRelatedUpdate(models.Model):
+    """Article whose topics changed, waiting for its related articles."""
+    article_id = models.BigIntegerField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class StoredFile(models.Model):
+    """File kept once under its content hash, with the number of uses."""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class ImageVariant(models.Model):
+    """Stored result of processing a source image into a variant."""
+    source_hash = models.CharField(max_length=64)
+    variant = models.CharField(max_length=32)
+    stored = models.ForeignKey(
+        StoredFile, related_name='variants', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ('source_hash', 'variant')
+
+    def __str__(self):
+        return f"{self.source_hash} {self.variant}"
+
+
+class PurgeJob(models.Model):
+    """Pending deletion of a user or article, done in batches."""
+    ARTICLE = 'article'
+    USER = 'user'
+    KIND_CHOICES = [(ARTICLE, 'Article'), (USER, 'User')]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'),
+                      (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    target_id = models.BigIntegerField()
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='purge_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.target_id}: {self.status}"
+
+
+class SlowQuery(models.Model):
+    """Query logged by the slow query middleware, capped to the latest."""
+    time = models.DateTimeField()
+    duration_ms = models.FloatField()
+    alias = models.CharField(max_length=64)
+    method = models.CharField(max_length=16)
+    path = models.TextField()
+    view = models.CharField(max_length=255, null=True)
+    sql = models.TextField()
+    # Parameters are left out, they can hold emails, tokens or passwords.
+    param_count = models.PositiveIntegerField()
+    origin = models.JSONField(default=list)
+    plan = models.TextField(null=True)
+
+    def __str__(self):
+        return f"{self.duration_ms} ms: {self.sql[:50]}"
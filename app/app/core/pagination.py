@@ -2,16 +2,262 @@
 Pagination for API's lists.
 """
 
-from rest_framework.pagination import PageNumberPagination, LimitOffsetPagination
+import json
+
+from django.core.cache import cache
+from django.core.paginator import Paginator, Page, EmptyPage, PageNotAnInteger
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset):
+    """Return the query planner's row estimate for a queryset."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def table_estimate(model, using='default'):
+    """Return the row estimate kept in pg_class, or None if there is none."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table])
+        row = cursor.fetchone()
+    # reltuples is -1 for tables that were never vacuumed or analyzed.
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def is_unfiltered(queryset):
+    """Check if a queryset returns every row of its default manager."""
+    query = queryset.query
+    default = queryset.model._default_manager.all().query
+    return (query.where == default.where
+            and not query.distinct and not query.combinator
+            and query.low_mark == 0 and query.high_mark is None)
+
+
+def count_queryset(queryset, exact_threshold=1000, cache_timeout=None):
+    """
+    Return a `(count, estimated)` pair for a queryset.
+
+    The planner estimate decides how to count: results estimated at or under
+    `exact_threshold` rows are counted exactly, unfiltered querysets reuse an
+    exact count cached for `cache_timeout` seconds, everything else gets the
+    estimate.
+    """
+    count, estimated, _fresh = _count_queryset(
+        queryset, exact_threshold, cache_timeout)
+    return count, estimated
+
+
+def _count_queryset(queryset, exact_threshold, cache_timeout):
+    """Count like `count_queryset`, also telling if the count is current."""
+    unfiltered = is_unfiltered(queryset)
+    estimate = None
+    if unfiltered:
+        estimate = table_estimate(queryset.model, queryset.db)
+    if estimate is None:
+        estimate = estimate_count(queryset)
+
+    if estimate <= exact_threshold:
+        return queryset.count(), False, True
+
+    if unfiltered and cache_timeout:
+        key = f'pagination-count:{queryset.db}:{queryset.model._meta.label_lower}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, cache_timeout)
+        return count, False, False
+
+    return estimate, True, False
+
+
+class PeekedPage(Page):
+    """Page that knows if there is a next page without using the count."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids exact counts of large querysets.
+
+    When the count is estimated or cached any positive page number is
+    accepted, the page is simply empty once the results run out, and each
+    page reads one extra row to tell if there is a next page.
+    """
+    exact_count_threshold = 1000
+    count_cache_timeout = 60
+
+    @cached_property
+    def _counted(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count, False, True
+        return _count_queryset(
+            self.object_list, self.exact_count_threshold, self.count_cache_timeout)
+
+    @property
+    def count(self):
+        """Return the total number of objects, estimated for large querysets."""
+        return self._counted[0]
+
+    @property
+    def count_estimated(self):
+        """Whether the count is a planner estimate."""
+        return self._counted[1]
+
+    @property
+    def count_current(self):
+        """Whether the count was taken for this page, not estimated or cached."""
+        return self._counted[2]
+
+    def validate_number(self, number):
+        if self.count_current:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.orphans:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        if self.count_current:
+            return self._get_page(
+                self.object_list[bottom:bottom + self.per_page], number, self)
+        # The count may be off either way, it must not cut the page short
+        # nor decide if there is a next page.
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return PeekedPage(rows[:self.per_page], number, self,
+                          has_next=len(rows) > self.per_page)
 
 
 class ArticlePagination(PageNumberPagination):
     """Pagination class for articles list."""
     page_size = 7
     page_query_param = 'page'
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_estimated': self.page.paginator.count_estimated,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_estimated'] = {
+            'type': 'boolean',
+            'description': 'Whether count is a planner estimate.',
+        }
+        return response_schema
+
+
+class CommentPagination(CursorPagination):
+    """
+    Cursor pagination class for article comments list.
+
+    Comments are streamed oldest first, ties on `created_at` are broken by id
+    so pages stay stable while new comments are added. The total is included
+    when the client asks for it with `?total=1`, it is exact for small
+    results and a planner estimate otherwise.
+    """
+    page_size = 5
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('created_at', 'id')
+    total_query_param = 'total'
+    exact_count_threshold = 1000
+    count_cache_timeout = 60
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total = None
+        if request.query_params.get(self.total_query_param):
+            self.total, self.total_estimated = count_queryset(
+                queryset, self.exact_count_threshold, self.count_cache_timeout)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.total is not None:
+            payload['total'] = self.total
+            payload['total_estimated'] = self.total_estimated
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['total'] = {
+            'type': 'integer',
+            'description': 'Number of comments, requested with `total`.',
+        }
+        response_schema['properties']['total_estimated'] = {
+            'type': 'boolean',
+            'description': 'Whether total is a planner estimate.',
+        }
+        return response_schema
+
+
+class LikePagination(CursorPagination):
+    """
+    Cursor pagination class for article likes list.
+
+    Likers are listed newest first and the page is returned together with the
+    number of likes on the article, taken from the view's `get_likes_count`
+    when it has one.
+    """
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        get_likes_count = getattr(view, 'get_likes_count', None)
+        self.count = get_likes_count() if get_likes_count else queryset.count()
+        return super().paginate_queryset(queryset, request, view)
 
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
 
-class CommentPagination(LimitOffsetPagination):
-    """Pagination class for article comments list."""
-    default_limit = 5
-    max_limit = 100
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {
+            'type': 'integer',
+            'example': 123,
+        }
+        return response_schema
@@ -0,0 +1,113 @@
+"""
+Batched deletion of users and articles.
+
+Django's cascade collector loads every dependent row before deleting it,
+which for a prolific user or a viral article means millions of objects
+and long held locks. Purging deletes the bulky dependents, likes and
+comments, with one `DELETE ... WHERE id IN (SELECT ... LIMIT n)` per
+chunk, each in its own short transaction, and then deletes the now small
+article or user normally so signals still leave tombstones and release
+image files.
+
+Articles deleted through the API are only hidden in the request, see
+`hide_article`, and purged by a job.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from core.models import (
+    Article, ArticleTombstone, Comment, Like, PurgeJob, RelatedArticle, User)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def delete_in_batches(queryset, batch_size=BATCH_SIZE):
+    """Delete the rows of a queryset in chunks, return how many."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            chunk = queryset.order_by().values('pk')[:batch_size]
+            count, _ = model.objects.filter(pk__in=chunk).delete()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def purge_article_rows(article_id, batch_size=BATCH_SIZE):
+    """Delete an article and everything attached to it."""
+    delete_in_batches(Like.objects.filter(article_id=article_id), batch_size)
+    delete_in_batches(Comment.objects.filter(article_id=article_id), batch_size)
+    delete_in_batches(RelatedArticle.objects.filter(
+        related_id=article_id), batch_size)
+    with transaction.atomic():
+        for article in Article.all_objects.filter(pk=article_id):
+            article.delete()
+
+
+def purge_user(user_id, batch_size=BATCH_SIZE):
+    """Delete a user, their articles and everything attached to them."""
+    delete_in_batches(Like.objects.filter(user_id=user_id), batch_size)
+    delete_in_batches(Comment.objects.filter(user_id=user_id), batch_size)
+    article_ids = Article.all_objects.filter(user_id=user_id).order_by(
+        'id').values_list('id', flat=True)
+    while True:
+        chunk = list(article_ids[:batch_size])
+        for article_id in chunk:
+            purge_article_rows(article_id, batch_size)
+        if len(chunk) < batch_size:
+            break
+    with transaction.atomic():
+        for user in User.objects.filter(pk=user_id):
+            user.delete()
+
+
+PURGERS = {
+    PurgeJob.ARTICLE: purge_article_rows,
+    PurgeJob.USER: purge_user,
+}
+
+
+def enqueue(kind, target_id):
+    """Schedule a purge, return the job."""
+    return PurgeJob.objects.create(kind=kind, target_id=target_id)
+
+
+def hide_article(article):
+    """Hide an article at once and schedule the purge of its rows."""
+    with transaction.atomic():
+        article.deleted_at = timezone.now()
+        article.save(update_fields=['deleted_at'])
+        ArticleTombstone.objects.create(
+            article_id=article.id, user_id=article.user_id)
+        return enqueue(PurgeJob.ARTICLE, article.id)
+
+
+def run_pending_jobs(batch_size=BATCH_SIZE):
+    """Run pending purge jobs until none are left, return how many ran.
+
+    Jobs are claimed in a short transaction and run outside of it, so each
+    chunk commits on its own. A job left running by a crashed worker can be
+    set back to pending, purging is idempotent.
+    """
+    ran = 0
+    while True:
+        with transaction.atomic():
+            job = PurgeJob.objects.select_for_update(skip_locked=True).filter(
+                status=PurgeJob.PENDING).order_by('id').first()
+            if job is None:
+                return ran
+            job.status = PurgeJob.RUNNING
+            job.save(update_fields=['status'])
+        try:
+            PURGERS[job.kind](job.target_id, batch_size)
+            job.status = PurgeJob.DONE
+        except Exception as exc:
+            logger.exception('Purge of %s failed.', job)
+            job.status, job.error = PurgeJob.FAILED, str(exc)
+        job.finished_at = timezone.now()
+        job.save()
+        ran += 1
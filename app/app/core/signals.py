@@ -0,0 +1,26 @@
+"""
+Signal handlers for core models.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from core.models import Article, ArticleTombstone, User
+
+
+@receiver(post_delete, sender=Article)
+def create_article_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone so syncing clients learn about the deletion."""
+    if instance.deleted_at is not None:
+        # Tombstoned already when it was hidden, see core.purge.
+        return
+    ArticleTombstone.objects.create(
+        article_id=instance.id, user_id=instance.user_id)
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=User)
+def delete_image_file(sender, instance, **kwargs):
+    """Release the image of a deleted article or user once committed."""
+    if instance.image:
+        storage, name = instance.image.storage, instance.image.name
+        transaction.on_commit(lambda: storage.delete(name))
@@ -2,10 +2,17 @@
 Test for django admin modification.
 """
 
+from datetime import timedelta
 from django.test import TestCase
-from django.test import Client
+from django.test import Client, RequestFactory
+from django.contrib import admin
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Article, Like, PurgeJob, Topic, User
 
 
 class AdminSiteTest(TestCase):
@@ -41,3 +48,135 @@ class AdminSiteTest(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class ScalableAdminTests(TestCase):
+    """Test admin changelists and bulk actions on larger tables."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            'Admin', 'User', 'admin@example.com', 'passtest123')
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'passtest123')
+
+    def _create_likes(self, count):
+        articles = Article.objects.bulk_create(
+            Article(user=self.user, title=f'Article {i}', content='text')
+            for i in range(count))
+        Like.objects.bulk_create(
+            Like(user=self.user, article=article) for article in articles)
+
+    def _changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Test rows don't add queries to the changelists."""
+        for name in ['like', 'comment', 'article', 'topic', 'purgejob']:
+            url = reverse(f'admin:core_{name}_changelist')
+            self._create_likes(2)
+            # Warm the count cache, which other tests' ANALYZE may enable.
+            self._changelist_queries(url)
+            few = self._changelist_queries(url)
+            self._create_likes(20)
+            self.assertEqual(self._changelist_queries(url), few, name)
+
+    def test_changelist_skips_full_count(self):
+        """Test filtered changelists don't count the whole table."""
+        self._create_likes(3)
+        url = reverse('admin:core_article_changelist')
+        res = self.client.get(url, {'q': 'Article 1'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(res.context['cl'].full_result_count)
+
+    def test_created_at_filter(self):
+        """Test changelists filter on the indexed creation date."""
+        self._create_likes(3)
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        for name in ['like', 'comment', 'article']:
+            with self.subTest(name):
+                url = reverse(f'admin:core_{name}_changelist')
+                res = self.client.get(url, {'created_at__gte': tomorrow})
+
+                self.assertEqual(res.status_code, 200)
+                self.assertEqual(res.context['cl'].result_count, 0)
+
+    def test_purge_action_queues_jobs(self):
+        """Test purging articles from the admin only queues jobs."""
+        self._create_likes(2)
+        ids = list(Article.objects.values_list('id', flat=True))
+        url = reverse('admin:core_article_changelist')
+        res = self.client.post(url, {
+            'action': 'purge_selected',
+            '_selected_action': ids,
+        })
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(Article.objects.count(), 2)
+        jobs = PurgeJob.objects.filter(kind=PurgeJob.ARTICLE)
+        self.assertEqual(sorted(jobs.values_list('target_id', flat=True)),
+                         sorted(ids))
+
+    def test_default_delete_action_removed(self):
+        """Test the cascade collecting delete action isn't offered."""
+        res = self.client.get(reverse('admin:core_like_changelist'))
+
+        choices = dict(res.context['action_form'].fields['action'].choices)
+        self.assertNotIn('delete_selected', choices)
+        self.assertIn('bulk_delete', choices)
+
+    def test_bulk_delete_likes(self):
+        """Test the bulk delete action removes the selected likes."""
+        self._create_likes(3)
+        ids = list(Like.objects.values_list('id', flat=True))
+        res = self.client.post(reverse('admin:core_like_changelist'), {
+            'action': 'bulk_delete',
+            '_selected_action': ids[:2],
+        })
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(list(Like.objects.values_list('id', flat=True)),
+                         ids[2:])
+
+
+class AdminSearchPlanTests(TestCase):
+    """Test admin searches are served by indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create(
+            User(first_name='Test', last_name='User',
+                 email=f'User{i}@example.com')
+            for i in range(5000))
+        Article.objects.bulk_create(
+            Article(user=users[i], title=f'Article {i}', content='text')
+            for i in range(5000))
+        Topic.objects.bulk_create(
+            Topic(user=users[i], name=f'Topic {i}') for i in range(5000))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _plan(self, model, term):
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get('/')
+        queryset, _ = model_admin.get_search_results(
+            request, model.objects.all(), term)
+        return queryset, queryset.explain()
+
+    def test_search_uses_indexes(self):
+        """Test email, title and name searches use their indexes."""
+        cases = [
+            (User, ' user12@EXAMPLE.com', 'user_email_lower_unique', 1),
+            (Article, 'article 123', 'article_title_prefix_idx', 11),
+            (Topic, 'Topic 123', 'topic_name_prefix_idx', 11),
+        ]
+        for model, term, index, count in cases:
+            with self.subTest(model.__name__):
+                queryset, plan = self._plan(model, term)
+                self.assertIn(index, plan)
+                self.assertEqual(queryset.count(), count)
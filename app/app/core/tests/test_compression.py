@@ -0,0 +1,100 @@
+"""
+Tests for the response compression middleware.
+"""
+
+import gzip
+import json
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from app.middleware.compression import (
+    CompressionMiddleware, choose_encoding, compression)
+
+
+PAYLOAD = json.dumps({'content': 'Some article content. ' * 200}).encode()
+
+
+def run_middleware(request, response, view_func=None):
+    """Run the middleware around a response."""
+    middleware = CompressionMiddleware(lambda r: response)
+    middleware.process_view(request, view_func or (lambda r: None), (), {})
+    return middleware.process_response(request, response)
+
+
+@override_settings(COMPRESSION_ENCODINGS=['gzip'])
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test response compression."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_large_response_compressed(self):
+        """Test large JSON responses are gzipped."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = HttpResponse(PAYLOAD, content_type='application/json')
+
+        response = run_middleware(request, response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), PAYLOAD)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_response_not_compressed(self):
+        """Test responses under the size threshold are left alone."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = HttpResponse(b'{"id": 1}', content_type='application/json')
+
+        response = run_middleware(request, response)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_client_without_gzip_not_compressed(self):
+        """Test clients that don't accept gzip get identity responses."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        response = HttpResponse(PAYLOAD, content_type='application/json')
+
+        response = run_middleware(request, response)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_binary_content_not_compressed(self):
+        """Test images are not compressed again."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = HttpResponse(PAYLOAD, content_type='image/png')
+
+        response = run_middleware(request, response)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_view_options(self):
+        """Test views can disable compression or change the threshold."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+
+        disabled = run_middleware(
+            request, HttpResponse(PAYLOAD, content_type='application/json'),
+            compression(enabled=False)(lambda r: None))
+        small = run_middleware(
+            request, HttpResponse(PAYLOAD[:500], content_type='application/json'),
+            compression(min_size=0, level=9)(lambda r: None))
+
+        self.assertFalse(disabled.has_header('Content-Encoding'))
+        self.assertEqual(small['Content-Encoding'], 'gzip')
+
+    def test_streaming_response_compressed(self):
+        """Test streamed responses are compressed chunk by chunk."""
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        chunks = [b'{"row": %d}\n' % i for i in range(100)]
+        response = StreamingHttpResponse(
+            iter(chunks), content_type='application/x-ndjson')
+
+        response = run_middleware(request, response)
+        body = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body), b''.join(chunks))
+
+    def test_choose_encoding(self):
+        """Test the best accepted encoding is chosen."""
+        self.assertEqual(choose_encoding('gzip, br', ['gzip']), 'gzip')
+        self.assertEqual(choose_encoding('*', ['gzip']), 'gzip')
+        self.assertIsNone(choose_encoding('identity', ['gzip']))
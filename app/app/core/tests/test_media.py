@@ -0,0 +1,114 @@
+"""
+Tests for media file serving.
+"""
+
+import os
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+
+CONTENT = bytes(range(256)) * 4
+HASHED_NAME = 'article_pic/ab/cd/' + 'abcd' * 16 + '.png'
+
+
+class MediaServingTests(TestCase):
+    """Test serving files from MEDIA_ROOT."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name,
+                                     MEDIA_SENDFILE=None)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        for name in ('profile_pics/pic.png', HASHED_NAME, 'private/key.txt'):
+            path = os.path.join(media_root.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+        self.mtime = int(os.stat(os.path.join(
+            media_root.name, 'profile_pics/pic.png')).st_mtime)
+
+    def url(self, name):
+        return reverse('media', args=[name])
+
+    def test_serve_file(self):
+        """Test files are served with validators."""
+        res = self.client.get(self.url('profile_pics/pic.png'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT)
+        self.assertEqual(res['Content-Type'], 'image/png')
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertEqual(res['Last-Modified'], http_date(self.mtime))
+        self.assertTrue(res.has_header('ETag'))
+
+    def test_content_addressed_file_immutable(self):
+        """Test hashed names use the hash as ETag and are cached forever."""
+        res = self.client.get(self.url(HASHED_NAME))
+
+        self.assertEqual(res['ETag'], '"' + 'abcd' * 16 + '"')
+        self.assertIn('immutable', res['Cache-Control'])
+
+    def test_not_modified(self):
+        """Test matching validators return 304."""
+        res = self.client.get(self.url('profile_pics/pic.png'))
+        res = self.client.get(self.url('profile_pics/pic.png'),
+                              HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_range(self):
+        """Test a byte range is served partially."""
+        res = self.client.get(self.url('profile_pics/pic.png'),
+                              HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b''.join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res['Content-Range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(res['Content-Length'], '10')
+
+    def test_suffix_range(self):
+        """Test the last bytes of a file can be requested."""
+        res = self.client.get(self.url('profile_pics/pic.png'),
+                              HTTP_RANGE='bytes=-5')
+
+        self.assertEqual(b''.join(res.streaming_content), CONTENT[-5:])
+
+    def test_stale_if_range_sends_full_file(self):
+        """Test a range with an outdated If-Range returns the whole file."""
+        res = self.client.get(self.url('profile_pics/pic.png'),
+                              HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"old"')
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        """Test ranges past the end are rejected."""
+        res = self.client.get(self.url('profile_pics/pic.png'),
+                              HTTP_RANGE='bytes=5000-')
+
+        self.assertEqual(res.status_code, 416)
+
+    def test_unauthorized_path(self):
+        """Test files outside public directories are not served."""
+        res = self.client.get(self.url('private/key.txt'))
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_path_traversal(self):
+        """Test paths can't escape MEDIA_ROOT."""
+        res = self.client.get(self.url('profile_pics/../../etc/passwd'))
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_accel_redirect(self):
+        """Test the transfer is offloaded to nginx when configured."""
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            res = self.client.get(self.url('profile_pics/pic.png'))
+
+        self.assertEqual(res['X-Accel-Redirect'],
+                         '/protected-media/profile_pics/pic.png')
+        self.assertEqual(res.content, b'')
@@ -0,0 +1,125 @@
+"""
+Tests for removing orphaned media files.
+"""
+
+import os
+import tempfile
+import time
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from core.media_gc import file_fields, find_orphans, walk_files
+from core.models import Article
+
+
+class GcMediaCommandTests(TestCase):
+    """Test the gc_media command."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.root = media_root.name
+        override = override_settings(MEDIA_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        Article.objects.create(
+            user=self.user, title='Title', opening='Opening',
+            content='Content', image='article_pic/keep.png')
+        old = time.time() - 7200
+        for name in ('article_pic/keep.png', 'article_pic/orphan.png',
+                     'profile_pics/old/orphan.png', 'article_pic/new.png'):
+            self.write(name, mtime=None if name.endswith('new.png') else old)
+
+    def write(self, name, mtime=None):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'data')
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.root, name))
+
+    def gc_media(self, *args):
+        out = StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run(self):
+        """Test a dry run reports orphans without removing them."""
+        output = self.gc_media('--dry-run')
+
+        self.assertIn('article_pic/orphan.png', output)
+        self.assertIn('profile_pics/old/orphan.png', output)
+        self.assertIn('Found 2 orphaned files', output)
+        self.assertTrue(self.exists('article_pic/orphan.png'))
+
+    def test_remove_orphans(self):
+        """Test old unreferenced files are deleted, others kept."""
+        self.gc_media('--batch-size', '1')
+
+        self.assertFalse(self.exists('article_pic/orphan.png'))
+        self.assertFalse(self.exists('profile_pics/old/orphan.png'))
+        self.assertTrue(self.exists('article_pic/keep.png'))
+        self.assertTrue(self.exists('article_pic/new.png'))
+
+    def test_quarantine(self):
+        """Test orphans can be moved aside instead of deleted."""
+        quarantine = os.path.join(self.root, 'quarantine')
+
+        self.gc_media('--quarantine', quarantine)
+        self.gc_media('--quarantine', quarantine)
+
+        self.assertFalse(self.exists('article_pic/orphan.png'))
+        self.assertTrue(self.exists('quarantine/article_pic/orphan.png'))
+
+
+    def test_walk_in_name_order(self):
+        """Test files are walked in the order of their full names."""
+        for name in ('a-b.png', 'a/x.png', 'a.png', 'a0.png'):
+            self.write(name)
+
+        names = [name for name, _ in walk_files(self.root)]
+
+        self.assertEqual(names, sorted(names))
+
+    def test_tables_read_once(self):
+        """Test references are read once whatever the number of files."""
+        for i in range(10):
+            self.write(f'article_pic/extra{i}.png', mtime=time.time() - 7200)
+
+        with CaptureQueriesContext(connection) as queries:
+            orphans = [name for name, _ in find_orphans(
+                self.root, batch_size=2)]
+
+        self.assertEqual(len(queries), len(file_fields()))
+        self.assertNotIn('article_pic/keep.png', orphans)
+        self.assertIn('article_pic/extra9.png', orphans)
+
+
+class DeleteImageFileTests(TestCase):
+    """Test images are removed with their article."""
+
+    def test_article_delete_removes_image(self):
+        """Test deleting an article deletes its image file."""
+        with tempfile.TemporaryDirectory() as root, \
+                self.settings(MEDIA_ROOT=root):
+            user = get_user_model().objects.create_user(
+                'Test', 'User', 'user@example.com', 'testpass123')
+            article = Article(user=user, title='Title', opening='Opening',
+                              content='Content')
+            article.image.save('pic.png', ContentFile(b'image'))
+            path = article.image.path
+
+            with self.captureOnCommitCallbacks(execute=True):
+                article.delete()
+
+            self.assertFalse(os.path.exists(path))
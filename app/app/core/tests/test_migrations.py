@@ -0,0 +1,41 @@
+"""
+Tests for data checks in migrations.
+"""
+
+from importlib import import_module
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+email_migration = import_module('core.migrations.0025_user_email_lower_unique')
+
+
+class EmailDuplicatesCheckTests(TestCase):
+    """Test the check run before emails are made unique in any case."""
+
+    def setUp(self):
+        User = get_user_model()
+        constraint = next(c for c in User._meta.constraints
+                          if c.name == 'user_email_lower_unique')
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(User, constraint)
+        for email in ['same@example.com', 'Same@example.com',
+                      'other@example.com']:
+            User.objects.create_user('Test', 'User', email, 'testpass123')
+
+    def test_duplicates_listed(self):
+        """Test emails differing only in case stop the migration."""
+        with self.assertRaises(RuntimeError) as cm:
+            email_migration.check_email_duplicates(apps, None)
+
+        message = str(cm.exception)
+        self.assertIn('same@example.com, Same@example.com', message)
+        self.assertNotIn('other@example.com', message)
+
+    def test_no_duplicates(self):
+        """Test the migration goes on once duplicates are resolved."""
+        get_user_model().objects.filter(email='Same@example.com').update(
+            email='renamed@example.com')
+
+        email_migration.check_email_duplicates(apps, None)
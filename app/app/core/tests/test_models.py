@@ -84,3 +84,10 @@ class ModelTests(TestCase):
         like = models.Like.objects.create(user=user, article=article)
 
         self.assertEqual(str(like), f"{user} likes {str(article)}")
+
+    def test_upload_paths(self):
+        """Test upload paths keep only the directory and extension."""
+        self.assertEqual(models.user_profile_pic_path(None, 'me.jpg'),
+                         'profile_pics/upload.jpg')
+        self.assertEqual(models.article_pic_path(None, 'photo.png'),
+                         'article_pic/upload.png')
@@ -0,0 +1,119 @@
+"""
+Tests for pagination counts.
+"""
+
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from core import models
+from core.pagination import EstimatedCountPaginator, count_queryset
+
+
+def create_articles(user, count):
+    """Create and return sample articles."""
+    return models.Article.objects.bulk_create(
+        models.Article(user=user, title=f'Title {i}', content='Content')
+        for i in range(count))
+
+
+class LargeTablePaginator(EstimatedCountPaginator):
+    """Paginator that treats every table as large."""
+    exact_count_threshold = -1
+
+
+class PaginationCountTests(TestCase):
+    """Test estimated and exact counts."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'First', 'Last', 'user@example.com', 'testpass123')
+        create_articles(self.user, 12)
+
+    def test_small_result_counted_exactly(self):
+        """Test results under the threshold use an exact count."""
+        queryset = models.Article.objects.filter(title__startswith='Title 1')
+
+        count, estimated = count_queryset(queryset)
+
+        self.assertEqual(count, 3)
+        self.assertFalse(estimated)
+
+    def test_large_filtered_result_estimated(self):
+        """Test large filtered results use a close planner estimate."""
+        other = get_user_model().objects.create_user(
+            'Other', 'Last', 'other@example.com', 'testpass123')
+        create_articles(self.user, 2000)
+        create_articles(other, 1000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_article')
+        queryset = models.Article.objects.filter(user=other)
+
+        count, estimated = count_queryset(queryset, exact_threshold=-1)
+
+        self.assertTrue(estimated)
+        self.assertAlmostEqual(count, 1000, delta=100)
+
+    def test_large_unfiltered_count_cached(self):
+        """Test unfiltered querysets reuse a cached exact count."""
+        queryset = models.Article.objects.all()
+
+        count, estimated = count_queryset(
+            queryset, exact_threshold=-1, cache_timeout=60)
+        create_articles(self.user, 2)
+        cached, _ = count_queryset(
+            queryset, exact_threshold=-1, cache_timeout=60)
+
+        self.assertEqual(count, 12)
+        self.assertFalse(estimated)
+        self.assertEqual(cached, 12)
+
+    def test_estimated_paginator_allows_pages_past_estimate(self):
+        """Test pages are served when the estimate is too low."""
+        queryset = models.Article.objects.filter(
+            title__startswith='Title').order_by('id')
+        paginator = LargeTablePaginator(queryset, 5)
+
+        page = paginator.page(3)
+
+        self.assertTrue(paginator.count_estimated)
+        self.assertEqual(len(page.object_list), 2)
+
+    def test_cached_count_does_not_cut_page(self):
+        """Test a stale cached count still serves full pages."""
+        queryset = models.Article.objects.order_by('id')
+        LargeTablePaginator(queryset, 5).count
+        create_articles(self.user, 3)
+
+        paginator = LargeTablePaginator(queryset, 20)
+
+        self.assertEqual(paginator.count, 12)
+        self.assertEqual(len(paginator.page(1).object_list), 15)
+
+    def test_next_page_ignores_estimate(self):
+        """Test next pages follow the rows when the estimate is off."""
+        queryset = models.Article.objects.filter(
+            title__startswith='Title').order_by('id')
+        for estimate in [3, 100]:
+            with self.subTest(estimate=estimate), mock.patch(
+                    'core.pagination.estimate_count', return_value=estimate):
+                paginator = LargeTablePaginator(queryset, 5)
+                pages = [paginator.page(number) for number in [1, 2, 3]]
+
+                self.assertEqual(paginator.count, estimate)
+                self.assertEqual([page.has_next() for page in pages],
+                                 [True, True, False])
+                self.assertEqual(pages[1].next_page_number(), 3)
+                self.assertEqual(len(pages[2].object_list), 2)
+
+    def test_next_page_ignores_stale_cached_count(self):
+        """Test a stale cached count doesn't hide the next page."""
+        queryset = models.Article.objects.order_by('id')
+        LargeTablePaginator(queryset, 5).count
+        create_articles(self.user, 3)
+
+        page = LargeTablePaginator(queryset, 4).page(3)
+
+        self.assertTrue(page.has_next())
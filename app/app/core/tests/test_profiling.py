@@ -0,0 +1,80 @@
+"""
+Tests for the request profiling middleware.
+"""
+
+import os
+import tempfile
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+ARTICLES_URL = reverse('article:articles-list')
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Test profiling requests on demand."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        override = override_settings(PROFILING_DIR=self.directory.name,
+                                     PROFILING_SAMPLE_RATE=0)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_superuser(
+            'Admin', 'User', 'admin@example.com', 'testpass123')
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+
+    def authenticate(self, user):
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_staff_header_profiles_request(self):
+        """Test staff can profile a request with the X-Profile header."""
+        self.authenticate(self.staff)
+
+        res = self.client.get(ARTICLES_URL, HTTP_X_PROFILE='1')
+
+        profile_id = res['X-Profile-Id']
+        base = os.path.join(self.directory.name, profile_id)
+        self.assertTrue(os.path.exists(base + '.prof'))
+        with open(base + '.txt') as report:
+            text = report.read()
+        self.assertIn(f'GET {ARTICLES_URL}', text)
+        self.assertIn('SELECT', text)
+
+    def test_staff_query_flag_profiles_request(self):
+        """Test staff can profile a request with the _profile parameter."""
+        self.authenticate(self.staff)
+
+        res = self.client.get(ARTICLES_URL, {'_profile': '1'})
+
+        self.assertTrue(res.has_header('X-Profile-Id'))
+
+    def test_non_staff_not_profiled(self):
+        """Test regular users can't trigger profiling."""
+        self.authenticate(self.user)
+
+        res = self.client.get(ARTICLES_URL, HTTP_X_PROFILE='1')
+
+        self.assertFalse(res.has_header('X-Profile-Id'))
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_untriggered_request_not_profiled(self):
+        """Test requests are not profiled by default."""
+        res = self.client.get(ARTICLES_URL)
+
+        self.assertFalse(res.has_header('X-Profile-Id'))
+
+    def test_sampling(self):
+        """Test a sample rate of one profiles every request."""
+        with self.settings(PROFILING_SAMPLE_RATE=1):
+            res = self.client.get(ARTICLES_URL)
+
+        self.assertTrue(res.has_header('X-Profile-Id'))
@@ -0,0 +1,114 @@
+"""
+Tests for batched purging of users and articles.
+"""
+
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from core.models import (
+    Article, ArticleTombstone, Comment, Like, PurgeJob, RelatedArticle)
+from core import purge
+
+
+def create_user(email):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        'Test', 'User', email, 'testpass123')
+
+
+def create_article(user, **params):
+    """Create and return a sample article."""
+    defaults = {
+        'title': 'Test title',
+        'opening': 'Test opening',
+        'content': 'Test article'
+    }
+    defaults.update(params)
+
+    article = Article.objects.create(user=user, **defaults)
+    return article
+
+
+class PurgeTests(TestCase):
+    """Test deleting users and articles in batches."""
+
+    def setUp(self):
+        self.user = create_user('user@example.com')
+        self.other_user = create_user('other@example.com')
+        self.article = create_article(self.user)
+        self.other_article = create_article(self.other_user)
+        for i in range(5):
+            liker = create_user(f'liker{i}@example.com')
+            Like.objects.create(user=liker, article=self.article)
+            Comment.objects.create(user=liker, article=self.article,
+                                   content='Comment')
+        Comment.objects.create(user=self.user, article=self.other_article,
+                               content='Comment')
+        Like.objects.create(user=self.user, article=self.other_article)
+        RelatedArticle.objects.create(
+            article=self.other_article, related=self.article, score=1)
+
+    def test_purge_article(self):
+        """Test an article and its dependents are deleted."""
+        purge.purge_article_rows(self.article.id, batch_size=2)
+
+        self.assertFalse(Article.objects.filter(id=self.article.id).exists())
+        self.assertFalse(Like.objects.filter(article_id=self.article.id).exists())
+        self.assertFalse(Comment.objects.filter(
+            article_id=self.article.id).exists())
+        self.assertFalse(RelatedArticle.objects.exists())
+        self.assertTrue(ArticleTombstone.objects.filter(
+            article_id=self.article.id).exists())
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_purge_user(self):
+        """Test a user, their articles and activity are deleted."""
+        purge.purge_user(self.user.id, batch_size=2)
+
+        self.assertFalse(get_user_model().objects.filter(
+            id=self.user.id).exists())
+        self.assertEqual(list(Article.objects.all()), [self.other_article])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Like.objects.exists())
+
+    def test_chunks_not_materialized(self):
+        """Test dependents are deleted without loading them."""
+        with CaptureQueriesContext(connection) as queries:
+            deleted = purge.delete_in_batches(
+                Like.objects.filter(article=self.article), batch_size=10)
+
+        self.assertEqual(deleted, 5)
+        statements = [q['sql'] for q in queries.captured_queries
+                      if 'core_like' in q['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('DELETE'))
+
+    def test_purge_removes_image(self):
+        """Test image files of purged articles are deleted."""
+        with tempfile.TemporaryDirectory() as root, \
+                self.settings(MEDIA_ROOT=root):
+            self.article.image.save('pic.png', ContentFile(b'image'))
+            path = self.article.image.path
+
+            with self.captureOnCommitCallbacks(execute=True):
+                purge.purge_article_rows(self.article.id)
+
+            self.assertFalse(os.path.exists(path))
+
+    def test_run_purge_jobs(self):
+        """Test queued purges run from the command."""
+        job = purge.enqueue(PurgeJob.USER, self.user.id)
+
+        call_command('run_purge_jobs', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, PurgeJob.DONE)
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(get_user_model().objects.filter(
+            id=self.user.id).exists())
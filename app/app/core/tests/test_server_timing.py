@@ -0,0 +1,74 @@
+"""
+Tests for the Server-Timing header.
+"""
+
+import tempfile
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Article
+from app.utils import timing
+from app.utils.image_processing import process_image
+
+
+ARTICLES_URL = reverse('article:articles-list')
+
+
+def parse_header(value):
+    """Return a dict of metric name to its parameters."""
+    metrics = {}
+    for metric in value.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@override_settings(SERVER_TIMING_ENABLED=True)
+class ServerTimingTests(TestCase):
+    """Test the request cost breakdown."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        Article.objects.create(user=self.user, title='Title',
+                               opening='Opening', content='Content')
+
+    def test_header_breaks_down_request(self):
+        """Test API responses carry the timing of each stage."""
+        res = self.client.get(ARTICLES_URL)
+
+        metrics = parse_header(res['Server-Timing'])
+        for name in ('auth', 'perm', 'db', 'serialize', 'render', 'total'):
+            self.assertIn(name, metrics)
+        self.assertRegex(metrics['db']['desc'], r'"\d+ queries"')
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_disabled(self):
+        """Test no header is sent when disabled."""
+        res = self.client.get(ARTICLES_URL)
+
+        self.assertFalse(res.has_header('Server-Timing'))
+
+    def test_image_processing_timed(self):
+        """Test image processing is timed."""
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            Image.new('RGB', (10, 10)).save(image_file, format='JPEG')
+            image_file.seek(0)
+            with timing.collect() as timings:
+                process_image(File(image_file, name='image.jpg'))
+
+        self.assertEqual(timings.metrics['image'][1], 1)
+
+    def test_nested_serializers_counted_once(self):
+        """Test serialization is only timed at the outermost serializer."""
+        from article.serializers import ArticleDetailSerializer
+
+        article = Article.objects.get()
+        with timing.collect() as timings:
+            ArticleDetailSerializer(article).data
+
+        self.assertEqual(timings.metrics['serialize'][1], 1)
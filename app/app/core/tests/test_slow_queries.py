@@ -0,0 +1,114 @@
+"""
+Tests for the slow query log.
+"""
+
+import json
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.utils import timezone
+from core.models import Article, SlowQuery
+from app.middleware.slow_queries import SlowQueryLog, slow_query_log
+
+
+ARTICLES_URL = reverse('article:articles-list')
+SLOW_QUERIES_URL = reverse('admin-slow-queries')
+
+
+def make_entry(**params):
+    """Create and return a sample log entry."""
+    entry = {
+        'time': timezone.now(), 'duration_ms': 512.0,
+        'alias': 'default', 'method': 'GET', 'path': '/api/article/',
+        'view': 'article:articles-list', 'sql': 'SELECT 1', 'param_count': 0,
+        'origin': ['article/views.py:10 in list'], 'plan': 'Result',
+    }
+    entry.update(params)
+    return entry
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTests(TestCase):
+    """Test recording slow queries."""
+
+    def setUp(self):
+        slow_query_log.clear()
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            'Test', 'User', 'user@example.com', 'testpass123')
+        Article.objects.create(user=user, title='Title', opening='Opening',
+                               content='Content')
+
+    def test_queries_over_threshold_recorded(self):
+        """Test queries are logged with their view, origin and plan."""
+        self.client.get(ARTICLES_URL)
+
+        entries = slow_query_log.entries()
+        self.assertTrue(entries)
+        entry = next(e for e in entries if e['sql'].startswith('SELECT')
+                     and 'core_article' in e['sql'])
+        self.assertEqual(entry['path'], ARTICLES_URL)
+        self.assertEqual(entry['view'], 'article:articles-list')
+        self.assertTrue(entry['origin'])
+        self.assertIn('Scan', entry['plan'])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=None)
+    def test_disabled(self):
+        """Test nothing is recorded without a threshold."""
+        self.client.get(ARTICLES_URL)
+
+        self.assertEqual(slow_query_log.entries(), [])
+
+    def test_params_not_stored(self):
+        """Test only the number of parameters is logged, plans are generic."""
+        self.client.get(ARTICLES_URL, {'search': 'secret-value'})
+
+        entry = next(e for e in slow_query_log.entries()
+                     if 'UPPER' in e['sql'] or 'LIKE' in e['sql'])
+        self.assertGreater(entry['param_count'], 0)
+        self.assertNotIn('secret-value', json.dumps(entry, default=str))
+
+    def test_log_bounded(self):
+        """Test the log keeps only the most recent entries."""
+        log = SlowQueryLog(size=2)
+        for duration in (1, 2, 3):
+            log.add(make_entry(duration_ms=duration))
+
+        self.assertEqual([e['duration_ms'] for e in log.entries()], [3, 2])
+        self.assertEqual(SlowQuery.objects.count(), 2)
+
+
+class SlowQueryAdminTests(TestCase):
+    """Test the slow query admin page."""
+
+    def setUp(self):
+        slow_query_log.clear()
+        slow_query_log.add(make_entry())
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            'Admin', 'User', 'admin@example.com', 'testpass123')
+        self.client.force_login(self.admin_user)
+
+    def test_page_lists_queries(self):
+        """Test the admin page shows logged queries."""
+        res = self.client.get(SLOW_QUERIES_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, 'SELECT 1')
+        self.assertContains(res, 'article/views.py:10 in list')
+
+    def test_json_download(self):
+        """Test the log can be downloaded as JSON."""
+        res = self.client.get(SLOW_QUERIES_URL, {'format': 'json'})
+
+        self.assertIn('attachment', res['Content-Disposition'])
+        self.assertEqual(json.loads(res.content)[0]['sql'], 'SELECT 1')
+
+    def test_requires_staff(self):
+        """Test non staff users are redirected to the login page."""
+        self.client.logout()
+
+        res = self.client.get(SLOW_QUERIES_URL)
+
+        self.assertEqual(res.status_code, 302)
@@ -0,0 +1,93 @@
+"""
+Tests for the content-addressed file storage.
+"""
+
+import os
+import tempfile
+from io import BytesIO
+from unittest import mock
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import StoredFile
+from app.utils import storage
+
+
+CREATE_USER_URL = reverse('user:create')
+
+
+def image_upload(name='image.jpg', color='red'):
+    """Return an uploaded JPEG image."""
+    data = BytesIO()
+    Image.new('RGB', (20, 20), color).save(data, format='JPEG')
+    return SimpleUploadedFile(name, data.getvalue(), content_type='image/jpeg')
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Test files are stored once and reference counted."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_identical_content_stored_once(self):
+        """Test saving the same content twice shares one file."""
+        first = default_storage.save('docs/a.txt', ContentFile(b'content'))
+        second = default_storage.save('docs/b.txt', ContentFile(b'content'))
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('docs/'))
+        self.assertTrue(first.endswith('.txt'))
+        self.assertEqual(StoredFile.objects.get(name=first).refcount, 2)
+
+    def test_file_deleted_with_last_reference(self):
+        """Test a shared file outlives all but its last reference."""
+        name = default_storage.save('docs/a.txt', ContentFile(b'content'))
+        default_storage.save('docs/b.txt', ContentFile(b'content'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            default_storage.delete(name)
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            default_storage.delete(name)
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_identical_source_processed_once(self):
+        """Test re-uploading an image reuses the processed result."""
+        with mock.patch('app.utils.storage.process_image',
+                        wraps=storage.process_image) as process_image:
+            first = storage.store_processed_image(image_upload(), 'pics')
+            second = storage.store_processed_image(
+                image_upload('other.jpg'), 'pics')
+
+        self.assertEqual(process_image.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(StoredFile.objects.get(name=first).refcount, 2)
+
+    def test_user_images_deduplicated(self):
+        """Test users uploading the same picture share its file."""
+        client = APIClient()
+        for i in range(2):
+            client.post(CREATE_USER_URL, {
+                'first_name': 'First',
+                'last_name': 'Last',
+                'email': f'user{i}@example.com',
+                'password': 'testpass123',
+                'image': image_upload(),
+            }, format='multipart')
+
+        names = {user.image.name for user in get_user_model().objects.all()}
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(os.path.exists(default_storage.path(name)))
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 2)
@@ -0,0 +1,56 @@
+"""
+Authentication backend for the email login.
+
+Emails are unique whatever their case and matched through the unique
+`lower(email)` index. Unknown emails check the password against a dummy
+hash made once with the preferred hasher. The check costs one hash, as for
+a wrong password, so timing doesn't tell whether an email is registered.
+"""
+import functools
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.db.models.functions import Lower
+from django.dispatch import receiver
+from django.utils.crypto import get_random_string
+
+
+@functools.lru_cache(maxsize=None)
+def dummy_hash():
+    """Return a hash of a random password made with the preferred hasher."""
+    return make_password(get_random_string(32))
+
+
+@receiver(setting_changed)
+def reset_dummy_hash(*, setting, **kwargs):
+    if setting in ('PASSWORD_HASHERS', 'PBKDF2_ITERATIONS'):
+        dummy_hash.cache_clear()
+
+
+class EmailBackend(ModelBackend):
+    """Authenticate with a case insensitive email and a password."""
+
+    def users_with_email(self, email):
+        """Return the users with an email in any case."""
+        return get_user_model()._default_manager.alias(
+            email_lower=Lower('email')).filter(email_lower=email.lower())
+
+    def get_user_by_email(self, email):
+        """Return the user with an email in any case, or None."""
+        return self.users_with_email(email).first()
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = self.get_user_by_email(username)
+        if user is None:
+            # Takes as long as checking a real password.
+            check_password(password, dummy_hash())
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
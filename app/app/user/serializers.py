@@ -3,10 +3,12 @@ Serializers for the user API View.
 """
 
 from django.contrib.auth import (get_user_model, authenticate)
+from django.db.models.functions import Lower
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
-from app.utils.image_processing import process_image
+from app.utils.storage import store_processed_image
+from app.utils.timing import TimedSerializerMixin
 
 
 def validate_name(value):
@@ -19,7 +21,7 @@ def validate_name(value):
     return value.capitalize()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for user object."""
     first_name = serializers.CharField(validators=[validate_name])
     last_name = serializers.CharField(validators=[validate_name])
@@ -35,7 +37,7 @@ class UserSerializer(serializers.ModelSerializer):
         """Create and return user with encypted password."""
         image = validated_data.pop('image', None)
         if image:
-            processed_image = process_image(image)
+            processed_image = store_processed_image(image, 'profile_pics')
             validated_data['image'] = processed_image
         return get_user_model().objects.create_user(**validated_data)
 
@@ -43,8 +45,8 @@ class UserSerializer(serializers.ModelSerializer):
         """Method for updating user info."""
         image = validated_data.get('image', None)
         if image and instance.image:
+            processed_image = store_processed_image(image, 'profile_pics')
             instance.image.delete(save=False)
-            processed_image = process_image(image)
             validated_data['image'] = processed_image
 
         for attr, value in validated_data.items():
@@ -55,6 +57,17 @@ class UserSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
+    def validate_email(self, value):
+        """Reject an email registered in another case."""
+        users = get_user_model().objects.alias(
+            email_lower=Lower('email')).filter(email_lower=value.lower())
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        if users.exists():
+            raise serializers.ValidationError(
+                _('A user with this email already exists.'))
+        return value
+
     def validate(self, data):
         """
         This method is called after all field-level validations are passed.
@@ -0,0 +1,107 @@
+""" 
+Test for the email login path.
+"""
+
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import ScopedRateThrottle
+from user.backends import EmailBackend, dummy_hash
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(
+        'Test', 'User', email, password)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class EmailLoginTests(TestCase):
+    """Test logging in with an email."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_login_case_insensitive(self):
+        """Test the email matches whatever its case."""
+        create_user('Test.User@example.com')
+
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test.user@EXAMPLE.com', 'password': 'testpass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', res.data)
+
+    def test_email_unique_in_any_case(self):
+        """Test an email can't be registered again in another case."""
+        create_user('same@example.com')
+
+        res = self.client.post(CREATE_USER_URL, {
+            'first_name': 'Other', 'last_name': 'User',
+            'email': 'Same@example.com', 'password': 'testpass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', res.data)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_user('SAME@example.com')
+
+    def test_unknown_email_reuses_dummy_hash(self):
+        """Test failed logins for unknown emails hash no new password."""
+        dummy_hash.cache_clear()
+        for i in range(3):
+            self.assertIsNone(authenticate(
+                username=f'nobody{i}@example.com', password='testpass123'))
+
+        self.assertEqual(dummy_hash.cache_info().misses, 1)
+
+    def test_rehash_on_login(self):
+        """Test passwords are rehashed with the preferred hasher."""
+        user = create_user()
+        self.assertTrue(user.password.startswith('md5$'))
+
+        with override_settings(
+                PASSWORD_HASHERS=['app.utils.hashers.PBKDF2PasswordHasher',
+                                  *FAST_HASHERS],
+                PBKDF2_ITERATIONS=1000):
+            self.assertEqual(authenticate(
+                username=user.email, password='testpass123'), user)
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_login_throttled(self):
+        """Test login attempts from a client are throttled."""
+        create_user()
+        rate = ScopedRateThrottle.THROTTLE_RATES['login']
+        attempts = int(rate.split('/')[0])
+        payload = {'email': 'user@example.com', 'password': 'wrong'}
+
+        for _ in range(attempts):
+            res = self.client.post(TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_email_lookup_uses_index(self):
+        """Test the login lookup is served by the lower(email) index."""
+        get_user_model().objects.bulk_create(
+            get_user_model()(first_name='Test', last_name='User',
+                             email=f'user{i}@example.com', password='!')
+            for i in range(2000))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_user')
+
+        plan = EmailBackend().users_with_email('USER7@example.com').explain()
+
+        self.assertIn('user_email_lower_unique', plan)
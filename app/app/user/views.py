@@ -4,20 +4,29 @@ Views for the user API.
 
 from rest_framework import generics, authentication, permissions, status, parsers
 from rest_framework.authtoken.models import Token
+from app.utils.timing import ServerTimingMixin
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.authtoken.views import ObtainAuthToken
 from user.serializers import (UserSerializer, AuthTokenSerializer)
+from app.utils.cache_purge import purge
+from article.caching import author_key
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(ServerTimingMixin, ObtainAuthToken):
     """Create a new auth token for user."""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Throttled before the serializer, so floods of attempts cost no hashing.
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'login'
+    # Compressed secrets are open to BREACH style attacks.
+    compression = {'enabled': False}
 
 
-class LogoutUserAPIView(APIView):
+class LogoutUserAPIView(ServerTimingMixin, APIView):
     """Logout account."""
     authentication_classes = [authentication.TokenAuthentication]
 
@@ -32,12 +41,12 @@ class LogoutUserAPIView(APIView):
         return Response({'detail': 'Successfully logged out.'}, status=status.HTTP_200_OK)
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(ServerTimingMixin, generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ServerTimingMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
     authentication_classes = [authentication.TokenAuthentication]
@@ -48,3 +57,8 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         """Retrieve and return the authenticated user."""
         return self.request.user
+
+    def perform_update(self, serializer):
+        """Update the user and purge cached articles showing their name."""
+        user = serializer.save()
+        purge(author_key(user.id))